@@ -1,10 +1,7 @@
  
-from .core.engine import MediaRefinerEngine
+import importlib
 from .utils.config import Config
 from .utils.file_handler import FileHandler
-from .processors.image_processor import ImageProcessor
-from .processors.audio_processor import AudioProcessor
-from .processors.video_processor import VideoProcessor
 
 
 __version__ = "1.0.0"
@@ -29,10 +26,31 @@ __all__ = [
 ]
 
 
+#------------------------------------------------------------------#
+#                          Lazy Exports                            #
+#------------------------------------------------------------------#
+_lazy_exports = {
+    'MediaRefinerEngine': '.core.engine',
+    'ImageProcessor': '.processors.image_processor',
+    'AudioProcessor': '.processors.audio_processor',
+    'VideoProcessor': '.processors.video_processor'
+}
+
+
+# Import à la demande: les dépendances lourdes ne sont chargées qu'au premier usage
+def __getattr__(name):
+    if name in _lazy_exports:
+        value = getattr(importlib.import_module(_lazy_exports[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 #------------------------------------------------------------------#
 #                      Convenience Functions                       #
 #------------------------------------------------------------------#
 def refine_media(file_path, output_path=None, **options):
+    from .core.engine import MediaRefinerEngine
     engine = MediaRefinerEngine()
     engine.initialize()
     
@@ -46,6 +64,7 @@ def refine_media(file_path, output_path=None, **options):
 
 
 def refine_image(file_path, output_path=None, quality='high'):
+    from .processors.image_processor import ImageProcessor
     config = Config()
     config.image_quality = quality
     processor = ImageProcessor(config)
@@ -58,6 +77,7 @@ def refine_image(file_path, output_path=None, quality='high'):
 
 
 def refine_audio(file_path, output_path=None, quality='high'):
+    from .processors.audio_processor import AudioProcessor
     config = Config()
     config.audio_quality = quality
     processor = AudioProcessor(config)
@@ -70,6 +90,7 @@ def refine_audio(file_path, output_path=None, quality='high'):
 
 
 def refine_video(file_path, output_path=None, quality='hd'):
+    from .processors.video_processor import VideoProcessor
     config = Config()
     config.video_quality = quality
     processor = VideoProcessor(config)
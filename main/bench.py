@@ -0,0 +1,328 @@
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import statistics
+from .utils.config import Config
+from .utils.scratch import scratch_space
+from .utils.speed_tiers import find_stage
+
+
+IMAGE_SIZES = [(640, 480), (1920, 1080), (3840, 2160)]
+AUDIO_LENGTHS = [5, 30, 120]
+VIDEO_SIZES = [(640, 360, 48), (1280, 720, 48)]
+QUICK_IMAGE_SIZES = [(320, 240), (640, 480)]
+QUICK_AUDIO_LENGTHS = [2, 5]
+QUICK_VIDEO_SIZES = [(320, 240, 12)]
+DENOISE_TIERS = ['off', 'fast', 'temporal', 'quality']
+SAMPLE_RATE = 44100
+
+
+#------------------------------------------------------------------#
+#                       Synthetic Media                            #
+#------------------------------------------------------------------#
+
+# Image déterministe: dégradés de couleur et bruit gaussien
+def make_image(path, width, height, seed=0):
+    import cv2
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)[None, :]
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    image = np.stack([x + 0 * y, y + 0 * x, (x + y) / 2], axis=2)
+    image += rng.normal(0, 12, image.shape).astype(np.float32)
+    cv2.imwrite(path, np.clip(image, 0, 255).astype(np.uint8))
+    return path
+
+
+# WAV déterministe: somme de sinusoïdes et bruit blanc
+def make_wav(path, seconds, sr=SAMPLE_RATE, seed=0):
+    import numpy as np
+    import soundfile as sf
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    audio = 0.3 * np.sin(2 * np.pi * 220 * t) + 0.15 * np.sin(2 * np.pi * 1760 * t) * (1 + np.sin(2 * np.pi * 0.5 * t)) / 2
+    audio += rng.normal(0, 0.02, len(t))
+    sf.write(path, audio.astype(np.float32), sr)
+    return path
+
+
+# Vidéo déterministe (MJPG) : dégradé en mouvement, bruit et léger tremblement
+def make_video(path, width, height, frames, fps=24, seed=0):
+    import cv2
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    base = cv2.imread(make_image(path + '.png', width + 32, height + 32, seed))
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, (width, height))
+    try:
+        for index in range(frames):
+            dx, dy = (16 + index % 8 + rng.integers(-2, 3, size=2)).tolist()
+            frame = base[dy:dy + height, dx:dx + width].astype(np.int16)
+            frame += rng.normal(0, 8, frame.shape).astype(np.int16)
+            writer.write(np.clip(frame, 0, 255).astype(np.uint8))
+    finally:
+        writer.release()
+        os.remove(path + '.png')
+    return path
+
+
+#------------------------------------------------------------------#
+#                   Reference Implementations                      #
+#------------------------------------------------------------------#
+
+# Boucle historique de enhance_dynamics (avant le compresseur vectorisé), conservée pour la mesure
+# du gain: réduction instantanée échantillon par échantillon au-dessus du seuil, sans attaque ni relâchement
+def legacy_compressor(audio, threshold=0.1, ratio=4.0):
+    import numpy as np
+    envelope = np.abs(audio)
+    compressed = np.copy(audio)
+    
+    for i in range(1, len(audio)):
+        if envelope[i] > threshold:
+            reduction = 1 - (envelope[i] - threshold) / ratio
+            compressed[i] *= max(reduction, 0.1)
+    
+    return compressed
+
+
+# Compresseur de référence en boucle Python échantillon par échantillon (même algorithme que
+# AudioProcessor.compress_dynamics: crête par bloc de contrôle, hold, attaque/relâchement, rampe)
+def reference_compressor(audio, sr, params):
+    import numpy as np
+    from collections import deque
+    step = 1 << max(int(np.log2(sr / 1000.0)), 0)
+    control_rate = sr / step
+    attack_coef = float(np.exp(-1.0 / (params['attack'] * control_rate)))
+    release_coef = float(np.exp(-1.0 / (params['release'] * control_rate)))
+    hold = max(int(params['hold'] * control_rate) | 1, 1)
+    exponent = 1.0 / params['ratio'] - 1.0
+    
+    peaks = deque([0.0] * (hold - 1), maxlen=hold)
+    attack = release = previous = 1.0
+    samples = audio.tolist()
+    output = []
+    for start in range(0, len(samples), step):
+        block = samples[start:start + step]
+        peak = 0.0
+        for sample in block:
+            peak = max(peak, abs(sample))
+        peaks.append(peak)
+        
+        envelope = max(peaks)
+        gain = (envelope / params['threshold']) ** exponent if envelope > params['threshold'] else 1.0
+        attack = (1 - attack_coef) * gain + attack_coef * attack
+        release = (1 - release_coef) * gain + release_coef * release
+        gain = min(attack, release)
+        for index, sample in enumerate(block):
+            output.append((previous + (gain - previous) * (index + 1) / step) * sample * params['makeup_gain'])
+        previous = gain
+    return np.array(output, dtype=audio.dtype)
+
+
+#------------------------------------------------------------------#
+#                         Measurements                             #
+#------------------------------------------------------------------#
+
+# Pic de mémoire résidente du processus (Mo), None si indisponible
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+# Durée médiane de plusieurs exécutions (le résultat de la dernière est conservé)
+def timed(function, repeat):
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations), result
+
+
+# Ligne de rapport pour une étape mesurée
+def make_row(media, case, stage, seconds, amount, unit):
+    return {
+        'media': media,
+        'case': case,
+        'stage': stage,
+        'seconds': round(seconds, 4),
+        'throughput': round(amount / seconds, 3) if seconds > 0 else None,
+        'unit': unit,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+#------------------------------------------------------------------#
+#                          Benchmarks                              #
+#------------------------------------------------------------------#
+
+# Images: décodage, débruitage, couleurs, netteté, encodage et traitement complet
+def bench_images(config, work_dir, sizes, repeat):
+    import cv2
+    from .processors.image_processor import ImageProcessor
+    processor = ImageProcessor(config)
+    denoise = find_stage(config.get_pipeline('image'), 'denoise')
+    rows = []
+    
+    for width, height in sizes:
+        case = f"{width}x{height}"
+        path = make_image(os.path.join(work_dir, f"image_{case}.png"), width, height)
+        megapixels = width * height / 1e6
+        
+        seconds, image = timed(lambda: cv2.imread(path), repeat)
+        rows.append(make_row('image', case, 'decode', seconds, megapixels, 'MP/s'))
+        seconds, denoised = timed(lambda: processor.denoise_image(image, denoise) if denoise else image, repeat)
+        rows.append(make_row('image', case, 'denoise', seconds, megapixels, 'MP/s'))
+        seconds, colored = timed(lambda: processor.adjust_colors(denoised), repeat)
+        rows.append(make_row('image', case, 'colors', seconds, megapixels, 'MP/s'))
+        seconds, sharpened = timed(lambda: processor.enhance_sharpness(colored), repeat)
+        rows.append(make_row('image', case, 'sharpen', seconds, megapixels, 'MP/s'))
+        seconds, _ = timed(lambda: cv2.imencode('.jpg', sharpened, [cv2.IMWRITE_JPEG_QUALITY, processor.image_params['quality']]), repeat)
+        rows.append(make_row('image', case, 'encode', seconds, megapixels, 'MP/s'))
+        
+        output_path = os.path.join(work_dir, f"image_{case}_refined.jpg")
+        seconds, _ = timed(lambda: processor.process_image(path, output_path), repeat)
+        rows.append(make_row('image', case, 'total', seconds, megapixels, 'MP/s'))
+    return rows
+
+
+# Audio: chargement, chaîne spectrale, clarté, dynamique et traitement complet (après un échauffement JIT);
+# la dynamique est aussi mesurée une fois avec la boucle historique et la boucle de même algorithme
+def bench_audio(config, work_dir, lengths, repeat):
+    import librosa
+    from .processors.audio_processor import AudioProcessor, spectral_click_kernel
+    processor = AudioProcessor(config)
+    spectral_step = find_stage(config.get_pipeline('audio'), 'spectral') or {'clicks': False}
+    rows = []
+    
+    warmup_path = make_wav(os.path.join(work_dir, 'audio_warmup.wav'), 0.5)
+    processor.process_audio(warmup_path, os.path.join(work_dir, 'audio_warmup_refined.wav'))
+    
+    for seconds_long in lengths:
+        case = f"{seconds_long}s"
+        path = make_wav(os.path.join(work_dir, f"audio_{case}.wav"), seconds_long)
+        
+        seconds, (audio, sr) = timed(lambda: librosa.load(path, sr=None), repeat)
+        rows.append(make_row('audio', case, 'load', seconds, seconds_long, 'audio-s/s'))
+        seconds, spectral = timed(lambda: processor.apply_spectral_chain(audio, sr, click_kernel=spectral_click_kernel(spectral_step)), repeat)
+        rows.append(make_row('audio', case, 'spectral', seconds, seconds_long, 'audio-s/s'))
+        seconds, clear = timed(lambda: processor.enhance_clarity(spectral, sr), repeat)
+        rows.append(make_row('audio', case, 'clarity', seconds, seconds_long, 'audio-s/s'))
+        seconds, _ = timed(lambda: processor.enhance_dynamics(clear, sr), repeat)
+        rows.append(make_row('audio', case, 'dynamics', seconds, seconds_long, 'audio-s/s'))
+        seconds, _ = timed(lambda: legacy_compressor(clear), 1)
+        rows.append(make_row('audio', case, 'dynamics[legacy]', seconds, seconds_long, 'audio-s/s'))
+        seconds, _ = timed(lambda: reference_compressor(clear, sr, processor.dynamics_params), 1)
+        rows.append(make_row('audio', case, 'dynamics[reference]', seconds, seconds_long, 'audio-s/s'))
+        
+        output_path = os.path.join(work_dir, f"audio_{case}_refined.wav")
+        seconds, _ = timed(lambda: processor.process_audio(path, output_path), repeat)
+        rows.append(make_row('audio', case, 'total', seconds, seconds_long, 'audio-s/s'))
+    return rows
+
+
+# Vidéo: décodage, pipeline de frames pour chaque niveau de débruitage et traitement complet
+def bench_video(config, work_dir, sizes, repeat):
+    import cv2
+    from .processors.video_processor import VideoProcessor
+    rows = []
+    
+    for width, height, frame_count in sizes:
+        case = f"{width}x{height}"
+        path = make_video(os.path.join(work_dir, f"video_{case}.avi"), width, height, frame_count)
+        
+        def decode():
+            cap = cv2.VideoCapture(path)
+            frames = []
+            try:
+                while True:
+                    ret, frame = cap.read()
+                    if not ret:
+                        return frames
+                    frames.append(frame)
+            finally:
+                cap.release()
+        
+        seconds, frames = timed(decode, repeat)
+        rows.append(make_row('video', case, 'decode', seconds, len(frames), 'fps'))
+        
+        default_tier = config.video_denoise
+        for tier in DENOISE_TIERS:
+            config.video_denoise = tier
+            processor = VideoProcessor(config)
+            plan = processor.plan_resolution(width, height)
+            
+            def run_pipeline():
+                source = iter(frames)
+                return processor.run_frame_pipeline(lambda: next(source, None), lambda frame: None, plan)
+            
+            seconds, _ = timed(run_pipeline, repeat)
+            rows.append(make_row('video', case, f"frames[{tier}]", seconds, len(frames), 'fps'))
+        config.video_denoise = default_tier
+        
+        processor = VideoProcessor(config)
+        output_path = os.path.join(work_dir, f"video_{case}_refined.mp4")
+        info = {}
+        
+        def process():
+            shutil.rmtree(os.path.join(config.output_dir, '.cache'), ignore_errors=True)
+            return processor.process_video(path, output_path, info)
+        
+        seconds, _ = timed(process, repeat)
+        rows.append(make_row('video', case, f"total[{info.get('backend')}]", seconds, len(frames), 'fps'))
+    return rows
+
+
+# Exécution de la suite complète (ou d'un type de média) et rapport
+def run_benchmarks(media=('image', 'audio', 'video'), quick=False, repeat=3, config=None) -> dict:
+    config = config or Config()
+    config.result_cache = False
+    config.preserve_original = False
+    
+    results = []
+    with scratch_space(config).job() as work_dir:
+        config.output_dir = os.path.join(work_dir, 'refined')
+        os.makedirs(config.output_dir, exist_ok=True)
+        
+        if 'image' in media:
+            results += bench_images(config, work_dir, QUICK_IMAGE_SIZES if quick else IMAGE_SIZES, repeat)
+        if 'audio' in media:
+            results += bench_audio(config, work_dir, QUICK_AUDIO_LENGTHS if quick else AUDIO_LENGTHS, repeat)
+        if 'video' in media:
+            results += bench_video(config, work_dir, QUICK_VIDEO_SIZES if quick else VIDEO_SIZES, repeat)
+    
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': repeat,
+            'quick': quick,
+            'speed': config.speed
+        },
+        'results': results,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+# Rapport sous forme de tableau texte
+def format_table(report) -> str:
+    header = f"{'media':<6} {'case':<10} {'stage':<20} {'seconds':>9} {'throughput':>12} {'unit':<10} {'rss MB':>8}"
+    lines = [header, '-' * len(header)]
+    for row in report['results']:
+        throughput = '-' if row['throughput'] is None else f"{row['throughput']:.2f}"
+        rss = '-' if row['peak_rss_mb'] is None else f"{row['peak_rss_mb']:.1f}"
+        lines.append(f"{row['media']:<6} {row['case']:<10} {row['stage']:<20} {row['seconds']:>9.4f} {throughput:>12} {row['unit']:<10} {rss:>8}")
+    return '\n'.join(lines)
+
+
+# Rapport JSON
+def format_json(report) -> str:
+    return json.dumps(report, indent=2)
@@ -27,11 +27,17 @@ def cli(ctx, version):
 @click.argument('file_path', type=click.Path(exists=True))
 @click.option('--output', '-o', type=click.Path(), help='Output file path')
 @click.option('--video-quality', type=click.Choice(['hd', 'fhd', '4k']), default='hd', help='Video quality preset')
+@click.option('--speed', default='max', help='Speed/quality tier: fast, balanced, max (or a tier from --speed-tiers)')
+@click.option('--speed-tiers', type=click.Path(exists=True, dir_okay=False), help='JSON file defining or overriding speed tiers')
+@click.option('--video-denoise', type=click.Choice(['off', 'fast', 'temporal', 'quality']), help='Video denoising tier (overrides the speed tier)')
 @click.option('--audio-quality', type=click.Choice(['medium', 'high', 'lossless']), default='high', help='Audio quality preset')
 @click.option('--image-quality', type=click.Choice(['medium', 'high', 'max']), default='high', help='Image quality preset')
 @click.option('--preserve-original/--no-preserve-original', default=True, help='Keep original files')
+@click.option('--backup-strategy', type=click.Choice(['reflink', 'hardlink', 'copy', 'none']), default='reflink', help='How originals are preserved')
+@click.option('--cache/--no-cache', default=True, help='Reuse outputs of unchanged files')
+@click.option('--trace', 'trace_path', type=click.Path(), help='Write a Chrome/Perfetto trace of pipeline stages')
 @click.option('--output-dir', type=click.Path(), help='Output directory')
-def file(file_path, output, video_quality, audio_quality, image_quality, preserve_original, output_dir):
+def file(file_path, output, video_quality, speed, speed_tiers, video_denoise, audio_quality, image_quality, preserve_original, backup_strategy, cache, trace_path, output_dir):
     """Process a single media file"""
     engine = MediaRefinerEngine()
     
@@ -39,11 +45,18 @@ def file(file_path, output, video_quality, audio_quality, image_quality, preserv
         engine.config.output_dir = output_dir
     
     engine.config.video_quality = video_quality
+    engine.config.speed = speed
+    engine.config.video_denoise = video_denoise
     engine.config.audio_quality = audio_quality
     engine.config.image_quality = image_quality
     engine.config.preserve_original = preserve_original
+    engine.config.backup_strategy = backup_strategy
+    engine.config.result_cache = cache
+    engine.config.trace_path = trace_path
     
     try:
+        if speed_tiers:
+            engine.config.load_speed_tiers(speed_tiers)
         engine.initialize()
         
         with click.progressbar(length=1, label='Processing file') as bar:
@@ -68,12 +81,25 @@ def file(file_path, output, video_quality, audio_quality, image_quality, preserv
 @click.argument('directory_path', type=click.Path(exists=True, file_okay=False))
 @click.option('--recursive/--no-recursive', default=True, help='Process subdirectories')
 @click.option('--video-quality', type=click.Choice(['hd', 'fhd', '4k']), default='hd', help='Video quality preset')
+@click.option('--speed', default='max', help='Speed/quality tier: fast, balanced, max (or a tier from --speed-tiers)')
+@click.option('--speed-tiers', type=click.Path(exists=True, dir_okay=False), help='JSON file defining or overriding speed tiers')
+@click.option('--video-denoise', type=click.Choice(['off', 'fast', 'temporal', 'quality']), help='Video denoising tier (overrides the speed tier)')
 @click.option('--audio-quality', type=click.Choice(['medium', 'high', 'lossless']), default='high', help='Audio quality preset')
 @click.option('--image-quality', type=click.Choice(['medium', 'high', 'max']), default='high', help='Image quality preset')
 @click.option('--preserve-original/--no-preserve-original', default=True, help='Keep original files')
+@click.option('--backup-strategy', type=click.Choice(['reflink', 'hardlink', 'copy', 'none']), default='reflink', help='How originals are preserved')
+@click.option('--cache/--no-cache', default=True, help='Reuse outputs of unchanged files')
+@click.option('--trace', 'trace_path', type=click.Path(), help='Write a Chrome/Perfetto trace of pipeline stages')
 @click.option('--output-dir', type=click.Path(), help='Output directory')
 @click.option('--max-workers', type=int, default=4, help='Number of parallel workers')
-def directory(directory_path, recursive, video_quality, audio_quality, image_quality, preserve_original, output_dir, max_workers):
+@click.option('--executor', type=click.Choice(['thread', 'process']), default='thread', help='Parallel execution backend')
+@click.option('--incremental', is_flag=True, help='Only process new or changed files')
+@click.option('--video-slots', type=int, help='Maximum concurrent video jobs')
+@click.option('--audio-slots', type=int, help='Maximum concurrent audio jobs')
+@click.option('--image-slots', type=int, help='Maximum concurrent image jobs')
+@click.option('--io-workers', type=int, default=2, help='Image read-ahead and writer threads')
+def directory(directory_path, recursive, video_quality, speed, speed_tiers, video_denoise, audio_quality, image_quality, preserve_original, backup_strategy, cache, trace_path, output_dir, max_workers, executor, incremental,
+              video_slots, audio_slots, image_slots, io_workers):
     """Process all media files in a directory"""
     engine = MediaRefinerEngine()
     
@@ -81,22 +107,91 @@ def directory(directory_path, recursive, video_quality, audio_quality, image_qua
         engine.config.output_dir = output_dir
     
     engine.config.video_quality = video_quality
+    engine.config.speed = speed
+    engine.config.video_denoise = video_denoise
     engine.config.audio_quality = audio_quality
     engine.config.image_quality = image_quality
     engine.config.preserve_original = preserve_original
+    engine.config.backup_strategy = backup_strategy
+    engine.config.result_cache = cache
+    engine.config.trace_path = trace_path
+    engine.config.lane_limits = {'video': video_slots, 'audio': audio_slots, 'image': image_slots}
+    engine.config.image_io_workers = io_workers
     
     try:
+        if speed_tiers:
+            engine.config.load_speed_tiers(speed_tiers)
         engine.initialize()
         
         click.echo(f"Scanning directory: {directory_path}")
-        result = engine.process_directory(directory_path, recursive, max_workers)
+        result = engine.process_directory(directory_path, recursive, max_workers, executor, incremental)
         
         if result.get('status') == 'failed':
             click.echo(f"✗ {result['error']}")
             sys.exit(1)
         
         print_results(result)
+        report = engine.generate_report()
+        print_timings(report['timings'])
+        print_pipeline(report['image_pipeline'])
+    
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+        sys.exit(1)
+    
+    finally:
+        engine.cleanup()
+
+
+@cli.command()
+@click.argument('directory_path', type=click.Path(exists=True, file_okay=False))
+@click.option('--recursive/--no-recursive', default=True, help='Watch subdirectories')
+@click.option('--video-quality', type=click.Choice(['hd', 'fhd', '4k']), default='hd', help='Video quality preset')
+@click.option('--speed', default='max', help='Speed/quality tier: fast, balanced, max (or a tier from --speed-tiers)')
+@click.option('--speed-tiers', type=click.Path(exists=True, dir_okay=False), help='JSON file defining or overriding speed tiers')
+@click.option('--video-denoise', type=click.Choice(['off', 'fast', 'temporal', 'quality']), help='Video denoising tier (overrides the speed tier)')
+@click.option('--audio-quality', type=click.Choice(['medium', 'high', 'lossless']), default='high', help='Audio quality preset')
+@click.option('--image-quality', type=click.Choice(['medium', 'high', 'max']), default='high', help='Image quality preset')
+@click.option('--preserve-original/--no-preserve-original', default=True, help='Keep original files')
+@click.option('--backup-strategy', type=click.Choice(['reflink', 'hardlink', 'copy', 'none']), default='reflink', help='How originals are preserved')
+@click.option('--cache/--no-cache', default=True, help='Reuse outputs of unchanged files')
+@click.option('--trace', 'trace_path', type=click.Path(), help='Write a Chrome/Perfetto trace of pipeline stages')
+@click.option('--output-dir', type=click.Path(), help='Output directory')
+@click.option('--max-workers', type=int, default=4, help='Number of parallel workers')
+@click.option('--executor', type=click.Choice(['thread', 'process']), default='thread', help='Parallel execution backend')
+@click.option('--settle-time', type=float, default=2.0, help='Seconds a file must stay unchanged before processing')
+def watch(directory_path, recursive, video_quality, speed, speed_tiers, video_denoise, audio_quality, image_quality, preserve_original, backup_strategy, cache, trace_path, output_dir, max_workers, executor, settle_time):
+    """Watch a directory and process media files as they land"""
+    engine = MediaRefinerEngine()
+    
+    if output_dir:
+        engine.config.output_dir = output_dir
+    
+    engine.config.video_quality = video_quality
+    engine.config.speed = speed
+    engine.config.video_denoise = video_denoise
+    engine.config.audio_quality = audio_quality
+    engine.config.image_quality = image_quality
+    engine.config.preserve_original = preserve_original
+    engine.config.backup_strategy = backup_strategy
+    engine.config.result_cache = cache
+    engine.config.trace_path = trace_path
+    
+    try:
+        if speed_tiers:
+            engine.config.load_speed_tiers(speed_tiers)
+        engine.initialize()
         
+        click.echo(f"Watching directory: {directory_path} (Ctrl+C to stop)")
+        for result in engine.watch_directory(directory_path, recursive, max_workers, executor, settle_time):
+            if result['status'] == 'success':
+                click.echo(f"✓ {result['input_path']} -> {result['output_path']}")
+            else:
+                click.echo(f"✗ {result['input_path']}: {result.get('error', 'Unknown error')}")
+    
+    except KeyboardInterrupt:
+        click.echo("\nStopped watching")
+    
     except Exception as e:
         click.echo(f"Error: {str(e)}")
         sys.exit(1)
@@ -108,12 +203,24 @@ def directory(directory_path, recursive, video_quality, audio_quality, image_qua
 @cli.command()
 @click.argument('files', nargs=-1, required=True, type=click.Path(exists=True))
 @click.option('--video-quality', type=click.Choice(['hd', 'fhd', '4k']), default='hd', help='Video quality preset')
+@click.option('--speed', default='max', help='Speed/quality tier: fast, balanced, max (or a tier from --speed-tiers)')
+@click.option('--speed-tiers', type=click.Path(exists=True, dir_okay=False), help='JSON file defining or overriding speed tiers')
+@click.option('--video-denoise', type=click.Choice(['off', 'fast', 'temporal', 'quality']), help='Video denoising tier (overrides the speed tier)')
 @click.option('--audio-quality', type=click.Choice(['medium', 'high', 'lossless']), default='high', help='Audio quality preset')
 @click.option('--image-quality', type=click.Choice(['medium', 'high', 'max']), default='high', help='Image quality preset')
 @click.option('--preserve-original/--no-preserve-original', default=True, help='Keep original files')
+@click.option('--backup-strategy', type=click.Choice(['reflink', 'hardlink', 'copy', 'none']), default='reflink', help='How originals are preserved')
+@click.option('--cache/--no-cache', default=True, help='Reuse outputs of unchanged files')
+@click.option('--trace', 'trace_path', type=click.Path(), help='Write a Chrome/Perfetto trace of pipeline stages')
 @click.option('--output-dir', type=click.Path(), help='Output directory')
 @click.option('--max-workers', type=int, default=4, help='Number of parallel workers')
-def batch(files, video_quality, audio_quality, image_quality, preserve_original, output_dir, max_workers):
+@click.option('--executor', type=click.Choice(['thread', 'process']), default='thread', help='Parallel execution backend')
+@click.option('--video-slots', type=int, help='Maximum concurrent video jobs')
+@click.option('--audio-slots', type=int, help='Maximum concurrent audio jobs')
+@click.option('--image-slots', type=int, help='Maximum concurrent image jobs')
+@click.option('--io-workers', type=int, default=2, help='Image read-ahead and writer threads')
+def batch(files, video_quality, speed, speed_tiers, video_denoise, audio_quality, image_quality, preserve_original, backup_strategy, cache, trace_path, output_dir, max_workers, executor,
+          video_slots, audio_slots, image_slots, io_workers):
     """Process multiple media files"""
     engine = MediaRefinerEngine()
     
@@ -121,11 +228,20 @@ def batch(files, video_quality, audio_quality, image_quality, preserve_original,
         engine.config.output_dir = output_dir
     
     engine.config.video_quality = video_quality
+    engine.config.speed = speed
+    engine.config.video_denoise = video_denoise
     engine.config.audio_quality = audio_quality
     engine.config.image_quality = image_quality
     engine.config.preserve_original = preserve_original
+    engine.config.backup_strategy = backup_strategy
+    engine.config.result_cache = cache
+    engine.config.trace_path = trace_path
+    engine.config.lane_limits = {'video': video_slots, 'audio': audio_slots, 'image': image_slots}
+    engine.config.image_io_workers = io_workers
     
     try:
+        if speed_tiers:
+            engine.config.load_speed_tiers(speed_tiers)
         engine.initialize()
         
         valid_files = [f for f in files if os.path.isfile(f)]
@@ -134,10 +250,13 @@ def batch(files, video_quality, audio_quality, image_quality, preserve_original,
             sys.exit(1)
         
         click.echo(f"Processing {len(valid_files)} files...")
-        result = engine.process_batch(valid_files, max_workers)
+        result = engine.process_batch(valid_files, max_workers, executor)
         
         print_results(result)
-        
+        report = engine.generate_report()
+        print_timings(report['timings'])
+        print_pipeline(report['image_pipeline'])
+    
     except Exception as e:
         click.echo(f"Error: {str(e)}")
         sys.exit(1)
@@ -150,8 +269,11 @@ def batch(files, video_quality, audio_quality, image_quality, preserve_original,
 @click.argument('input_path', type=click.Path(exists=True))
 @click.option('--media-type', type=click.Choice(['image', 'audio', 'video']), required=True, help='Media type to process')
 @click.option('--quality', type=str, help='Quality preset for the media type')
+@click.option('--speed', default='max', help='Speed/quality tier: fast, balanced, max (or a tier from --speed-tiers)')
+@click.option('--speed-tiers', type=click.Path(exists=True, dir_okay=False), help='JSON file defining or overriding speed tiers')
 @click.option('--output-dir', type=click.Path(), help='Output directory')
-def filter(input_path, media_type, quality, output_dir):
+@click.option('--executor', type=click.Choice(['thread', 'process']), default='thread', help='Parallel execution backend')
+def filter(input_path, media_type, quality, speed, speed_tiers, output_dir, executor):
     """Process files by media type"""
     engine = MediaRefinerEngine()
     
@@ -165,8 +287,11 @@ def filter(input_path, media_type, quality, output_dir):
             engine.config.audio_quality = quality
         elif media_type == 'image':
             engine.config.image_quality = quality
+    engine.config.speed = speed
     
     try:
+        if speed_tiers:
+            engine.config.load_speed_tiers(speed_tiers)
         engine.initialize()
         
         if os.path.isfile(input_path):
@@ -174,14 +299,17 @@ def filter(input_path, media_type, quality, output_dir):
         else:
             file_paths = engine.file_handler.scan_directory(input_path)
         
-        result = engine.process_by_media_type(file_paths, media_type)
+        result = engine.process_by_media_type(file_paths, media_type, executor=executor)
         
         if result.get('status') == 'failed':
             click.echo(f"✗ {result['error']}")
             sys.exit(1)
         
         print_results(result)
-        
+        report = engine.generate_report()
+        print_timings(report['timings'])
+        print_pipeline(report['image_pipeline'])
+    
     except Exception as e:
         click.echo(f"Error: {str(e)}")
         sys.exit(1)
@@ -198,26 +326,58 @@ def info(input_path):
     
     try:
         if os.path.isfile(input_path):
-            file_paths = [input_path]
+            media_type = engine.file_handler.detect_media_type(input_path)
+            media_files = [(input_path, media_type, os.path.getsize(input_path))] if media_type else []
         else:
-            file_paths = engine.file_handler.scan_directory(input_path)
-        
-        click.echo(f"Media files found: {len(file_paths)}")
+            media_files = engine.file_handler.iter_media_files(input_path)
         
         types_count = {'image': 0, 'audio': 0, 'video': 0}
         total_size = 0
         
-        for file_path in file_paths:
-            media_type = engine.file_handler.detect_media_type(file_path)
-            if media_type:
-                types_count[media_type] += 1
-                total_size += os.path.getsize(file_path)
+        for file_path, media_type, size in media_files:
+            types_count[media_type] += 1
+            total_size += size
         
+        click.echo(f"Media files found: {sum(types_count.values())}")
         click.echo(f"Images: {types_count['image']}")
         click.echo(f"Audio files: {types_count['audio']}")
         click.echo(f"Video files: {types_count['video']}")
         click.echo(f"Total size: {format_size(total_size)}")
+    
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+        sys.exit(1)
+
+
+
+@cli.command()
+@click.option('--media', type=click.Choice(['all', 'image', 'audio', 'video']), default='all', help='Pipelines to benchmark')
+@click.option('--quick', is_flag=True, help='Use small inputs for a fast run')
+@click.option('--repeat', type=int, default=3, help='Runs per measurement (median is reported)')
+@click.option('--speed', default='max', help='Speed/quality tier of the measured pipelines')
+@click.option('--json', 'json_path', type=click.Path(), help='Write the JSON report to a file ("-" for stdout)')
+def bench(media, quick, repeat, speed, json_path):
+    """Benchmark the pipelines on synthetic media"""
+    from .bench import run_benchmarks, format_table, format_json
+    
+    try:
+        media_types = ('image', 'audio', 'video') if media == 'all' else (media,)
+        config = Config()
+        config.speed = speed
+        config.validate_pipelines()
+        report = run_benchmarks(media_types, quick, max(repeat, 1), config)
+        
+        if json_path == '-':
+            click.echo(format_json(report))
+            return
         
+        click.echo(format_table(report))
+        click.echo(f"\nPeak RSS: {report['peak_rss_mb']} MB")
+        if json_path:
+            with open(json_path, 'w', encoding='utf-8') as f:
+                f.write(format_json(report))
+            click.echo(f"JSON report written to {json_path}")
+    
     except Exception as e:
         click.echo(f"Error: {str(e)}")
         sys.exit(1)
@@ -236,12 +396,45 @@ def print_results(result):
     click.echo(f"✓ Processed: {success_count}/{total}")
     click.echo(f"✗ Failed: {failed_count}/{total}")
     
+    if result.get('skipped'):
+        click.echo(f"↷ Unchanged (skipped): {len(result['skipped'])}")
+    
+    cached_count = sum(1 for detail in result.get('details', []) if detail.get('cached'))
+    if cached_count > 0:
+        click.echo(f"↺ From cache: {cached_count}/{total}")
+    
     if failed_count > 0:
         click.echo(f"\nFailed files:")
         for file_path in result['failed']:
             click.echo(f"  - {file_path}")
 
 
+def print_timings(timings, limit=8):
+    stages = [(name, timing) for name, timing in timings.items() if name != 'job'][:limit]
+    if not stages:
+        return
+    
+    click.echo(f"\nTime by stage:")
+    for name, timing in stages:
+        throughput = ""
+        if timing['throughput'] and timing['unit'] == 'bytes':
+            throughput = f", {format_size(timing['throughput'])}/s"
+        elif timing['throughput']:
+            throughput = f", {timing['throughput']:.1f} {timing['unit']}/s"
+        click.echo(f"  {name:<24} {timing['wall']:>9.2f}s wall {timing['cpu']:>9.2f}s cpu{throughput}")
+
+
+def print_pipeline(stats):
+    if not stats:
+        return
+    
+    compute = stats['stages']['compute']
+    active = compute['busy'] + compute['idle']
+    usage = compute['busy'] / active * 100 if active > 0 else 0
+    queues = ', '.join(f"{name} {queue['mean']:.1f}/{queue['capacity']} (max {queue['max']})" for name, queue in stats['queues'].items())
+    click.echo(f"\nImage pipeline: compute busy {usage:.0f}%, queues {queues}")
+
+
 def format_size(size_bytes):
     if size_bytes == 0:
         return "0B"
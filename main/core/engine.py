@@ -1,12 +1,17 @@
 from ..utils.config import Config
 from ..utils.file_handler import FileHandler
-from ..processors.image_processor import ImageProcessor
-from ..processors.audio_processor import AudioProcessor
-from ..processors.video_processor import VideoProcessor
+from ..utils.cache import ResultCache
+from ..utils.manifest import Manifest
+from ..utils.watcher import DirectoryWatcher
+from ..utils.profiling import StageTotals, TraceRecorder, job_profile, stage
+from .scheduler import JobScheduler
+from .image_pipeline import ImageIOPipeline
 from tqdm import tqdm
 import os
+import itertools
 import threading
-from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
 
 
 
@@ -18,99 +23,370 @@ class MediaRefinerEngine:
     def __init__(self, config=None):
         self.config = config or Config()
         self.file_handler = FileHandler(self.config)
-        self.image_processor = ImageProcessor(self.config)
-        self.audio_processor = AudioProcessor(self.config)
-        self.video_processor = VideoProcessor(self.config)
+        self.result_cache = ResultCache(self.config)
+        self._processors = {}
+        self._processors_lock = threading.Lock()
         self.results = {'processed': 0, 'failed': 0, 'skipped': 0}
+        self.timings = StageTotals()
+        self.tracer = TraceRecorder()
+        self.image_pipeline = None
+        self.pipeline_stats = None
+        self._manifest = None
+
+
+    # Processeur d'un type de média, importé et construit au premier fichier de ce type
+    def get_processor(self, media_type: str):
+        processor = self._processors.get(media_type)
+        if processor is None:
+            with self._processors_lock:
+                processor = self._processors.get(media_type)
+                if processor is None:
+                    if media_type == 'image':
+                        from ..processors.image_processor import ImageProcessor as processor_class
+                    elif media_type == 'audio':
+                        from ..processors.audio_processor import AudioProcessor as processor_class
+                    else:
+                        from ..processors.video_processor import VideoProcessor as processor_class
+                    processor = processor_class(self.config)
+                    self._processors[media_type] = processor
+        return processor
+
+
+    # Processeur image (chargé à la demande)
+    @property
+    def image_processor(self):
+        return self.get_processor('image')
+
+
+    # Processeur audio (chargé à la demande)
+    @property
+    def audio_processor(self):
+        return self.get_processor('audio')
+
+
+    # Processeur vidéo (chargé à la demande)
+    @property
+    def video_processor(self):
+        return self.get_processor('video')
+
+
+    # Manifeste persistant des fichiers traités (ouvert au premier usage)
+    @property
+    def manifest(self):
+        if self._manifest is None:
+            self._manifest = Manifest(os.path.join(self.config.output_dir, '.cache', 'manifest.db'))
+        return self._manifest
 
 
     # Initialisation de l'environnement
     def initialize(self):
+        self.config.validate_pipelines()
         self.config.ensure_output_dirs()
         self.file_handler.cleanup_temp_files()
 
 
-    # Traitement d'un fichier unique
-    def process_single_file(self, file_path: str, output_path: str = None) -> dict:
+    # Traitement d'un fichier unique, mesuré étape par étape si le profilage est actif
+    def process_single_file(self, file_path: str, output_path: str = None, media: dict = None) -> dict:
+        if not self.config.profiling:
+            return self.refine_file(file_path, output_path, media)
+        
+        with job_profile(file_path, trace=bool(self.config.trace_path)) as profile:
+            with stage('job', unit='files') as timer:
+                result = self.refine_file(file_path, output_path, media)
+                timer.amount = 1
+        
+        return self.attach_timings(result, profile)
+
+
+    # Mesures du job jointes au résultat, cumulées dans le rapport et ajoutées à la trace
+    def attach_timings(self, result: dict, profile) -> dict:
+        result['timings'] = profile.timings()
+        self.timings.add(result['timings'])
+        if profile.trace:
+            self.tracer.extend(profile.events)
+        return result
+
+
+    # Traitement d'un fichier: préparation, processeur du type de média, finalisation
+    # (media: sonde vidéo déjà faite par l'ordonnanceur, réutilisée par le processeur)
+    def refine_file(self, file_path: str, output_path: str = None, media: dict = None) -> dict:
+        job, result = self.prepare_file(file_path, output_path, media)
+        if result is not None:
+            return result
+        
+        if job['media_type'] == 'image':
+            success = self.image_processor.process_image(file_path, job['output_path'], job['info'])
+        elif job['media_type'] == 'audio':
+            success = self.audio_processor.process_audio(file_path, job['output_path'], job['info'])
+        else:
+            success = self.video_processor.process_video(file_path, job['output_path'], job['info'])
+        return self.finish_file(job, success)
+
+
+    # Préparation: validation, chemin de sortie, cache et sauvegarde; (job, None) ou (None, résultat final)
+    def prepare_file(self, file_path: str, output_path: str = None, media: dict = None):
         if not self.file_handler.validate_file(file_path):
-            return {'status': 'failed', 'error': 'Invalid file'}
+            return None, {'status': 'failed', 'input_path': file_path, 'error': 'Invalid file'}
         
         media_type = self.file_handler.detect_media_type(file_path)
         if not media_type:
-            return {'status': 'failed', 'error': 'Unsupported format'}
+            return None, {'status': 'failed', 'input_path': file_path, 'error': 'Unsupported format'}
         
         if not self.file_handler.check_disk_space(file_path):
-            return {'status': 'failed', 'error': 'Insufficient disk space'}
+            return None, {'status': 'failed', 'input_path': file_path, 'error': 'Insufficient disk space'}
         
         if not output_path:
             output_path = self.file_handler.generate_output_path(file_path)
         
-        backup_path = self.file_handler.backup_original(file_path)
+        cache_key = None
+        if self.config.result_cache:
+            with stage('cache.fetch'):
+                cache_key = self.result_cache.make_key(file_path, media_type, output_path)
+                hit = self.result_cache.fetch(cache_key, output_path)
+            if hit:
+                self.file_handler.log_processed_file(file_path, output_path, 'success', {'cached': True})
+                return None, {
+                    'status': 'success',
+                    'input_path': file_path,
+                    'output_path': output_path,
+                    'backup_path': None,
+                    'media_type': media_type,
+                    'cached': True
+                }
         
-        success = False
-        if media_type == 'image':
-            success = self.image_processor.process_image(file_path, output_path)
-        elif media_type == 'audio':
-            success = self.audio_processor.process_audio(file_path, output_path)
-        elif media_type == 'video':
-            success = self.video_processor.process_video(file_path, output_path)
+        with stage('backup'):
+            backup_path = self.file_handler.backup_original(file_path)
+        
+        job = {
+            'input_path': file_path,
+            'output_path': output_path,
+            'media_type': media_type,
+            'cache_key': cache_key,
+            'backup_path': backup_path,
+            'info': {'speed': self.config.speed}
+        }
+        if media is not None:
+            job['info']['media'] = media
+        return job, None
+
+
+    # Finalisation: mise en cache, journal et résultat
+    def finish_file(self, job: dict, success: bool) -> dict:
+        if success and job['cache_key']:
+            with stage('cache.store'):
+                self.result_cache.store(job['cache_key'], job['output_path'])
         
         status = 'success' if success else 'failed'
-        self.file_handler.log_processed_file(file_path, output_path, status)
+        self.file_handler.log_processed_file(job['input_path'], job['output_path'], status, job['info'])
         
-        return {
+        result = {
             'status': status,
-            'input_path': file_path,
-            'output_path': output_path if success else None,
-            'backup_path': backup_path,
-            'media_type': media_type
+            'input_path': job['input_path'],
+            'output_path': job['output_path'] if success else None,
+            'backup_path': job['backup_path'],
+            'media_type': job['media_type'],
+            'cached': False
         }
+        result.update(job['info'])
+        return result
 
 
     # Traitement par lot avec barre de progression
-    def process_batch(self, file_paths: list, max_workers: int = 4) -> dict:
+    def process_batch(self, file_paths: list, max_workers: int = 4, executor: str = 'thread') -> dict:
         results = {'success': [], 'failed': [], 'details': []}
         
-        with tqdm(total=len(file_paths), desc="Processing files") as pbar:
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = {executor.submit(self.process_single_file, path): path for path in file_paths}
+        total = len(file_paths) if hasattr(file_paths, '__len__') else 0
+        with tqdm(total=total, desc="Processing files") as pbar:
+            if not hasattr(file_paths, '__len__'):
+                file_paths = self.count_discovered(file_paths, pbar)
+            for result in self.iter_process(file_paths, max_workers, executor):
+                results['details'].append(result)
                 
-                for future in futures:
-                    result = future.result()
-                    results['details'].append(result)
+                if result['status'] == 'success':
+                    results['success'].append(result['output_path'])
+                else:
+                    results['failed'].append(result['input_path'])
+                
+                pbar.update(1)
+        
+        return results
+
+
+    # Fichiers découverts au fil du scan: le total de la barre de progression suit le parcours
+    def count_discovered(self, file_paths, pbar):
+        for file_path in file_paths:
+            pbar.total += 1
+            yield file_path
+
+
+    # Résultats produits dans l'ordre de complétion; ordonnancement du plus long au plus court par type
+    def iter_process(self, file_paths, max_workers: int = 4, executor: str = 'thread'):
+        pipeline = self.open_image_pipeline(executor, max_workers)
+        extra_slots = {'image': pipeline.extra_slots} if pipeline else None
+        pending_paths = iter(file_paths)
+        exhausted = False
+        
+        with self.create_executor(executor, max_workers) as pool, ThreadPoolExecutor(self.config.probe_workers) as probe_pool:
+            scheduler = JobScheduler(self.config, max_workers, self.file_handler.detect_media_type, extra_slots, probe_pool)
+            futures = {}
+            lanes = {}
+            try:
+                while True:
+                    while not exhausted and not scheduler.is_full():
+                        file_path = next(pending_paths, None)
+                        if file_path is None:
+                            exhausted = True
+                        else:
+                            scheduler.add(file_path)
                     
-                    if result['status'] == 'success':
-                        results['success'].append(result['output_path'])
-                        self.results['processed'] += 1
-                    else:
-                        results['failed'].append(result['input_path'])
-                        self.results['failed'] += 1
+                    job = scheduler.pop_ready()
+                    while job is not None:
+                        future = self.submit_job(pool, job[0], executor, job[2])
+                        futures[future] = job[0]
+                        lanes[future] = job[1]
+                        job = scheduler.pop_ready()
+                    
+                    probes = scheduler.pending_probes()
+                    if not futures and not probes:
+                        break
                     
-                    pbar.update(1)
+                    done, _ = wait(list(futures) + probes, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        if future in futures:
+                            scheduler.finished(lanes.pop(future))
+                            yield self.collect_result(future, futures.pop(future), executor)
+            finally:
+                for future in list(futures) + scheduler.pending_probes():
+                    future.cancel()
+                self.close_image_pipeline()
+                self.flush_manifest()
+
+
+    # Soumission d'un fichier au pool d'exécution (les images passent par le pipeline d'E/S s'il est ouvert)
+    def submit_job(self, pool, file_path: str, executor: str, media: dict = None):
+        if executor == 'process':
+            return pool.submit(_run_job, (file_path, None, media))
+        if self.image_pipeline is not None and self.file_handler.detect_media_type(file_path) == 'image':
+            return self.image_pipeline.submit(file_path)
+        return pool.submit(self.process_single_file, file_path, None, media)
+
+
+    # Ouverture du pipeline image lecture / calcul / écriture (exécuteur à threads uniquement)
+    def open_image_pipeline(self, executor: str, max_workers: int):
+        if executor != 'thread' or not self.config.image_pipeline:
+            return None
+        self.image_pipeline = ImageIOPipeline(self, max_workers, self.config.image_io_workers, self.config.image_prefetch)
+        return self.image_pipeline
+
+
+    # Fermeture du pipeline image et conservation de ses statistiques pour le rapport
+    def close_image_pipeline(self):
+        if self.image_pipeline is None:
+            return
+        if self.image_pipeline.threads:
+            self.image_pipeline.close()
+            self.pipeline_stats = self.image_pipeline.stats()
+        self.image_pipeline = None
+
+
+    # Surveillance d'un dossier: les fichiers déposés alimentent un pool unique et durable
+    def watch_directory(self, directory_path: str, recursive: bool = True, max_workers: int = 4,
+                        executor: str = 'thread', settle_time: float = 2.0, poll_interval: float = 1.0):
+        watcher = DirectoryWatcher(directory_path, self.file_handler.detect_media_type, recursive,
+                                   exclude=[self.config.output_dir, self.config.temp_dir],
+                                   settle_time=settle_time, poll_interval=poll_interval)
+        fingerprint = self.result_cache.config_fingerprint()
+        futures = {}
         
-        return results
+        self.open_image_pipeline(executor, max_workers)
+        with self.create_executor(executor, max_workers) as pool:
+            try:
+                for file_path in watcher.iter_ready():
+                    if file_path and file_path not in futures.values() and self.manifest.needs_processing(file_path, fingerprint):
+                        futures[self.submit_job(pool, file_path, executor)] = file_path
+                    
+                    for future in [f for f in futures if f.done()]:
+                        yield self.collect_result(future, futures.pop(future), executor)
+            finally:
+                watcher.close()
+                for future in futures:
+                    future.cancel()
+                self.close_image_pipeline()
+                self.flush_manifest()
+
+
+    # Récupération et comptabilisation du résultat d'un job
+    def collect_result(self, future, file_path: str, executor: str) -> dict:
+        try:
+            result = future.result()
+            if executor == 'process':
+                result, records, events = result
+                self.file_handler.processed_files.extend(records)
+                self.timings.add(result.get('timings'))
+                self.tracer.extend(events)
+        except Exception as e:
+            result = {'status': 'failed', 'input_path': file_path, 'error': str(e)}
+        
+        if result['status'] == 'success':
+            self.results['processed'] += 1
+        else:
+            self.results['failed'] += 1
+        
+        self.manifest.record(file_path, self.result_cache.config_fingerprint(), result['status'], result.get('output_path'))
+        return result
+
+
+    # Validation des enregistrements du manifeste en attente (fin de lot ou de surveillance)
+    def flush_manifest(self):
+        if self._manifest is not None:
+            self._manifest.flush()
+
+
+    # Création du pool d'exécution (threads ou processus démarrés hors fork)
+    def create_executor(self, executor: str, max_workers: int):
+        if executor == 'process':
+            return ProcessPoolExecutor(max_workers=max_workers, mp_context=worker_context(),
+                                       initializer=_init_worker, initargs=(self.config,))
+        if executor == 'thread':
+            return ThreadPoolExecutor(max_workers=max_workers)
+        raise ValueError(f"Unknown executor: {executor}")
 
 
     # Traitement d'un dossier
-    def process_directory(self, directory_path: str, recursive: bool = True, max_workers: int = 4) -> dict:
+    def process_directory(self, directory_path: str, recursive: bool = True, max_workers: int = 4,
+                          executor: str = 'thread', incremental: bool = False) -> dict:
         if not os.path.exists(directory_path):
             return {'status': 'failed', 'error': 'Directory not found'}
         
-        file_paths = self.file_handler.scan_directory(directory_path) if recursive else []
-        if not recursive:
-            for file in os.listdir(directory_path):
-                file_path = os.path.join(directory_path, file)
-                if os.path.isfile(file_path) and self.file_handler.detect_media_type(file_path):
-                    file_paths.append(file_path)
-        
-        if not file_paths:
+        media_files = self.file_handler.iter_media_files(directory_path, recursive)
+        first = next(media_files, None)
+        if first is None:
             return {'status': 'failed', 'error': 'No supported files found'}
         
-        return self.process_batch(file_paths, max_workers)
+        file_paths = (media_file.path for media_file in itertools.chain([first], media_files))
+        unchanged = []
+        if incremental:
+            fingerprint = self.result_cache.config_fingerprint()
+            file_paths = self.skip_unchanged(file_paths, fingerprint, unchanged)
+        
+        results = self.process_batch(file_paths, max_workers, executor)
+        results['skipped'] = unchanged
+        self.results['skipped'] += len(unchanged)
+        return results
+
+
+    # Filtre incrémental: les fichiers inchangés sont écartés (et notés) au fil du scan
+    def skip_unchanged(self, file_paths, fingerprint: str, unchanged: list):
+        for file_path in file_paths:
+            if self.manifest.needs_processing(file_path, fingerprint):
+                yield file_path
+            else:
+                unchanged.append(file_path)
 
 
     # Traitement par type de média
-    def process_by_media_type(self, file_paths: list, media_type: str) -> dict:
+    def process_by_media_type(self, file_paths: list, media_type: str, max_workers: int = 4,
+                              executor: str = 'thread') -> dict:
         filtered_paths = []
         for path in file_paths:
             detected_type = self.file_handler.detect_media_type(path)
@@ -120,7 +396,7 @@ class MediaRefinerEngine:
         if not filtered_paths:
             return {'status': 'failed', 'error': f'No {media_type} files found'}
         
-        return self.process_batch(filtered_paths)
+        return self.process_batch(filtered_paths, max_workers, executor)
 
 
     # Configuration des paramètres de qualité
@@ -144,15 +420,30 @@ class MediaRefinerEngine:
             'failed': self.results['failed'],
             'skipped': self.results['skipped'],
             'success_rate': round(success_rate, 2),
-            'processed_files': self.file_handler.processed_files
+            'processed_files': self.file_handler.processed_files,
+            'timings': self.timings.report(),
+            'image_pipeline': self.pipeline_stats
         }
         
         return report
 
 
+    # Écriture de la trace Chrome/Perfetto des étapes (config.trace_path par défaut)
+    def write_trace(self, path: str = None) -> int:
+        path = path or self.config.trace_path
+        if not path:
+            return 0
+        return self.tracer.write(path)
+
+
     # Nettoyage final
     def cleanup(self):
+        if self.config.trace_path:
+            self.write_trace()
         self.file_handler.cleanup_temp_files()
+        if self._manifest is not None:
+            self._manifest.close()
+            self._manifest = None
 
 
     # Traitement avec options avancées
@@ -163,6 +454,8 @@ class MediaRefinerEngine:
             self.config.audio_quality = options['audio_quality']
         if 'image_quality' in options:
             self.config.image_quality = options['image_quality']
+        if 'speed' in options:
+            self.config.speed = options['speed']
         if 'preserve_original' in options:
             self.config.preserve_original = options['preserve_original']
         if 'output_dir' in options:
@@ -170,4 +463,36 @@ class MediaRefinerEngine:
             self.config.ensure_output_dirs()
         
         max_workers = options.get('max_workers', 4)
-        return self.process_batch(file_paths, max_workers)
+        executor = options.get('executor', 'thread')
+        return self.process_batch(file_paths, max_workers, executor)
+
+
+
+
+#------------------------------------------------------------------#
+#                       Process Pool Workers                       #
+#------------------------------------------------------------------#
+_worker_engine = None
+
+
+# Contexte de démarrage des workers: forkserver si disponible, sinon spawn (fork sous des threads actifs
+# laisse des verrous pris dans l'enfant: pool de sondes, moniteur tqdm, pipeline d'E/S)
+def worker_context():
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+
+# Initialisation d'un processus worker (processeurs construits une fois)
+def _init_worker(config):
+    global _worker_engine
+    _worker_engine = MediaRefinerEngine(config)
+
+
+# Exécution d'un job dans un processus worker
+def _run_job(job):
+    input_path, output_path, media = job
+    result = _worker_engine.process_single_file(input_path, output_path, media)
+    records = _worker_engine.file_handler.processed_files
+    _worker_engine.file_handler.processed_files = []
+    return result, records, _worker_engine.tracer.drain()
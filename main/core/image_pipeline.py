@@ -0,0 +1,201 @@
+import time
+import queue
+import threading
+import contextvars
+from concurrent.futures import Future
+from ..utils.profiling import JobProfile, profile_context
+
+
+#------------------------------------------------------------------#
+#                        Image I/O Pipeline                        #
+#------------------------------------------------------------------#
+class ImageIOPipeline:
+    def __init__(self, engine, compute_workers, io_workers=2, depth=4):
+        self.engine = engine
+        self.compute_workers = max(compute_workers, 1)
+        self.io_workers = max(io_workers, 1)
+        self.depth = max(depth, 1)
+        self.submitted = queue.Queue()
+        self.decoded = queue.Queue(maxsize=self.depth)
+        self.refined = queue.Queue(maxsize=self.depth)
+        self.threads = []
+        self.lock = threading.Lock()
+        self.times = {name: {'busy': 0.0, 'idle': 0.0, 'blocked': 0.0} for name in ('read', 'compute', 'write')}
+        self.depths = {'decoded': [0, 0, 0], 'refined': [0, 0, 0]}
+
+
+    # Jobs image admissibles en plus des workers de calcul (lecture anticipée, files, écriture)
+    @property
+    def extra_slots(self):
+        return 2 * self.depth + 2 * self.io_workers
+
+
+    # Processeur image du moteur (chargé à la demande)
+    @property
+    def processor(self):
+        return self.engine.image_processor
+
+
+    # Démarrage des pools de lecture, de calcul et d'écriture
+    def start(self):
+        stages = [
+            ('read', self.submitted, self.read, (self.decoded, 'decoded'), self.io_workers),
+            ('compute', self.decoded, self.compute, (self.refined, 'refined'), self.compute_workers),
+            ('write', self.refined, self.write, None, self.io_workers)
+        ]
+        for name, source, step, target, count in stages:
+            for index in range(count):
+                thread = threading.Thread(target=self.run_stage, args=(name, source, step, target),
+                                          name=f"image-{name}-{index}", daemon=True)
+                thread.start()
+                self.threads.append((name, thread))
+
+
+    # Soumission d'une image: Future du résultat, le profil du job suit ses trois étapes
+    def submit(self, file_path: str) -> Future:
+        if not self.threads:
+            self.start()
+        
+        profile = JobProfile(file_path, bool(self.engine.config.trace_path)) if self.engine.config.profiling else None
+        item = {
+            'path': file_path,
+            'future': Future(),
+            'profile': profile,
+            'context': profile_context(profile) if profile else contextvars.copy_context(),
+            'start': time.perf_counter()
+        }
+        self.submitted.put(item)
+        return item['future']
+
+
+    # Boucle d'un worker: attente d'un job, étape dans le contexte du job, transmission ou fin
+    def run_stage(self, name, source, step, target):
+        while True:
+            started = time.perf_counter()
+            item = source.get()
+            self.account(name, 'idle', started)
+            if item is None:
+                return
+            
+            started = time.perf_counter()
+            try:
+                done = item['context'].run(step, item)
+            except Exception as e:
+                done = True
+                item['context'].run(self.fail, item, e)
+            self.account(name, 'busy', started)
+            
+            if done:
+                self.complete(item)
+                continue
+            
+            target_queue, target_name = target
+            started = time.perf_counter()
+            target_queue.put(item)
+            self.account(name, 'blocked', started)
+            self.sample(target_name, target_queue.qsize())
+
+
+    # Lecture: préparation (cache, sauvegarde) et décodage; True si le job est déjà terminé
+    def read(self, item):
+        if not item['future'].set_running_or_notify_cancel():
+            return True
+        
+        job, result = self.engine.prepare_file(item['path'])
+        if result is not None:
+            item['result'] = result
+            return True
+        
+        item['job'] = job
+        item['decoded'] = self.processor.decode_image(job['input_path'], job['info'])
+        if item['decoded'] is None:
+            item['result'] = self.engine.finish_file(job, False)
+            return True
+        return False
+
+
+    # Calcul: chaîne d'amélioration (ou traitement tuilé complet des très grandes images)
+    def compute(self, item):
+        image, plan, tiled = item.pop('decoded')
+        job = item['job']
+        if tiled:
+            item['success'] = self.processor.process_image_tiled(job['input_path'], job['output_path'], image)
+        else:
+            item['processed'] = self.processor.refine_image(image, plan)
+        return False
+
+
+    # Écriture: encodage, puis cache, journal et résultat
+    def write(self, item):
+        processed = item.pop('processed', None)
+        success = item['success'] if processed is None else self.processor.encode_image(processed, item['job']['output_path'])
+        item['result'] = self.engine.finish_file(item['job'], success)
+        return True
+
+
+    # Échec d'une étape: le job est terminé avec l'erreur
+    def fail(self, item, error):
+        item.pop('decoded', None)
+        item.pop('processed', None)
+        job = item.get('job')
+        if job is None:
+            item['result'] = {'status': 'failed', 'input_path': item['path'], 'error': str(error)}
+        else:
+            job['info']['error'] = str(error)
+            item['result'] = self.engine.finish_file(job, False)
+
+
+    # Publication du résultat (rien si le job a été annulé avant sa lecture)
+    def complete(self, item):
+        result = item.get('result')
+        if result is None:
+            return
+        profile = item['profile']
+        if profile is not None:
+            profile.add('job', item['start'], time.perf_counter() - item['start'], 0.0, 1, 'files')
+            result = self.engine.attach_timings(result, profile)
+        item['future'].set_result(result)
+
+
+    # Cumul du temps d'une étape (occupé, en attente d'entrée, bloqué par une file pleine)
+    def account(self, name, kind, started):
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            self.times[name][kind] += elapsed
+
+
+    # Relevé de la profondeur d'une file après un ajout
+    def sample(self, name, depth):
+        with self.lock:
+            samples = self.depths[name]
+            samples[0] += 1
+            samples[1] += depth
+            samples[2] = max(samples[2], depth)
+
+
+    # Arrêt ordonné: chaque étage se vide avant l'arrêt du suivant
+    def close(self):
+        for name, source in (('read', self.submitted), ('compute', self.decoded), ('write', self.refined)):
+            threads = [thread for stage_name, thread in self.threads if stage_name == name]
+            for _ in threads:
+                source.put(None)
+            for thread in threads:
+                thread.join()
+        self.threads = []
+
+
+    # Statistiques: workers, temps par étage et profondeur des files
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'workers': {'read': self.io_workers, 'compute': self.compute_workers, 'write': self.io_workers},
+                'stages': {name: {kind: round(value, 4) for kind, value in times.items()} for name, times in self.times.items()},
+                'queues': {
+                    name: {
+                        'capacity': self.depth,
+                        'mean': round(samples[1] / samples[0], 2) if samples[0] else 0.0,
+                        'max': samples[2]
+                    }
+                    for name, samples in self.depths.items()
+                }
+            }
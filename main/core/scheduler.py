@@ -0,0 +1,139 @@
+import os
+import heapq
+import itertools
+
+
+# Coût estimé (secondes approximatives sur un cœur) par unité de travail et par type de média
+COST_RATES = {
+    'image_per_megapixel': 2.5,
+    'image_per_megabyte': 6.0,
+    'audio_per_second': 0.07,
+    'audio_per_megabyte': 1.0,
+    'video_per_frame': 0.04,
+    'video_per_megapixel_frame': 0.3,
+    'video_per_megabyte': 1.0
+}
+
+
+#------------------------------------------------------------------#
+#                          Job Scheduler                           #
+#------------------------------------------------------------------#
+class JobScheduler:
+    def __init__(self, config, max_workers, detect_media_type, extra_slots=None, probe_pool=None):
+        self.config = config
+        self.max_workers = max_workers
+        self.detect_media_type = detect_media_type
+        self.extra_slots = extra_slots or {}
+        self.probe_pool = probe_pool
+        self.probing = {}
+        self.window = max(config.schedule_window, max_workers + sum(self.extra_slots.values()))
+        self.lane_limits = {media_type: limit for media_type, limit in config.lane_limits.items() if limit}
+        self.queues = {}
+        self.running = 0
+        self.lane_load = {}
+        self.counter = itertools.count()
+        self.pending_count = 0
+
+
+    # Sondage d'un fichier (dans le pool d'E/S s'il existe): (coût, description vidéo ou None)
+    def probe(self, file_path, media_type):
+        media = None
+        if media_type == 'video':
+            from ..utils.probe import probe_media
+            media = probe_media(file_path)
+        return self.estimate_cost(file_path, media_type, media), media
+
+
+    # Estimation du coût d'un job: type de média, taille, durée et résolution sondées
+    def estimate_cost(self, file_path, media_type, media=None):
+        try:
+            megabytes = os.path.getsize(file_path) / 1e6
+        except OSError:
+            return 0.0
+        
+        if media_type == 'video':
+            if media and 'error' not in media and media.get('duration') and media.get('fps'):
+                frames = media['duration'] * media['fps']
+                megapixels = media['width'] * media['height'] / 1e6
+                return frames * (COST_RATES['video_per_frame'] + megapixels * COST_RATES['video_per_megapixel_frame'])
+            return megabytes * COST_RATES['video_per_megabyte']
+        
+        if media_type == 'audio':
+            try:
+                import soundfile as sf
+                return sf.info(file_path).duration * COST_RATES['audio_per_second']
+            except Exception:
+                return megabytes * COST_RATES['audio_per_megabyte']
+        
+        if media_type == 'image':
+            try:
+                from PIL import Image
+                with Image.open(file_path) as image:
+                    return image.width * image.height / 1e6 * COST_RATES['image_per_megapixel']
+            except Exception:
+                return megabytes * COST_RATES['image_per_megabyte']
+        
+        return megabytes
+
+
+    # Ajout d'un fichier: sondage soumis au pool d'E/S (ou immédiat sans pool), puis file de son type
+    def add(self, file_path):
+        media_type = self.detect_media_type(file_path) or 'other'
+        self.pending_count += 1
+        if self.probe_pool is None:
+            self.enqueue(file_path, media_type, *self.probe(file_path, media_type))
+        else:
+            self.probing[self.probe_pool.submit(self.probe, file_path, media_type)] = (file_path, media_type)
+
+
+    # Insertion dans la file de son type (tas max sur le coût)
+    def enqueue(self, file_path, media_type, cost, media):
+        heapq.heappush(self.queues.setdefault(media_type, []), (-cost, next(self.counter), file_path, media))
+
+
+    # Sondages terminés versés dans les files (un sondage en échec compte pour un coût nul)
+    def collect_probes(self):
+        for future in [f for f in self.probing if f.done()]:
+            file_path, media_type = self.probing.pop(future)
+            try:
+                cost, media = future.result()
+            except Exception:
+                cost, media = 0.0, None
+            self.enqueue(file_path, media_type, cost, media)
+
+
+    # Sondages en cours (à attendre avec les jobs quand aucun job n'est prêt)
+    def pending_probes(self):
+        return list(self.probing)
+
+
+    # File d'attente pleine (fenêtre d'anticipation atteinte)
+    def is_full(self):
+        return self.pending_count >= self.window
+
+
+    # Job sondé le plus coûteux parmi les types ayant un créneau libre: (chemin, type, sonde) ou None
+    # (les créneaux supplémentaires d'un type, comme la lecture anticipée des images, lui sont réservés)
+    def pop_ready(self):
+        self.collect_probes()
+        best = None
+        for media_type, queue in self.queues.items():
+            extra = self.extra_slots.get(media_type, 0)
+            limit = self.lane_limits.get(media_type, self.max_workers) + extra
+            if queue and self.running < self.max_workers + extra and self.lane_load.get(media_type, 0) < limit:
+                if best is None or queue[0] < self.queues[best][0]:
+                    best = media_type
+        if best is None:
+            return None
+        
+        _, _, file_path, media = heapq.heappop(self.queues[best])
+        self.pending_count -= 1
+        self.running += 1
+        self.lane_load[best] = self.lane_load.get(best, 0) + 1
+        return file_path, best, media
+
+
+    # Libération du créneau d'un job terminé
+    def finished(self, media_type):
+        self.running -= 1
+        self.lane_load[media_type] -= 1
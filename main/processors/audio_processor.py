@@ -1,11 +1,19 @@
 import librosa
 import soundfile as sf
 import numpy as np
-from pydub import AudioSegment
-from scipy import signal
+from scipy import signal, ndimage
+from ..utils.scratch import scratch_space
+from ..utils.profiling import profiled, profiled_iter, stage
+from ..utils.speed_tiers import find_stage
+from ..utils.resolution import plan_audio_rate
+import soxr
 import os
 
 
+RESAMPLE_QUALITY = 'HQ'
+DYNAMICS_CHUNK = 262144
+
+
 #------------------------------------------------------------------#
 #                       Audio Processor                           #
 #------------------------------------------------------------------#
@@ -13,22 +21,20 @@ class AudioProcessor:
     def __init__(self, config):
         self.config = config
         self.audio_params = config.get_audio_params()
+        self.dynamics_params = config.get_dynamics_params()
+        self.n_fft = 2048
+        self.hop_length = 512
 
 
     # Réduction du bruit
     def reduce_noise(self, audio_data, sr):
-        stft = librosa.stft(audio_data)
-        magnitude = np.abs(stft)
-        phase = np.angle(stft)
-        noise_profile = np.mean(magnitude[:, :int(sr * 0.5)], axis=1, keepdims=True)
-        noise_factor = 0.3
-        mask = magnitude > (noise_profile * noise_factor)
-        cleaned_magnitude = magnitude * mask
-        cleaned_stft = cleaned_magnitude * np.exp(1j * phase)
-        return librosa.istft(cleaned_stft)
+        stft = librosa.stft(audio_data, n_fft=self.n_fft, hop_length=self.hop_length)
+        mask = self.noise_mask(np.abs(stft), sr)
+        return librosa.istft(stft * mask, hop_length=self.hop_length, length=len(audio_data))
 
 
     # Normalisation audio
+    @profiled('audio.normalize')
     def normalize_audio(self, audio_data):
         max_val = np.max(np.abs(audio_data))
         if max_val > 0:
@@ -37,6 +43,7 @@ class AudioProcessor:
 
 
     # Amélioration de la clarté
+    @profiled('audio.clarity')
     def enhance_clarity(self, audio_data, sr):
         nyquist = sr // 2
         low_freq = 300 / nyquist
@@ -48,80 +55,309 @@ class AudioProcessor:
 
     # Égalisation audio
     def equalize_audio(self, audio_data, sr):
-        stft = librosa.stft(audio_data)
-        magnitude = np.abs(stft)
-        freqs = librosa.fft_frequencies(sr=sr)
-        
+        stft = librosa.stft(audio_data, n_fft=self.n_fft, hop_length=self.hop_length)
+        stft *= self.eq_curve(sr)[:, np.newaxis]
+        return librosa.istft(stft, hop_length=self.hop_length, length=len(audio_data))
+
+
+    # Suppression des clics et pops
+    def remove_clicks(self, audio_data, sr):
+        stft = librosa.stft(audio_data, n_fft=self.n_fft, hop_length=self.hop_length)
+        mask = self.click_mask(np.abs(stft))
+        return librosa.istft(stft * mask, hop_length=self.hop_length, length=len(audio_data))
+
+
+    # Masque de réduction du bruit
+    @profiled('audio.noise_mask')
+    def noise_mask(self, magnitude, sr, noise_profile=None):
+        if noise_profile is None:
+            noise_profile = np.mean(magnitude[:, :int(sr * 0.5)], axis=1, keepdims=True)
+        noise_factor = 0.3
+        return magnitude > (noise_profile * noise_factor)
+
+
+    # Masque de détection des clics (médiane glissante sur kernel trames)
+    @profiled('audio.click_mask')
+    def click_mask(self, magnitude, kernel=5):
+        median_mag = signal.medfilt2d(magnitude, kernel_size=(1, kernel))
+        threshold = 2.0
+        return magnitude < (median_mag * threshold)
+
+
+    # Courbe d'égalisation par bin fréquentiel
+    def eq_curve(self, sr):
+        freqs = librosa.fft_frequencies(sr=sr, n_fft=self.n_fft)
         eq_curve = np.ones_like(freqs)
         eq_curve[(freqs >= 100) & (freqs <= 300)] *= 1.1
         eq_curve[(freqs >= 1000) & (freqs <= 4000)] *= 1.2
         eq_curve[(freqs >= 6000) & (freqs <= 12000)] *= 1.15
-        
-        magnitude_eq = magnitude * eq_curve[:, np.newaxis]
-        phase = np.angle(stft)
-        stft_eq = magnitude_eq * np.exp(1j * phase)
-        return librosa.istft(stft_eq)
+        return eq_curve
 
 
-    # Suppression des clics et pops
-    def remove_clicks(self, audio_data, sr):
-        hop_length = 512
-        frame_length = 2048
-        stft = librosa.stft(audio_data, hop_length=hop_length, n_fft=frame_length)
+    # Étage spectral fusionné: une seule STFT pour bruit, clics (sauf click_kernel=0) et égalisation
+    @profiled('audio.spectral')
+    def apply_spectral_chain(self, audio_data, sr, noise_profile=None, click_kernel=5):
+        stft = librosa.stft(audio_data, n_fft=self.n_fft, hop_length=self.hop_length)
         magnitude = np.abs(stft)
         
-        median_mag = signal.medfilt(magnitude, kernel_size=(1, 5))
-        threshold = 2.0
-        mask = magnitude < (median_mag * threshold)
+        mask = self.noise_mask(magnitude, sr, noise_profile)
+        if click_kernel:
+            magnitude *= mask
+            mask &= self.click_mask(magnitude, click_kernel)
         
-        cleaned_stft = stft * mask
-        return librosa.istft(cleaned_stft, hop_length=hop_length)
+        stft *= mask
+        stft *= self.eq_curve(sr)[:, np.newaxis]
+        return librosa.istft(stft, hop_length=self.hop_length, length=len(audio_data))
+
+
+    # Amélioration de la dynamique, par tranches tenant en cache (état du compresseur propagé)
+    def enhance_dynamics(self, audio_data, sr):
+        compressed = np.empty(len(audio_data), dtype=np.float32)
+        state = None
+        for start in range(0, len(audio_data), DYNAMICS_CHUNK):
+            chunk, state = self.compress_dynamics(audio_data[start:start + DYNAMICS_CHUNK], sr, state)
+            compressed[start:start + len(chunk)] = chunk
+        return compressed
 
 
-    # Amélioration de la dynamique
-    def enhance_dynamics(self, audio_data):
-        threshold = 0.1
-        ratio = 4.0
-        attack = 0.003
-        release = 0.1
+    # Compresseur à suivi d'enveloppe (attaque/relâchement) vectorisé, calculé et rendu en float32
+    @profiled('audio.dynamics')
+    def compress_dynamics(self, audio_data, sr, state=None):
+        params = self.dynamics_params
+        audio_data = np.asarray(audio_data, dtype=np.float32)
+        step = 1 << max(int(np.log2(sr / 1000.0)), 0)
+        control_rate = sr / step
+        attack_coef = np.exp(-1.0 / (params['attack'] * control_rate))
+        release_coef = np.exp(-1.0 / (params['release'] * control_rate))
+        hold = max(int(params['hold'] * control_rate) | 1, 1)
         
-        envelope = np.abs(audio_data)
-        compressed = np.copy(audio_data)
+        if state is None:
+            state = {
+                'history': np.zeros(hold - 1, dtype=np.float32),
+                'attack': signal.lfilter_zi([1 - attack_coef], [1, -attack_coef]),
+                'release': signal.lfilter_zi([1 - release_coef], [1, -release_coef]),
+                'gain': 1.0,
+            }
         
-        for i in range(1, len(audio_data)):
-            if envelope[i] > threshold:
-                reduction = 1 - (envelope[i] - threshold) / ratio
-                compressed[i] *= max(reduction, 0.1)
+        length = len(audio_data)
+        blocks = -(-length // step)
+        if blocks * step != length:
+            audio_data = np.pad(audio_data, (0, blocks * step - length))
+        frames = audio_data.reshape(blocks, step)
         
-        return compressed
+        # Enveloppe crête par bloc de contrôle (~1 ms), maintenue sur la fenêtre de hold
+        block_peaks = np.abs(audio_data)
+        while len(block_peaks) > blocks:
+            block_peaks = np.maximum(block_peaks[0::2], block_peaks[1::2])
+        peaks = np.concatenate([state['history'], block_peaks])
+        envelope = ndimage.maximum_filter1d(peaks, size=hold, mode='nearest')[hold // 2:hold // 2 + blocks]
+        
+        gain = np.ones_like(envelope)
+        over = envelope > params['threshold']
+        gain[over] = (envelope[over] / params['threshold']) ** (1.0 / params['ratio'] - 1.0)
+        
+        gain_attack, zi_attack = signal.lfilter([1 - attack_coef], [1, -attack_coef], gain, zi=state['attack'])
+        gain_release, zi_release = signal.lfilter([1 - release_coef], [1, -release_coef], gain, zi=state['release'])
+        gain = np.minimum(gain_attack, gain_release).astype(np.float32)
+        
+        # Interpolation linéaire du gain entre blocs de contrôle
+        previous = np.concatenate([[state['gain']], gain[:-1]]).astype(np.float32)
+        ramp = np.arange(1, step + 1, dtype=np.float32) / step
+        curve = np.multiply.outer(gain - previous, ramp)
+        curve += previous[:, np.newaxis]
+        curve *= frames
+        compressed = curve.ravel()[:length]
+        if params['makeup_gain'] != 1.0:
+            compressed *= params['makeup_gain']
+        
+        state = {
+            'history': peaks[blocks:],
+            'attack': zi_attack,
+            'release': zi_release,
+            'gain': gain[-1] if blocks else state['gain'],
+        }
+        return compressed, state
+
+
+    # Plan de fréquence d'échantillonnage (réduction avant la chaîne, augmentation en dernier), ajouté au résultat
+    def plan_rate(self, source_rate, info=None):
+        plan = plan_audio_rate(source_rate, self.audio_params['sample_rate'])
+        plan['resampler'] = f"soxr-{RESAMPLE_QUALITY.lower()}"
+        if info is not None:
+            info['audio_plan'] = plan
+        return plan
+
 
+    # Rééchantillonnage polyphase soxr d'un signal complet
+    @profiled('audio.resample')
+    def resample(self, audio_data, source_rate, target_rate):
+        return soxr.resample(audio_data, source_rate, target_rate, quality=RESAMPLE_QUALITY)
 
-    # Traitement principal de l'audio
-    def process_audio(self, input_path: str, output_path: str) -> bool:
+
+    # Traitement principal de l'audio: chaîne à la fréquence de travail du plan
+    def process_audio(self, input_path: str, output_path: str, info: dict = None) -> bool:
+        if self.should_stream(input_path):
+            return self.process_audio_streaming(input_path, output_path, info)
+        
         try:
-            audio_data, sr = librosa.load(input_path, sr=None)
+            with stage('audio.decode', os.path.getsize(input_path)):
+                audio_data, source_rate = librosa.load(input_path, sr=None)
             
-            processed = self.reduce_noise(audio_data, sr)
-            processed = self.remove_clicks(processed, sr)
-            processed = self.enhance_clarity(processed, sr)
-            processed = self.equalize_audio(processed, sr)
-            processed = self.enhance_dynamics(processed)
-            processed = self.normalize_audio(processed)
+            plan = self.plan_rate(source_rate, info)
+            sr = plan['work_rate']
+            if plan['resample'] == 'down-first':
+                audio_data = self.resample(audio_data, source_rate, sr)
             
-            target_sr = self.audio_params['sample_rate']
-            if sr != target_sr:
-                processed = librosa.resample(processed, orig_sr=sr, target_sr=target_sr)
+            processed = audio_data
+            for step in self.config.get_pipeline('audio'):
+                if step['stage'] == 'spectral':
+                    processed = self.apply_spectral_chain(processed, sr, click_kernel=spectral_click_kernel(step))
+                elif step['stage'] == 'clarity':
+                    processed = self.enhance_clarity(processed, sr)
+                elif step['stage'] == 'dynamics':
+                    processed = self.enhance_dynamics(processed, sr)
+                elif step['stage'] == 'normalize':
+                    processed = self.normalize_audio(processed)
             
-            sf.write(output_path, processed, target_sr, subtype='PCM_24')
+            if plan['resample'] == 'up-last':
+                processed = self.resample(processed, sr, plan['output_rate'])
+            
+            with stage('audio.encode', processed.nbytes):
+                sf.write(output_path, processed, plan['output_rate'], subtype='PCM_24')
             return True
             
         except Exception as e:
             return False
 
 
+    # Choix du mode flux selon la durée du fichier
+    def should_stream(self, input_path: str) -> bool:
+        if self.config.audio_streaming != 'auto':
+            return bool(self.config.audio_streaming)
+        try:
+            return sf.info(input_path).duration >= self.config.audio_stream_min_duration
+        except Exception:
+            return False
+
+
+    # Profil de bruit estimé sur le début du flux (blocs mono à la fréquence de travail)
+    @profiled('audio.noise_profile')
+    def estimate_noise_profile(self, blocks, sr):
+        frames_needed = int(sr * 0.5)
+        total = np.zeros((1 + self.n_fft // 2, 1), dtype=np.float64)
+        counted = 0
+        
+        for block in blocks:
+            stft = librosa.stft(block, n_fft=self.n_fft, hop_length=self.hop_length)
+            magnitude = np.abs(stft[:, :frames_needed - counted])
+            total[:, 0] += magnitude.sum(axis=1)
+            counted += magnitude.shape[1]
+            if counted >= frames_needed:
+                break
+        return total / max(counted, 1)
+
+
+    # Blocs mono consécutifs du flux depuis le début, réduits à la fréquence de travail si le plan le demande
+    def iter_work_blocks(self, source, plan, block_size):
+        resampler = None
+        if plan['resample'] == 'down-first':
+            resampler = soxr.ResampleStream(plan['source_rate'], plan['work_rate'], 1, dtype='float32', quality=RESAMPLE_QUALITY)
+        
+        source.seek(0)
+        for block in profiled_iter(source.blocks(blocksize=block_size, dtype='float32', always_2d=True), 'audio.decode'):
+            mono = block.mean(axis=1)
+            if resampler:
+                with stage('audio.resample', mono.nbytes):
+                    mono = resampler.resample_chunk(mono)
+            yield mono
+        
+        if resampler:
+            yield resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+
+
+    # Traitement en flux par blocs avec recouvrement (mémoire bornée)
+    def process_audio_streaming(self, input_path: str, output_path: str, info: dict = None) -> bool:
+        try:
+            with scratch_space(self.config).job(estimate=sf.info(input_path).frames * 4) as job_dir:
+                return self.stream_through_scratch(input_path, output_path, os.path.join(job_dir, 'processed.wav'), info)
+        except Exception as e:
+            return False
+
+
+    # Passe de traitement vers un fichier intermédiaire, puis normalisation vers la sortie
+    # (ordre fixe en flux: spectral, clarté, dynamique, normalisation; les étapes absentes du niveau sont sautées)
+    def stream_through_scratch(self, input_path: str, output_path: str, temp_path: str, info: dict = None) -> bool:
+        stages = self.config.get_pipeline('audio')
+        spectral = find_stage(stages, 'spectral')
+        clarity = find_stage(stages, 'clarity') is not None
+        dynamics = find_stage(stages, 'dynamics') is not None
+        normalize = find_stage(stages, 'normalize') is not None
+        block_size = max(self.config.audio_block_size // self.hop_length, 1) * self.hop_length
+        margin = 4 * self.n_fft
+        peak = 0.0
+        
+        with sf.SoundFile(input_path) as source:
+            plan = self.plan_rate(source.samplerate, info)
+            sr = plan['work_rate']
+            noise_profile = None
+            if spectral:
+                noise_blocks = overlapping_windows(self.iter_work_blocks(source, plan, block_size), block_size, block_size)
+                noise_profile = self.estimate_noise_profile((block for block, _ in noise_blocks), sr)
+            
+            with sf.SoundFile(temp_path, 'w', samplerate=sr, channels=1, subtype='FLOAT') as temp:
+                written = 0
+                dynamics_state = None
+                windows = overlapping_windows(self.iter_work_blocks(source, plan, block_size), block_size + 2 * margin, block_size)
+                
+                for index, (mono, last) in enumerate(windows):
+                    start = index * block_size
+                    
+                    processed = mono
+                    if spectral:
+                        processed = self.apply_spectral_chain(processed, sr, noise_profile, spectral_click_kernel(spectral))
+                    if clarity:
+                        processed = self.enhance_clarity(processed, sr)
+                    
+                    end = len(mono) if last else len(mono) - margin
+                    if end <= written - start:
+                        continue
+                    
+                    processed = processed[written - start:end]
+                    if dynamics:
+                        processed, dynamics_state = self.compress_dynamics(processed, sr, dynamics_state)
+                    peak = max(peak, float(np.max(np.abs(processed))))
+                    with stage('audio.scratch_write', processed.nbytes):
+                        temp.write(processed)
+                    written = start + end
+        
+        self.write_normalized_stream(temp_path, output_path, sr, peak if normalize else 0.0, block_size)
+        return True
+
+
+    # Normalisation, rééchantillonnage et écriture incrémentale
+    def write_normalized_stream(self, temp_path, output_path, sr, peak, block_size):
+        gain = 0.95 / peak if peak > 0 else 1.0
+        target_sr = self.audio_params['sample_rate']
+        resampler = soxr.ResampleStream(sr, target_sr, 1, dtype='float32', quality=RESAMPLE_QUALITY) if sr != target_sr else None
+        
+        with sf.SoundFile(temp_path) as temp, \
+                sf.SoundFile(output_path, 'w', samplerate=target_sr, channels=1, subtype='PCM_24') as out:
+            for block in profiled_iter(temp.blocks(blocksize=block_size, dtype='float32'), 'audio.scratch_read'):
+                block *= gain
+                if resampler:
+                    with stage('audio.resample', block.nbytes):
+                        block = resampler.resample_chunk(block)
+                with stage('audio.encode', block.nbytes):
+                    out.write(block)
+            
+            if resampler:
+                out.write(resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True))
+
+
     # Conversion avec pydub pour formats spéciaux
     def convert_with_pydub(self, input_path: str, output_path: str) -> bool:
         try:
+            from pydub import AudioSegment
             audio = AudioSegment.from_file(input_path)
             
             audio = audio.normalize()
@@ -150,4 +386,21 @@ class AudioProcessor:
             else:
                 results['failed'].append(file_path)
         
-        return results
\ No newline at end of file
+        return results
+
+
+# Taille du noyau de détection des clics d'une étape spectrale (0: clics ignorés)
+def spectral_click_kernel(step):
+    return step.get('click_kernel', 5) if step.get('clicks', True) else 0
+
+
+# Fenêtres de size échantillons tous les step échantillons sur des blocs consécutifs: (fenêtre, dernière)
+def overlapping_windows(blocks, size, step):
+    buffer = np.zeros(0, dtype=np.float32)
+    for block in blocks:
+        buffer = np.concatenate([buffer, block])
+        while len(buffer) > size:
+            yield buffer[:size], False
+            buffer = buffer[step:]
+    if len(buffer):
+        yield buffer, True
@@ -0,0 +1,168 @@
+import cv2
+import numpy as np
+import threading
+
+
+#------------------------------------------------------------------#
+#                        Color Stage                               #
+#------------------------------------------------------------------#
+class ColorStage:
+    def __init__(self, clip_limit=2.0, tile_grid=(8, 8), brightness=0, saturation=1.0, contrast_space='lab'):
+        if contrast_space not in ('lab', 'hsv'):
+            raise ValueError(f"Unknown contrast space: {contrast_space}")
+        self.clip_limit = clip_limit
+        self.tile_grid = tile_grid
+        self.contrast_space = contrast_space
+        self.hsv_lut = self.build_hsv_lut(brightness, saturation)
+        self.identity_hsv = brightness == 0 and saturation == 1.0
+        self.local = threading.local()
+
+
+    # LUT HSV: teinte inchangée, saturation multipliée, luminosité décalée
+    def build_hsv_lut(self, brightness, saturation):
+        values = np.arange(256, dtype=np.float32)
+        lut = np.empty((1, 256, 3), dtype=np.uint8)
+        lut[0, :, 0] = np.arange(256)
+        lut[0, :, 1] = np.clip(np.rint(values * saturation), 0, 255)
+        lut[0, :, 2] = np.clip(values + brightness, 0, 255)
+        return lut
+
+
+    # Instance CLAHE créée une fois par thread (non partageable entre threads)
+    def get_clahe(self):
+        clahe = getattr(self.local, 'clahe', None)
+        if clahe is None:
+            clahe = cv2.createCLAHE(clipLimit=self.clip_limit, tileGridSize=self.tile_grid)
+            self.local.clahe = clahe
+        return clahe
+
+
+    # Canal de contraste: luminance L (Lab, défaut) ou valeur V (HSV, plus rapide mais plus saturée)
+    def contrast_channel(self, image):
+        if self.contrast_space == 'hsv':
+            return image.max(axis=2)
+        return cv2.extractChannel(cv2.cvtColor(image, cv2.COLOR_BGR2LAB), 0)
+
+
+    # Contraste seul: CLAHE sur L (un aller-retour Lab) ou sur V (un aller-retour HSV)
+    def apply_contrast(self, image):
+        if self.contrast_space == 'hsv':
+            hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+            hsv = cv2.insertChannel(self.get_clahe().apply(cv2.extractChannel(hsv, 2)), hsv, 2)
+            return cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
+        lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
+        lab = cv2.insertChannel(self.get_clahe().apply(cv2.extractChannel(lab, 0)), lab, 0)
+        return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+
+
+    # Luminosité et saturation seules (un aller-retour HSV)
+    def apply_hsv(self, image):
+        if self.identity_hsv:
+            return image
+        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+        hsv = cv2.LUT(hsv, self.hsv_lut, dst=hsv)
+        return cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
+
+
+    # Étage couleur complet: contraste puis luminosité et saturation (LUT unique, un aller-retour HSV)
+    # (en espace HSV, le contraste et la LUT partagent le même aller-retour)
+    def apply(self, image):
+        if self.contrast_space == 'lab':
+            return self.apply_hsv(self.apply_contrast(image))
+        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+        hsv = cv2.insertChannel(self.get_clahe().apply(cv2.extractChannel(hsv, 2)), hsv, 2)
+        if not self.identity_hsv:
+            hsv = cv2.LUT(hsv, self.hsv_lut, dst=hsv)
+        return cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
+
+
+    # Géométrie CLAHE d'une image entière: taille des cellules et marges de réflexion (comme OpenCV)
+    def clahe_geometry(self, width, height):
+        tiles_x, tiles_y = self.tile_grid
+        if width % tiles_x == 0 and height % tiles_y == 0:
+            pad_x = pad_y = 0
+        else:
+            pad_x = tiles_x - width % tiles_x
+            pad_y = tiles_y - height % tiles_y
+        return ((width + pad_x) // tiles_x, (height + pad_y) // tiles_y), (pad_x, pad_y)
+
+
+    # Histogrammes du canal de contraste (L ou V) par cellule CLAHE pour une tuile placée en (x0, y0)
+    def value_histograms(self, value, x0, y0, width, height):
+        tiles_x, tiles_y = self.tile_grid
+        (cell_width, cell_height), (pad_x, pad_y) = self.clahe_geometry(width, height)
+        
+        # Pixels de l'image étendue (marges en réflexion) dont la source est dans la tuile
+        rows = extended_indices(y0, y0 + value.shape[0], height, pad_y)
+        cols = extended_indices(x0, x0 + value.shape[1], width, pad_x)
+        values = value[np.ix_(reflect_index(rows, height) - y0, reflect_index(cols, width) - x0)]
+        
+        cells = (rows // cell_height)[:, np.newaxis] * tiles_x + (cols // cell_width)[np.newaxis, :]
+        counts = np.bincount((cells * 256 + values).ravel(), minlength=tiles_x * tiles_y * 256)
+        return counts.reshape(tiles_y, tiles_x, 256)
+
+
+    # LUT CLAHE par cellule: écrêtage, redistribution puis histogramme cumulé (comme OpenCV)
+    def clahe_luts(self, histograms, width, height):
+        (cell_width, cell_height), _ = self.clahe_geometry(width, height)
+        area = cell_width * cell_height
+        clip = max(int(self.clip_limit * area / 256), 1)
+        
+        histograms = histograms.astype(np.int64)
+        clipped = np.maximum(histograms - clip, 0).sum(axis=2)
+        histograms = np.minimum(histograms, clip) + (clipped // 256)[..., np.newaxis]
+        residuals = clipped % 256
+        for (ty, tx), residual in np.ndenumerate(residuals):
+            if residual:
+                histograms[ty, tx, np.arange(0, 256, max(256 // residual, 1))[:residual]] += 1
+        
+        scale = np.float32(255) / np.float32(area)
+        return np.clip(np.rint(np.cumsum(histograms, axis=2).astype(np.float32) * scale), 0, 255).astype(np.float32)
+
+
+    # CLAHE d'une tuile placée en (x0, y0) par interpolation bilinéaire des LUT de l'image entière
+    def equalize_value_tile(self, value, x0, y0, width, height, luts):
+        tiles_x, tiles_y = self.tile_grid
+        (cell_width, cell_height), _ = self.clahe_geometry(width, height)
+        ty1, ty2, ya = interpolation_axis(y0, value.shape[0], cell_height, tiles_y)
+        tx1, tx2, xa = interpolation_axis(x0, value.shape[1], cell_width, tiles_x)
+        ty1, ty2, ya = ty1[:, np.newaxis], ty2[:, np.newaxis], ya[:, np.newaxis]
+        
+        top = luts[ty1, tx1, value] * (1 - xa) + luts[ty1, tx2, value] * xa
+        bottom = luts[ty2, tx1, value] * (1 - xa) + luts[ty2, tx2, value] * xa
+        return np.clip(np.rint(top * (1 - ya) + bottom * ya), 0, 255).astype(np.uint8)
+
+
+    # Étage couleur complet d'une tuile, identique à apply() sur l'image entière
+    def apply_tile(self, image, x0, y0, width, height, luts):
+        if self.contrast_space == 'lab':
+            lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
+            lightness = self.equalize_value_tile(cv2.extractChannel(lab, 0), x0, y0, width, height, luts)
+            lab = cv2.insertChannel(lightness, lab, 0)
+            return self.apply_hsv(cv2.cvtColor(lab, cv2.COLOR_LAB2BGR))
+        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+        value = self.equalize_value_tile(cv2.extractChannel(hsv, 2), x0, y0, width, height, luts)
+        hsv = cv2.insertChannel(value, hsv, 2)
+        if not self.identity_hsv:
+            hsv = cv2.LUT(hsv, self.hsv_lut, dst=hsv)
+        return cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
+
+
+# Indice source d'une ligne ou colonne de l'image étendue (réflexion 101)
+def reflect_index(indices, size):
+    return np.where(indices < size, indices, 2 * (size - 1) - indices)
+
+
+# Lignes (ou colonnes) de l'image étendue dont la source est dans [start, stop)
+def extended_indices(start, stop, size, pad):
+    padding = np.arange(size, size + pad)
+    sources = reflect_index(padding, size)
+    return np.concatenate([np.arange(start, stop), padding[(sources >= start) & (sources < stop)]])
+
+
+# Cellules voisines et poids d'interpolation CLAHE le long d'un axe (calcul en float32 comme OpenCV)
+def interpolation_axis(start, count, cell_size, tiles):
+    position = np.arange(start, start + count, dtype=np.float32) * (np.float32(1) / np.float32(cell_size)) - np.float32(0.5)
+    first = np.floor(position).astype(np.int64)
+    weight = (position - first).astype(np.float32)
+    return np.maximum(first, 0), np.minimum(first + 1, tiles - 1), weight
@@ -1,7 +1,12 @@
 import cv2
 import numpy as np
 from PIL import Image, ImageEnhance, ImageFilter
-from skimage import restoration, exposure
+from .color_stage import ColorStage
+from .image_tiler import ImageTiler, SHARPEN_HALO, SIMD_ALIGN, denoise_halo
+from ..utils.resolution import plan_image_resolution
+from ..utils.profiling import profiled, stage
+from ..utils.scratch import scratch_space
+from ..utils.speed_tiers import NLMEANS_MAX, find_stage
 import os
 
 
@@ -14,22 +19,29 @@ class ImageProcessor:
     def __init__(self, config):
         self.config = config
         self.image_params = config.get_image_params()
+        self.color_stage = ColorStage(clip_limit=3.0, brightness=10, saturation=1.2, contrast_space=config.color_contrast_space)
+        self.sharpen_kernel = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
+        self.tiler = ImageTiler(config)
 
 
     # Amélioration de la netteté
+    @profiled('image.sharpen')
     def enhance_sharpness(self, image):
         if isinstance(image, np.ndarray):
-            kernel = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
-            return cv2.filter2D(image, -1, kernel)
+            return cv2.filter2D(image, -1, self.sharpen_kernel)
         else:
             enhancer = ImageEnhance.Sharpness(image)
             return enhancer.enhance(1.5)
 
 
-    # Réduction du bruit
-    def denoise_image(self, image):
+    # Réduction du bruit (NL-means ou bilatéral selon les paramètres de l'étape)
+    @profiled('image.denoise')
+    def denoise_image(self, image, params=None):
         if isinstance(image, np.ndarray):
-            return cv2.fastNlMeansDenoisingColored(image, None, 10, 10, 7, 21)
+            params = params or NLMEANS_MAX
+            if params['method'] == 'bilateral':
+                return cv2.bilateralFilter(image, params['diameter'], params['sigma_color'], params['sigma_space'])
+            return cv2.fastNlMeansDenoisingColored(image, None, params['h'], params['h_color'], params['template'], params['search'])
         else:
             return image.filter(ImageFilter.MedianFilter(size=3))
 
@@ -37,12 +49,7 @@ class ImageProcessor:
     # Amélioration du contraste
     def enhance_contrast(self, image):
         if isinstance(image, np.ndarray):
-            lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
-            l, a, b = cv2.split(lab)
-            clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
-            l = clahe.apply(l)
-            enhanced = cv2.merge([l, a, b])
-            return cv2.cvtColor(enhanced, cv2.COLOR_LAB2BGR)
+            return self.color_stage.apply_contrast(image)
         else:
             enhancer = ImageEnhance.Contrast(image)
             return enhancer.enhance(1.2)
@@ -70,6 +77,16 @@ class ImageProcessor:
             return enhancer.enhance(1.15)
 
 
+    # Étage couleur fusionné (contraste, luminosité, saturation)
+    @profiled('image.colors')
+    def adjust_colors(self, image):
+        if isinstance(image, np.ndarray):
+            return self.color_stage.apply(image)
+        image = self.enhance_contrast(image)
+        image = self.enhance_brightness(image)
+        return self.enhance_saturation(image)
+
+
     # Upscaling de l'image
     def upscale_image(self, image, scale_factor=2):
         if isinstance(image, np.ndarray):
@@ -83,32 +100,127 @@ class ImageProcessor:
             return image.resize(new_size, Image.LANCZOS)
 
 
-    # Traitement principal de l'image
-    def process_image(self, input_path: str, output_path: str) -> bool:
+    # Traitement principal de l'image: décodage, amélioration, encodage
+    def process_image(self, input_path: str, output_path: str, info: dict = None) -> bool:
         try:
-            image = cv2.imread(input_path)
-            if image is None:
+            decoded = self.decode_image(input_path, info)
+            if decoded is None:
                 return False
             
-            processed = self.denoise_image(image)
-            processed = self.enhance_contrast(processed)
-            processed = self.enhance_brightness(processed)
-            processed = self.enhance_saturation(processed)
-            processed = self.enhance_sharpness(processed)
-            
-            if min(processed.shape[:2]) < 1080:
-                scale = 1080 / min(processed.shape[:2])
-                if scale <= 3:
-                    processed = self.upscale_image(processed, scale)
-            
-            quality = self.image_params['quality']
-            cv2.imwrite(output_path, processed, [cv2.IMWRITE_JPEG_QUALITY, quality])
-            return True
+            image, plan, tiled = decoded
+            if tiled:
+                return self.process_image_tiled(input_path, output_path, image)
+            return self.encode_image(self.refine_image(image, plan), output_path)
             
         except Exception as e:
             return False
 
 
+    # Décodage et plan de résolution: (image, plan, tuilé), None si illisible (image non chargée pour un TIFF tuilé)
+    def decode_image(self, input_path: str, info: dict = None):
+        image = None
+        size = self.tiler.tiff_size(input_path)
+        if size is None:
+            image = self.read_image(input_path)
+            if image is None:
+                return None
+            size = (image.shape[1], image.shape[0])
+        
+        plan = plan_image_resolution(*size)
+        if info is not None:
+            info['resolution_plan'] = plan
+        
+        if self.tiler.should_tile(*size) and plan['resize'] == 'none' and self.is_tileable(self.config.get_pipeline('image')):
+            if info is not None:
+                info['tiled'] = True
+            return image, plan, True
+        
+        if image is None:
+            image = self.read_image(input_path)
+            if image is None:
+                return None
+        return image, plan, False
+
+
+    # Chaîne d'amélioration en mémoire: étapes du niveau de vitesse dans l'ordre, agrandissement éventuel
+    def refine_image(self, image, plan):
+        processed = image
+        for step in self.config.get_pipeline('image'):
+            if step['stage'] == 'denoise':
+                processed = self.denoise_image(processed, step)
+            elif step['stage'] == 'colors':
+                processed = self.adjust_colors(processed)
+            elif step['stage'] == 'sharpen':
+                processed = self.enhance_sharpness(processed)
+        
+        if plan['resize'] == 'up-last':
+            with stage('image.upscale', processed.nbytes):
+                processed = cv2.resize(processed, plan['output'], interpolation=cv2.INTER_CUBIC)
+        return processed
+
+
+    # Encodage et écriture de l'image traitée
+    def encode_image(self, processed, output_path: str) -> bool:
+        quality = self.image_params['quality']
+        with stage('image.encode', processed.nbytes):
+            return cv2.imwrite(output_path, processed, [cv2.IMWRITE_JPEG_QUALITY, quality])
+
+
+    # Chaîne compatible avec le mode tuilé (débruitage, couleurs, netteté dans cet ordre, chacun facultatif)
+    def is_tileable(self, stages):
+        names = [step['stage'] for step in stages]
+        return names == [name for name in ('denoise', 'colors', 'sharpen') if name in names]
+
+
+    # Décodage complet de l'image source
+    def read_image(self, input_path):
+        with stage('image.decode', os.path.getsize(input_path)):
+            return cv2.imread(input_path)
+
+
+    # Traitement tuilé d'une grande image: tuiles avec halo en parallèle, intermédiaires mappés en mémoire
+    def process_image_tiled(self, input_path: str, output_path: str, image=None) -> bool:
+        width, height = (image.shape[1], image.shape[0]) if image is not None else self.tiler.tiff_size(input_path)
+        boxes = self.tiler.tile_boxes(width, height)
+        stages = self.config.get_pipeline('image')
+        denoise = find_stage(stages, 'denoise')
+        colors = find_stage(stages, 'colors') is not None
+        sharpen = find_stage(stages, 'sharpen') is not None
+        
+        with scratch_space(self.config).job(estimate=width * height * 3 * 3) as job_dir:
+            source = image if image is not None else self.tiler.open_tiff(input_path, job_dir)
+            denoised = np.memmap(os.path.join(job_dir, 'denoised.raw'), dtype=np.uint8, mode='w+', shape=(height, width, 3))
+            refined = np.memmap(os.path.join(job_dir, 'refined.raw'), dtype=np.uint8, mode='w+', shape=(height, width, 3))
+            
+            # Passe 1: débruitage (halo = empreinte du filtre) et histogrammes CLAHE de l'image entière
+            def denoise_tile(box):
+                x0, y0, x1, y1 = box
+                tile, inner = self.tiler.read_tile(source, box, denoise_halo(denoise), bgr=image is not None)
+                denoised[y0:y1, x0:x1] = (self.denoise_image(tile, denoise) if denoise else tile)[inner]
+                if not colors:
+                    return 0
+                return self.color_stage.value_histograms(self.color_stage.contrast_channel(denoised[y0:y1, x0:x1]), x0, y0, width, height)
+            
+            histograms = sum(self.tiler.map_tiles(denoise_tile, boxes))
+            luts = self.color_stage.clahe_luts(histograms, width, height) if colors else None
+            
+            # Passe 2: couleurs (LUT CLAHE globales) et netteté (halo d'un pixel, colonnes alignées comme les boucles SIMD d'OpenCV)
+            def refine_tile(box):
+                x0, y0, x1, y1 = box
+                tile, inner = self.tiler.read_tile(denoised, box, SHARPEN_HALO if sharpen else 0, bgr=True, align=SIMD_ALIGN, stage_name='image.tile_read')
+                if colors:
+                    with stage('image.colors', tile.nbytes):
+                        tile = self.color_stage.apply_tile(tile, x0 - inner[1].start, y0 - inner[0].start, width, height, luts)
+                if sharpen:
+                    tile = self.enhance_sharpness(tile)
+                refined[y0:y1, x0:x1] = tile[inner]
+            
+            for _ in self.tiler.map_tiles(refine_tile, boxes):
+                pass
+            
+            return self.encode_image(refined, output_path)
+
+
     # Traitement par lot
     def process_batch(self, file_paths: list, output_dir: str) -> dict:
         results = {'success': [], 'failed': []}
@@ -0,0 +1,122 @@
+import cv2
+import numpy as np
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from ..utils.profiling import bind_context, stage
+
+
+TIFF_EXTENSIONS = ('.tif', '.tiff')
+SHARPEN_HALO = 1
+SIMD_ALIGN = 64
+
+
+#------------------------------------------------------------------#
+#                          Image Tiler                             #
+#------------------------------------------------------------------#
+class ImageTiler:
+    def __init__(self, config):
+        self.config = config
+
+
+    # Nombre de threads de traitement des tuiles
+    def workers(self):
+        return self.config.image_tile_workers or os.cpu_count() or 1
+
+
+    # Image assez grande pour le mode tuilé
+    def should_tile(self, width, height):
+        return bool(self.config.image_tile_size) and width * height >= self.config.image_tile_threshold
+
+
+    # Dimensions (largeur, hauteur) d'une image TIFF lues dans l'en-tête, None sinon
+    def tiff_size(self, input_path):
+        if not input_path.lower().endswith(TIFF_EXTENSIONS):
+            return None
+        try:
+            import tifffile
+            with tifffile.TiffFile(input_path) as tif:
+                shape = source_layout(tif.series[0].shape)
+        except Exception:
+            return None
+        return shape[1], shape[0]
+
+
+    # Source TIFF mappée en mémoire (décompressée dans le dossier du job si nécessaire)
+    def open_tiff(self, input_path, job_dir):
+        import tifffile
+        try:
+            source = tifffile.memmap(input_path, mode='r')
+        except ValueError:
+            with tifffile.TiffFile(input_path) as tif:
+                source = tif.series[0].asarray(out=os.path.join(job_dir, 'source.raw'))
+        return to_interleaved(source)
+
+
+    # Découpage de l'image en tuiles (x0, y0, x1, y1)
+    def tile_boxes(self, width, height):
+        size = self.config.image_tile_size
+        return [(x, y, min(x + size, width), min(y + size, height))
+                for y in range(0, height, size) for x in range(0, width, size)]
+
+
+    # Application parallèle d'une fonction aux tuiles (résultats dans l'ordre), nombre borné de tuiles en vol
+    def map_tiles(self, function, boxes):
+        workers = self.workers()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for box in boxes:
+                pending.append(pool.submit(bind_context(function), box))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+
+    # Lecture d'une tuile avec son halo (colonnes alignées sur align), en BGR 8 bits: (tuile, fenêtre intérieure)
+    def read_tile(self, source, box, halo, bgr=False, align=1, stage_name='image.decode'):
+        x0, y0, x1, y1 = box
+        height, width = source.shape[:2]
+        top, left = max(y0 - halo, 0), max(x0 - halo, 0) // align * align
+        bottom, right = min(y1 + halo, height), min(-(-(x1 + halo) // align) * align, width)
+        
+        with stage(stage_name) as timer:
+            tile = np.ascontiguousarray(source[top:bottom, left:right])
+            if not bgr:
+                tile = to_bgr(tile)
+            timer.amount = tile.nbytes
+        return tile, (slice(y0 - top, y1 - top), slice(x0 - left, x1 - left))
+
+
+# Halo de débruitage: empreinte du filtre (fenêtres de recherche et de patch NL-means, diamètre bilatéral)
+def denoise_halo(params):
+    if params is None:
+        return 0
+    if params['method'] == 'bilateral':
+        return params['diameter'] // 2
+    return params['search'] // 2 + params['template'] // 2
+
+
+# Forme (hauteur, largeur, canaux) d'une série TIFF, plans séparés compris
+def source_layout(shape):
+    if len(shape) == 3 and shape[0] in (3, 4) and shape[2] not in (3, 4):
+        return shape[1], shape[2], shape[0]
+    return shape[0], shape[1], shape[2] if len(shape) == 3 else 1
+
+
+# Vue entrelacée (hauteur, largeur, canaux) d'un TIFF à plans séparés
+def to_interleaved(source):
+    if source.ndim == 3 and source.shape[0] in (3, 4) and source.shape[2] not in (3, 4):
+        return np.moveaxis(source, 0, -1)
+    return source
+
+
+# Conversion d'une tuile TIFF (gris, RGB, RGBA, 16 bits) en BGR 8 bits comme cv2.imread
+def to_bgr(tile):
+    if tile.dtype != np.uint8:
+        tile = cv2.convertScaleAbs(tile, alpha=1 / 256 if tile.dtype == np.uint16 else 1)
+    if tile.ndim == 2 or tile.shape[2] == 1:
+        return cv2.cvtColor(tile, cv2.COLOR_GRAY2BGR)
+    if tile.shape[2] == 4:
+        return cv2.cvtColor(tile, cv2.COLOR_RGBA2BGR)
+    return cv2.cvtColor(tile, cv2.COLOR_RGB2BGR)
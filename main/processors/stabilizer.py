@@ -0,0 +1,121 @@
+import cv2
+import numpy as np
+import hashlib
+import os
+
+
+#------------------------------------------------------------------#
+#                        Video Stabilizer                          #
+#------------------------------------------------------------------#
+class VideoStabilizer:
+    def __init__(self, config):
+        self.config = config
+        self.analysis_width = config.stabilize_analysis_width
+        self.redetect_interval = config.stabilize_redetect_interval
+        self.smoothing_radius = config.stabilize_smoothing
+        self.cache_dir = os.path.join(config.output_dir, '.cache', 'motion')
+
+
+    # Clé de cache: fichier source et paramètres d'analyse (pas le lissage)
+    def cache_key(self, input_path):
+        stat = os.stat(input_path)
+        fingerprint = f"{os.path.abspath(input_path)}|{stat.st_size}|{stat.st_mtime_ns}|{self.analysis_width}|{self.redetect_interval}"
+        return hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()
+
+
+    # Passe d'analyse: mouvement image à image (dx, dy, angle) sur gris réduit
+    def estimate_motion(self, input_path):
+        cap = cv2.VideoCapture(input_path)
+        motions = []
+        prev_gray = None
+        prev_pts = None
+        analysis_size = None
+        
+        try:
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                
+                if analysis_size is None:
+                    width = min(self.analysis_width, frame.shape[1])
+                    analysis_size = (width, max(int(round(frame.shape[0] * width / frame.shape[1])), 1))
+                gray = cv2.cvtColor(cv2.resize(frame, analysis_size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+                
+                motion = (0.0, 0.0, 0.0)
+                if prev_gray is not None:
+                    if prev_pts is None or len(prev_pts) < 20 or len(motions) % self.redetect_interval == 0:
+                        prev_pts = cv2.goodFeaturesToTrack(prev_gray, maxCorners=200, qualityLevel=0.01, minDistance=8, blockSize=3)
+                    
+                    if prev_pts is not None:
+                        curr_pts, status, error = cv2.calcOpticalFlowPyrLK(prev_gray, gray, prev_pts, None)
+                        idx = np.where(status.ravel() == 1)[0]
+                        if len(idx) > 10:
+                            transform = cv2.estimateAffinePartial2D(prev_pts[idx], curr_pts[idx])[0]
+                            if transform is not None:
+                                motion = (transform[0, 2], transform[1, 2], np.arctan2(transform[1, 0], transform[0, 0]))
+                        prev_pts = curr_pts[idx].reshape(-1, 1, 2) if len(idx) else None
+                
+                motions.append(motion)
+                prev_gray = gray
+        finally:
+            cap.release()
+        
+        return np.array(motions, dtype=np.float64).reshape(-1, 3), analysis_size
+
+
+    # Mouvement estimé, relu depuis le cache si disponible
+    def load_motion(self, input_path):
+        cache_path = os.path.join(self.cache_dir, f"{self.cache_key(input_path)}.npz")
+        if os.path.exists(cache_path):
+            try:
+                with np.load(cache_path) as cached:
+                    return cached['motions'], tuple(int(v) for v in cached['analysis_size'])
+            except Exception:
+                pass
+        
+        motions, analysis_size = self.estimate_motion(input_path)
+        if analysis_size is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{cache_path}.{os.getpid()}.tmp.npz"
+            np.savez(temp_path, motions=motions, analysis_size=np.array(analysis_size))
+            os.replace(temp_path, cache_path)
+        return motions, analysis_size
+
+
+    # Corrections: trajectoire lissée (moyenne glissante) moins trajectoire cumulée
+    def trajectory_corrections(self, motions):
+        radius = self.smoothing_radius
+        trajectory = np.cumsum(motions, axis=0)
+        if radius <= 0 or len(trajectory) == 0:
+            return np.zeros_like(trajectory)
+        
+        kernel = np.ones(2 * radius + 1) / (2 * radius + 1)
+        padded = np.pad(trajectory, ((radius, radius), (0, 0)), mode='edge')
+        smoothed = np.stack([np.convolve(padded[:, i], kernel, mode='valid') for i in range(3)], axis=1)
+        return smoothed - trajectory
+
+
+    # Transformations de correction par frame, à la résolution de travail
+    def get_transforms(self, input_path, work_size):
+        motions, analysis_size = self.load_motion(input_path)
+        if analysis_size is None:
+            return []
+        
+        corrections = self.trajectory_corrections(motions)
+        scale = work_size[0] / analysis_size[0]
+        center_x, center_y = work_size[0] / 2.0, work_size[1] / 2.0
+        
+        transforms = []
+        for dx, dy, angle in corrections:
+            cos, sin = np.cos(angle), np.sin(angle)
+            transforms.append(np.array([
+                [cos, -sin, (1 - cos) * center_x + sin * center_y + dx * scale],
+                [sin, cos, -sin * center_x + (1 - cos) * center_y + dy * scale]
+            ], dtype=np.float32))
+        return transforms
+
+
+    # Passe de rendu: une seule déformation par frame
+    def warp(self, frame, transform):
+        return cv2.warpAffine(frame, transform, (frame.shape[1], frame.shape[0]))
@@ -1,9 +1,18 @@
 import cv2
 import numpy as np
-from moviepy.editor import VideoFileClip, AudioFileClip
 import ffmpeg
+from .color_stage import ColorStage
+from .stabilizer import VideoStabilizer
+from ..utils.resolution import plan_video_resolution
+from ..utils.probe import probe_capabilities, probe_media
+from ..utils.scratch import scratch_space
+from ..utils.profiling import profiled, stage, bind_context
+from ..utils.speed_tiers import NLMEANS_MAX, find_stage
 import os
-import tempfile
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 
 #------------------------------------------------------------------#
@@ -14,54 +23,85 @@ class VideoProcessor:
         self.config = config
         self.video_params = config.get_video_params()
         self.audio_params = config.get_audio_params()
+        self.color_stage = ColorStage(clip_limit=2.0, saturation=1.2, contrast_space=config.color_contrast_space)
+        self.sharpen_kernel = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
+        self.stabilizer = VideoStabilizer(config)
 
 
     # Amélioration de la netteté vidéo
+    @profiled('video.sharpen', unit='frames')
     def enhance_frame_sharpness(self, frame):
-        kernel = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
-        return cv2.filter2D(frame, -1, kernel)
+        return cv2.filter2D(frame, -1, self.sharpen_kernel)
 
 
-    # Réduction du bruit vidéo
-    def denoise_frame(self, frame):
-        return cv2.fastNlMeansDenoisingColored(frame, None, 10, 10, 7, 21)
+    # Réduction du bruit vidéo selon les paramètres de l'étape (bilatéral, NL-means, NL-means temporel)
+    @profiled('video.denoise', unit='frames')
+    def denoise_frame(self, frame, window=None, params=None):
+        params = params or NLMEANS_MAX
+        if params['method'] == 'bilateral':
+            return cv2.bilateralFilter(frame, params['diameter'], params['sigma_color'], params['sigma_space'])
+        elif params['method'] == 'temporal':
+            window = window or [frame]
+            return cv2.fastNlMeansDenoisingColoredMulti(window, len(window) // 2, len(window), None,
+                                                        params['h'], params['h_color'], params['template'], params['search'])
+        return cv2.fastNlMeansDenoisingColored(frame, None, params['h'], params['h_color'], params['template'], params['search'])
 
 
-    # Amélioration du contraste
-    def enhance_frame_contrast(self, frame):
-        lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
-        l, a, b = cv2.split(lab)
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-        l = clahe.apply(l)
-        enhanced = cv2.merge([l, a, b])
-        return cv2.cvtColor(enhanced, cv2.COLOR_LAB2BGR)
+    # Rayon de la fenêtre temporelle de débruitage
+    def temporal_radius(self):
+        denoise = find_stage(self.config.get_pipeline('video'), 'denoise')
+        return denoise.get('radius', 1) if denoise and denoise['method'] == 'temporal' else 0
 
 
-    # Stabilisation vidéo
-    def stabilize_frame(self, frame, prev_frame, transform_params):
-        if prev_frame is None:
-            return frame, None
-        
-        prev_gray = cv2.cvtColor(prev_frame, cv2.COLOR_BGR2GRAY)
-        curr_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    # Découpage du flux en jobs (frame, fenêtre temporelle)
+    def iter_frame_jobs(self, read_frame):
+        radius = self.temporal_radius()
+        frames = deque()
+        center = 0
+        eof = False
         
-        prev_pts = cv2.goodFeaturesToTrack(prev_gray, maxCorners=200, qualityLevel=0.01, minDistance=30, blockSize=3)
-        
-        if prev_pts is not None:
-            curr_pts, status, error = cv2.calcOpticalFlowPyrLK(prev_gray, curr_gray, prev_pts, None)
+        while True:
+            while not eof and len(frames) - center <= radius:
+                frame = read_frame()
+                if frame is None:
+                    eof = True
+                else:
+                    frames.append(frame)
             
-            if curr_pts is not None:
-                idx = np.where(status == 1)[0]
-                prev_pts = prev_pts[idx]
-                curr_pts = curr_pts[idx]
-                
-                if len(prev_pts) > 10:
-                    transform = cv2.estimateAffinePartial2D(prev_pts, curr_pts)[0]
-                    if transform is not None:
-                        stabilized = cv2.warpAffine(frame, transform, (frame.shape[1], frame.shape[0]))
-                        return stabilized, transform
-        
-        return frame, None
+            if center >= len(frames):
+                break
+            
+            window = None
+            if radius:
+                half = min(center, len(frames) - center - 1, radius)
+                window = [frames[i] for i in range(center - half, center + half + 1)]
+            
+            yield frames[center], window
+            center += 1
+            while center > radius:
+                frames.popleft()
+                center -= 1
+
+
+    # Amélioration du contraste
+    def enhance_frame_contrast(self, frame):
+        return self.color_stage.apply_contrast(frame)
+
+
+    # Stabilisation vidéo (correction issue de la passe d'analyse)
+    @profiled('video.stabilize', unit='frames')
+    def stabilize_frame(self, frame, transform=None):
+        if transform is None:
+            return frame
+        return self.stabilizer.warp(frame, transform)
+
+
+    # Corrections de stabilisation pour la résolution de travail du plan
+    def get_stabilization(self, input_path, plan):
+        if find_stage(self.config.get_pipeline('video'), 'stabilize') is None or plan is None:
+            return None
+        with stage('video.stabilize_analysis', os.path.getsize(input_path)):
+            return self.stabilizer.get_transforms(input_path, plan['work'])
 
 
     # Upscaling vidéo
@@ -69,32 +109,170 @@ class VideoProcessor:
         return cv2.resize(frame, (target_width, target_height), interpolation=cv2.INTER_CUBIC)
 
 
+    # Plan de résolution pour une source donnée
+    def plan_resolution(self, source_width, source_height):
+        return plan_video_resolution(source_width, source_height, self.video_params['width'], self.video_params['height'])
+
+
+    # Passage à la résolution de travail (réduction avant les filtres)
+    @profiled('video.resize_in', unit='frames')
+    def to_work_resolution(self, frame, plan):
+        width, height = plan['work']
+        if frame.shape[1] != width or frame.shape[0] != height:
+            return cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        return frame
+
+
+    # Passage à la résolution de sortie (agrandissement en dernier, puis letterbox)
+    @profiled('video.resize_out', unit='frames')
+    def to_output_resolution(self, frame, plan):
+        width, height = plan['fit']
+        if frame.shape[1] != width or frame.shape[0] != height:
+            frame = self.upscale_frame(frame, width, height)
+        top, bottom, left, right = plan['padding']
+        if top or bottom or left or right:
+            frame = cv2.copyMakeBorder(frame, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(0, 0, 0))
+        return frame
+
+
+    # Propriétés de la vidéo source (largeur, hauteur, images par seconde)
+    def get_video_properties(self, input_path):
+        cap = cv2.VideoCapture(input_path)
+        try:
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            fps = cap.get(cv2.CAP_PROP_FPS)
+        finally:
+            cap.release()
+        return width, height, fps
+
+
     # Amélioration de la saturation
     def enhance_frame_saturation(self, frame):
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        hsv[:,:,1] = cv2.multiply(hsv[:,:,1], 1.2)
-        return cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
+        return self.color_stage.apply_hsv(frame)
+
+
+    # Traitement d'une frame: étapes du niveau de vitesse dans l'ordre, entre les deux changements de résolution
+    def process_frame(self, frame, transform=None, window=None, plan=None, stages=None):
+        if plan is None:
+            plan = self.plan_resolution(frame.shape[1], frame.shape[0])
+        if stages is None:
+            stages = self.config.get_pipeline('video')
+        
+        if window:
+            window = [self.to_work_resolution(item, plan) for item in window]
+            frame = window[len(window) // 2]
+        else:
+            frame = self.to_work_resolution(frame, plan)
+        
+        processed = frame
+        for step in stages:
+            if step['stage'] == 'denoise':
+                processed = self.denoise_frame(processed, window, step)
+            elif step['stage'] == 'colors':
+                with stage('video.colors', 1, 'frames'):
+                    processed = self.color_stage.apply(processed)
+            elif step['stage'] == 'sharpen':
+                processed = self.enhance_frame_sharpness(processed)
+            elif step['stage'] == 'stabilize':
+                processed = self.stabilize_frame(processed, transform)
+        return self.to_output_resolution(processed, plan)
+
+
+    # Nombre de workers du pipeline de frames
+    def frame_workers(self):
+        return self.config.video_workers or os.cpu_count() or 1
+
 
+    # Nombre maximal de frames décodées vivantes dans le pipeline
+    def frame_pipeline_depth(self):
+        return self.frame_workers() * 2 + self.temporal_radius() * 2 + 4
 
-    # Traitement d'une frame
-    def process_frame(self, frame, prev_frame=None):
-        processed = self.denoise_frame(frame)
-        processed = self.enhance_frame_contrast(processed)
-        processed = self.enhance_frame_saturation(processed)
-        processed = self.enhance_frame_sharpness(processed)
+
+    # Pipeline de frames: décodage, pool de workers, écriture dans l'ordre
+    def run_frame_pipeline(self, read_frame, write_frame, plan=None, transforms=None) -> int:
+        workers = self.frame_workers()
+        stages = self.config.get_pipeline('video')
+        pending = queue.Queue(maxsize=workers * 2)
+        stop = threading.Event()
+        errors = []
+        
+        def decode_frame():
+            with stage('video.decode', unit='frames') as timer:
+                frame = read_frame()
+                timer.amount = 0 if frame is None else 1
+            return frame
         
-        target_width = self.video_params['width']
-        target_height = self.video_params['height']
+        def decode():
+            try:
+                for index, (frame, window) in enumerate(self.iter_frame_jobs(decode_frame)):
+                    if stop.is_set():
+                        break
+                    transform = transforms[index] if transforms and index < len(transforms) else None
+                    future = pool.submit(bind_context(self.process_frame), frame, transform, window, plan, stages)
+                    while not stop.is_set():
+                        try:
+                            pending.put(future, timeout=0.1)
+                            break
+                        except queue.Full:
+                            continue
+            except Exception as e:
+                errors.append(e)
+            finally:
+                pending.put(None)
         
-        if processed.shape[1] < target_width or processed.shape[0] < target_height:
-            processed = self.upscale_frame(processed, target_width, target_height)
+        frame_count = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            decoder = threading.Thread(target=bind_context(decode), daemon=True)
+            decoder.start()
+            try:
+                while True:
+                    future = pending.get()
+                    if future is None:
+                        break
+                    frame = future.result()
+                    with stage('video.encode', 1, 'frames'):
+                        write_frame(frame)
+                    frame_count += 1
+            finally:
+                stop.set()
+                while decoder.is_alive():
+                    try:
+                        future = pending.get(timeout=0.1)
+                        if future is not None:
+                            future.cancel()
+                    except queue.Empty:
+                        continue
+                decoder.join()
         
-        stabilized, transform = self.stabilize_frame(processed, prev_frame, None)
-        return stabilized
+        if errors:
+            raise errors[0]
+        return frame_count
+
+
+    # Lecteur de frames rawvideo bgr24: un anneau de tampons réutilisés, un par frame vivante du pipeline
+    def raw_frame_reader(self, stream, width, height):
+        frame_bytes = width * height * 3
+        buffers = [bytearray(frame_bytes) for _ in range(self.frame_pipeline_depth())]
+        next_buffer = [0]
+        
+        def read_frame():
+            buffer = buffers[next_buffer[0] % len(buffers)]
+            view = memoryview(buffer)
+            filled = 0
+            while filled < frame_bytes:
+                count = stream.readinto(view[filled:])
+                if not count:
+                    return None
+                filled += count
+            next_buffer[0] += 1
+            return np.frombuffer(buffer, dtype=np.uint8).reshape(height, width, 3)
+        
+        return read_frame
 
 
     # Traitement vidéo avec OpenCV
-    def process_video_opencv(self, input_path: str, output_path: str) -> bool:
+    def process_video_opencv(self, input_path: str, output_path: str, plan=None) -> bool:
         try:
             cap = cv2.VideoCapture(input_path)
             fps = cap.get(cv2.CAP_PROP_FPS)
@@ -104,21 +282,16 @@ class VideoProcessor:
             fourcc = cv2.VideoWriter_fourcc(*'mp4v')
             out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
             
-            prev_frame = None
-            frame_count = 0
-            
-            while True:
+            def read_frame():
                 ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                processed_frame = self.process_frame(frame, prev_frame)
-                out.write(processed_frame)
-                prev_frame = frame
-                frame_count += 1
+                return frame if ret else None
             
-            cap.release()
-            out.release()
+            try:
+                transforms = self.get_stabilization(input_path, plan)
+                self.run_frame_pipeline(read_frame, out.write, plan, transforms)
+            finally:
+                cap.release()
+                out.release()
             return True
             
         except Exception as e:
@@ -126,46 +299,120 @@ class VideoProcessor:
 
 
     # Traitement avec FFmpeg
-    def process_video_ffmpeg(self, input_path: str, output_path: str) -> bool:
+    def process_video_ffmpeg(self, input_path: str, output_path: str, plan=None, media=None) -> bool:
         try:
-            temp_video = os.path.join(self.config.temp_dir, 'temp_video.mp4')
+            width = self.video_params['width']
+            height = self.video_params['height']
             
             stream = ffmpeg.input(input_path)
-            video = stream.video.filter('scale', self.video_params['width'], self.video_params['height'])
-            video = video.filter('unsharp', '5:5:1.0:5:5:0.0')
-            video = video.filter('eq', contrast=1.1, brightness=0.05, saturation=1.1)
-            audio = stream.audio.filter('highpass', f=80).filter('lowpass', f=15000)
+            video = stream.video
+            if plan and plan['resize'] == 'up-last':
+                video = video.filter('unsharp', 5, 5, 1.0, 5, 5, 0.0)
+                video = video.filter('eq', contrast=1.1, brightness=0.05, saturation=1.1)
+            video = video.filter('scale', width, height, force_original_aspect_ratio='decrease', force_divisible_by=2)
+            if not plan or plan['resize'] != 'up-last':
+                video = video.filter('unsharp', 5, 5, 1.0, 5, 5, 0.0)
+                video = video.filter('eq', contrast=1.1, brightness=0.05, saturation=1.1)
+            video = video.filter('pad', width, height, '(ow-iw)/2', '(oh-ih)/2')
+            streams = [video]
+            if not media or media.get('has_audio') is not False:
+                streams.append(stream.audio.filter('highpass', f=80).filter('lowpass', f=15000))
             
-            out = ffmpeg.output(video, audio, output_path, 
+            out = ffmpeg.output(*streams, output_path, 
                               vcodec='libx264', 
                               acodec='aac',
                               video_bitrate=self.video_params['bitrate'],
                               audio_bitrate=self.audio_params['bitrate'])
             
-            ffmpeg.run(out, overwrite_output=True, quiet=True)
+            with stage('video.ffmpeg', os.path.getsize(input_path)):
+                ffmpeg.run(out, overwrite_output=True, quiet=True)
             return True
             
         except Exception as e:
             return False
 
 
+    # Traitement par tubes FFmpeg rawvideo: un décodage, la chaîne de frames, un encodage
+    def process_video_pipe(self, input_path: str, output_path: str, plan=None) -> bool:
+        decoder = None
+        encoder = None
+        try:
+            width, height, fps = self.get_video_properties(input_path)
+            if not width or not height:
+                return False
+            if plan is None:
+                plan = self.plan_resolution(width, height)
+            out_width, out_height = plan['output']
+            
+            decoder = (
+                ffmpeg.input(input_path)
+                .output('pipe:', format='rawvideo', pix_fmt='bgr24')
+                .global_args('-loglevel', 'error', '-nostdin')
+                .run_async(pipe_stdout=True)
+            )
+            
+            frames_in = ffmpeg.input('pipe:', format='rawvideo', pix_fmt='bgr24', s=f'{out_width}x{out_height}', framerate=fps or 25)
+            source_audio = ffmpeg.input(input_path)['a?']
+            encoder = (
+                ffmpeg.output(frames_in, source_audio, output_path,
+                              vcodec='libx264',
+                              preset=self.config.video_preset,
+                              threads=self.config.video_encoder_threads,
+                              pix_fmt='yuv420p',
+                              video_bitrate=self.video_params['bitrate'],
+                              acodec='aac',
+                              audio_bitrate=self.audio_params['bitrate'],
+                              shortest=None)
+                .global_args('-loglevel', 'error')
+                .overwrite_output()
+                .run_async(pipe_stdin=True)
+            )
+            
+            def write_frame(frame):
+                encoder.stdin.write(np.ascontiguousarray(frame).data)
+            
+            transforms = self.get_stabilization(input_path, plan)
+            self.run_frame_pipeline(self.raw_frame_reader(decoder.stdout, width, height), write_frame, plan, transforms)
+            
+            encoder.stdin.close()
+            decoder.stdout.close()
+            return encoder.wait() == 0 and decoder.wait() == 0
+            
+        except Exception as e:
+            return False
+        
+        finally:
+            for process in (decoder, encoder):
+                if process is not None and process.poll() is None:
+                    process.kill()
+                    process.wait()
+
+
     # Traitement avec MoviePy
-    def process_video_moviepy(self, input_path: str, output_path: str) -> bool:
+    def process_video_moviepy(self, input_path: str, output_path: str, plan=None) -> bool:
         try:
+            from moviepy.editor import VideoFileClip
             clip = VideoFileClip(input_path)
+            transforms = self.get_stabilization(input_path, plan)
+            stages = self.config.get_pipeline('video')
             
             def enhance_frame(get_frame, t):
                 frame = get_frame(t)
                 frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-                processed = self.process_frame(frame_bgr)
+                index = int(round(t * clip.fps))
+                transform = transforms[index] if transforms and index < len(transforms) else None
+                processed = self.process_frame(frame_bgr, transform, plan=plan, stages=stages)
                 return cv2.cvtColor(processed, cv2.COLOR_BGR2RGB)
             
             enhanced_clip = clip.fl(enhance_frame)
             
-            enhanced_clip.write_videofile(output_path, 
-                                        codec='libx264',
-                                        bitrate=self.video_params['bitrate'],
-                                        audio_codec='aac')
+            with scratch_space(self.config).job(estimate=int(clip.duration * 64000)) as job_dir, \
+                    stage('video.moviepy', os.path.getsize(input_path)):
+                enhanced_clip.write_videofile(output_path, 
+                                            codec='libx264',
+                                            bitrate=self.video_params['bitrate'],
+                                            audio_codec='aac',
+                                            temp_audiofile=os.path.join(job_dir, 'audio.m4a'))
             
             clip.close()
             enhanced_clip.close()
@@ -175,14 +422,70 @@ class VideoProcessor:
             return False
 
 
-    # Traitement principal
-    def process_video(self, input_path: str, output_path: str) -> bool:
-        if self.process_video_ffmpeg(input_path, output_path):
-            return True
-        elif self.process_video_moviepy(input_path, output_path):
-            return True
+    # Choix d'un seul backend à partir des capacités et du fichier sondé: (backend, raison d'échec)
+    # (en auto, les backends qui appliquent la chaîne de frames du niveau de vitesse passent en premier)
+    def select_video_backend(self, media):
+        capabilities = probe_capabilities()
+        encoders = capabilities['encoders']
+        available = {
+            'ffmpeg': capabilities['ffmpeg'] and 'libx264' in encoders and ('aac' in encoders or media.get('has_audio') is False),
+            'pipe': capabilities['ffmpeg'] and 'libx264' in encoders and ('aac' in encoders or media.get('has_audio') is False),
+            'moviepy': capabilities['moviepy'],
+            'opencv': True
+        }
+        reasons = {
+            'ffmpeg': 'FFmpeg with libx264/aac encoders not found',
+            'pipe': 'FFmpeg with libx264/aac encoders not found',
+            'moviepy': 'MoviePy is not installed',
+            'opencv': None
+        }
+        
+        backend = self.config.video_backend
+        if backend == 'auto':
+            backend = next(name for name in ('pipe', 'moviepy', 'opencv') if available[name])
+        elif backend not in available:
+            return None, f"Unknown video backend: {backend}"
+        elif not available[backend]:
+            return None, reasons[backend]
+        return backend, None
+
+
+    # Traitement principal: sondage, choix du backend, un seul passage
+    def process_video(self, input_path: str, output_path: str, info: dict = None) -> bool:
+        if info is None:
+            info = {}
+        media = info.get('media')
+        if media is None:
+            with stage('video.probe'):
+                media = probe_media(input_path)
+        info['media'] = media
+        if 'error' in media:
+            info['error'] = media['error']
+            return False
+        
+        plan = self.plan_resolution(media['width'], media['height'])
+        info['resolution_plan'] = plan
+        
+        backend, reason = self.select_video_backend(media)
+        info['backend'] = backend
+        if backend is None:
+            info['error'] = reason
+            return False
+        
+        # Le graphe de filtres FFmpeg n'applique pas la chaîne de frames: aucun niveau de vitesse appliqué
+        if backend == 'ffmpeg':
+            info['speed'] = None
+            info['stages'] = []
+        else:
+            info['stages'] = [step['stage'] for step in self.config.get_pipeline('video')]
+        
+        if backend == 'ffmpeg':
+            success = self.process_video_ffmpeg(input_path, output_path, plan, media)
         else:
-            return self.process_video_opencv(input_path, output_path)
+            success = getattr(self, f"process_video_{backend}")(input_path, output_path, plan)
+        if not success:
+            info['error'] = f"Video backend '{backend}' failed"
+        return success
 
 
     # Traitement par lot
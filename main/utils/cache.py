@@ -0,0 +1,186 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+from .file_handler import reflink
+
+
+PIPELINE_VERSION = '4'
+SAMPLE_SIZE = 1024 * 1024
+INDEX_NAME = 'index.json'
+EVICT_INTERVAL = 64
+NON_PROCESSING_SETTINGS = {
+    'output_dir', 'temp_dir', 'scratch_root', 'scratch_budget', 'preserve_original', 'backup_strategy', 'video_workers',
+    'result_cache', 'cache_max_bytes', 'cache_max_object_bytes', 'scan_workers', 'schedule_window', 'probe_workers',
+    'lane_limits', 'profiling', 'trace_path', 'image_tile_size', 'image_tile_threshold', 'image_tile_workers',
+    'image_pipeline', 'image_io_workers', 'image_prefetch',
+    'supported_video_formats', 'supported_audio_formats', 'supported_image_formats'
+}
+
+
+#------------------------------------------------------------------#
+#                          Result Cache                            #
+#------------------------------------------------------------------#
+class ResultCache:
+    def __init__(self, config):
+        self.config = config
+        self.lock = threading.Lock()
+        self.size_dir = None
+        self.size = None
+        self.stores = 0
+
+
+    # Dossier des objets du cache (suit le dossier de sortie courant)
+    @property
+    def cache_dir(self):
+        return os.path.join(self.config.output_dir, '.cache', 'results')
+
+
+    # Hash de contenu échantillonné: taille, début, milieu et fin du fichier
+    def content_hash(self, file_path):
+        digest = hashlib.blake2b(digest_size=20)
+        size = os.path.getsize(file_path)
+        digest.update(str(size).encode('utf-8'))
+        
+        with open(file_path, 'rb') as f:
+            if size <= 3 * SAMPLE_SIZE:
+                digest.update(f.read())
+            else:
+                for offset in (0, (size - SAMPLE_SIZE) // 2, size - SAMPLE_SIZE):
+                    f.seek(offset)
+                    digest.update(f.read(SAMPLE_SIZE))
+        return digest.hexdigest()
+
+
+    # Empreinte des paramètres effectifs et de la version du pipeline
+    def config_fingerprint(self):
+        settings = {key: value for key, value in vars(self.config).items() if key not in NON_PROCESSING_SETTINGS}
+        payload = json.dumps({'pipeline': PIPELINE_VERSION, 'settings': settings}, sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=20).hexdigest()
+
+
+    # Clé d'un résultat: contenu source, réglages, type de média et format de sortie
+    def make_key(self, input_path, media_type, output_path):
+        parts = [self.content_hash(input_path), self.config_fingerprint(), media_type, os.path.splitext(output_path)[1].lower()]
+        return hashlib.blake2b('|'.join(parts).encode('utf-8'), digest_size=20).hexdigest()
+
+
+    # Chemin de l'objet associé à une clé
+    def object_path(self, key, output_path):
+        return os.path.join(self.cache_dir, key[:2], key + os.path.splitext(output_path)[1].lower())
+
+
+    # Succès du cache: copie indépendante (reflink ou copie) de la sortie précédente
+    def fetch(self, key, output_path) -> bool:
+        cached_path = self.object_path(key, output_path)
+        if not os.path.exists(cached_path):
+            return False
+        
+        try:
+            os.utime(cached_path)
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+            temp_path = f"{output_path}.{os.getpid()}.cache.tmp"
+            self.clone_or_copy(cached_path, temp_path)
+            os.replace(temp_path, output_path)
+            return True
+        except OSError:
+            return False
+
+
+    # Enregistrement d'une sortie fraîchement produite (copie: la sortie publiée reste modifiable);
+    # au-delà de cache_max_object_bytes (None: sans limite), seul un reflink est tenté, jamais une copie
+    def store(self, key, output_path):
+        cached_path = self.object_path(key, output_path)
+        try:
+            size = os.path.getsize(output_path)
+            os.makedirs(os.path.dirname(cached_path), exist_ok=True)
+            previous = os.path.getsize(cached_path) if os.path.exists(cached_path) else 0
+            temp_path = f"{cached_path}.{os.getpid()}.tmp"
+            if self.fits_copy(size):
+                self.clone_or_copy(output_path, temp_path)
+            elif reflink(output_path, temp_path):
+                shutil.copystat(output_path, temp_path)
+            else:
+                return
+            os.replace(temp_path, cached_path)
+        except OSError:
+            return
+        self.track(size - previous)
+
+
+    # Sortie assez petite pour être copiée dans le cache (la copie n'est pas comptée par la vérification d'espace)
+    def fits_copy(self, size):
+        return self.config.cache_max_object_bytes is None or size <= self.config.cache_max_object_bytes
+
+
+    # Reflink si possible, sinon copie (jamais de lien physique partagé avec la sortie)
+    def clone_or_copy(self, source, destination):
+        if reflink(source, destination):
+            shutil.copystat(source, destination)
+        else:
+            shutil.copy2(source, destination)
+
+
+    # Taille courante tenue à jour à chaque enregistrement; parcours complet seulement au-delà
+    # du budget, sans index ou tous les EVICT_INTERVAL enregistrements (autres processus)
+    def track(self, delta):
+        with self.lock:
+            if self.size_dir != self.cache_dir:
+                self.size_dir = self.cache_dir
+                self.size = self.read_index()
+                self.stores = 0
+            
+            self.stores += 1
+            if self.size is not None:
+                self.size += delta
+            if self.size is None or self.size > self.config.cache_max_bytes or self.stores % EVICT_INTERVAL == 0:
+                self.size = self.evict()
+            self.write_index(self.size)
+
+
+    # Taille enregistrée dans l'index annexe, None si absent ou illisible
+    def read_index(self):
+        try:
+            with open(os.path.join(self.cache_dir, INDEX_NAME), 'r', encoding='utf-8') as f:
+                return int(json.load(f)['bytes'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+
+    # Écriture atomique de l'index annexe
+    def write_index(self, size):
+        index_path = os.path.join(self.cache_dir, INDEX_NAME)
+        temp_path = f"{index_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'bytes': size}, f)
+            os.replace(temp_path, index_path)
+        except OSError:
+            pass
+
+
+    # Éviction LRU (date de dernier accès via mtime) au-delà de la taille maximale; taille restante
+    def evict(self):
+        entries = []
+        for root, dirs, files in os.walk(self.cache_dir):
+            for name in files:
+                if root == self.cache_dir and name.startswith(INDEX_NAME):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in sorted(entries):
+            if total <= self.config.cache_max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+        return total
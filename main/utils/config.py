@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+from .speed_tiers import VIDEO_DENOISE_TIERS, SPEED_TIERS, load_tiers, resolve_stages
 
 
 
@@ -14,10 +15,51 @@ class Config:
         self.supported_image_formats = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp']
         self.output_dir = 'refined_media'
         self.temp_dir = 'temp_processing'
+        self.scratch_root = None
+        self.scratch_budget = None
         self.video_quality = 'hd'
         self.audio_quality = 'high'
         self.image_quality = 'high'
+        self.speed = 'max'
+        self.speed_tiers = {}
         self.preserve_original = True
+        self.backup_strategy = 'reflink'
+        self.result_cache = True
+        self.scan_workers = 1
+        self.profiling = True
+        self.trace_path = None
+        self.schedule_window = 512
+        self.probe_workers = 4
+        self.lane_limits = {'video': None, 'audio': None, 'image': None}
+        self.cache_max_bytes = 10 * 1024 ** 3
+        self.cache_max_object_bytes = 512 * 1024 ** 2
+        self.video_workers = None
+        self.image_tile_size = 2048
+        self.image_tile_threshold = 64 * 1000 * 1000
+        self.image_tile_workers = None
+        self.image_pipeline = True
+        self.image_io_workers = 2
+        self.image_prefetch = 4
+        self.color_contrast_space = 'lab'
+        self.video_backend = 'auto'
+        self.video_preset = 'medium'
+        self.video_encoder_threads = 0
+        self.video_denoise = None
+        self.video_stabilize = True
+        self.stabilize_smoothing = 15
+        self.stabilize_redetect_interval = 10
+        self.stabilize_analysis_width = 320
+        self.audio_streaming = 'auto'
+        self.audio_stream_min_duration = 600
+        self.audio_block_size = 262144
+        self.dynamics = {
+            'threshold': 0.1,
+            'ratio': 4.0,
+            'attack': 0.003,
+            'release': 0.1,
+            'hold': 0.02,
+            'makeup_gain': 1.0
+        }
 
 
     # Validation du format de fichier
@@ -66,3 +108,37 @@ class Config:
             'max': {'quality': 100, 'dpi': 600}
         }
         return params.get(self.image_quality, params['high'])
+
+
+    # Chargement de niveaux de vitesse personnalisés depuis un fichier JSON
+    def load_speed_tiers(self, path):
+        self.speed_tiers = load_tiers(path)
+
+
+    # Chaîne d'étapes du niveau de vitesse pour un type de média (réglages vidéo explicites prioritaires)
+    def get_pipeline(self, media_type):
+        stages = resolve_stages(media_type, self.speed, self.speed_tiers)
+        if media_type != 'video':
+            return stages
+        
+        if self.video_denoise is not None:
+            denoise = VIDEO_DENOISE_TIERS[self.video_denoise]
+            index = next((i for i, step in enumerate(stages) if step['stage'] == 'denoise'), None)
+            if index is not None:
+                stages.pop(index)
+            if denoise is not None:
+                stages.insert(index or 0, dict(denoise, stage='denoise'))
+        if not self.video_stabilize:
+            stages = [step for step in stages if step['stage'] != 'stabilize']
+        return stages
+
+
+    # Vérification du niveau de vitesse pour tous les types de média
+    def validate_pipelines(self):
+        for media_type in SPEED_TIERS:
+            self.get_pipeline(media_type)
+
+
+    # Configuration du compresseur de dynamique
+    def get_dynamics_params(self):
+        return dict(self.dynamics)
@@ -1,8 +1,20 @@
 import os
 import shutil
+import threading
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterator, List, NamedTuple, Optional
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 import mimetypes
+from .scratch import scratch_space
+
+
+FICLONE = 0x40049409
+
+
+class MediaFile(NamedTuple):
+    path: str
+    media_type: str
+    size: int
 
 
 
@@ -14,26 +26,28 @@ class FileHandler:
     def __init__(self, config):
         self.config = config
         self.processed_files = []
+        self.extension_types = self.build_extension_types()
+        self.link_results = {}
+
+
+    # Table extension -> type de média (types MIME connus, puis formats supportés)
+    def build_extension_types(self) -> dict:
+        if not mimetypes.inited:
+            mimetypes.init()
+        extension_types = {}
+        for ext, mime_type in mimetypes.types_map.items():
+            media_type = mime_type.split('/', 1)[0]
+            if media_type in ('video', 'audio', 'image'):
+                extension_types[ext.lower()] = media_type
+        for media_type in ('video', 'audio', 'image'):
+            for ext in getattr(self.config, f"supported_{media_type}_formats"):
+                extension_types.setdefault(ext.lower(), media_type)
+        return extension_types
 
 
     # Détection du type de média
     def detect_media_type(self, file_path: str) -> Optional[str]:
-        mime_type, _ = mimetypes.guess_type(file_path)
-        if mime_type:
-            if mime_type.startswith('video/'):
-                return 'video'
-            elif mime_type.startswith('audio/'):
-                return 'audio'
-            elif mime_type.startswith('image/'):
-                return 'image'
-        ext = Path(file_path).suffix.lower()
-        if ext in self.config.supported_video_formats:
-            return 'video'
-        elif ext in self.config.supported_audio_formats:
-            return 'audio'
-        elif ext in self.config.supported_image_formats:
-            return 'image'
-        return None
+        return self.extension_types.get(os.path.splitext(file_path)[1].lower())
 
 
     # Validation de l'existence du fichier
@@ -52,49 +66,198 @@ class FileHandler:
         return os.path.join(self.config.output_dir, output_name)
 
 
-    # Sauvegarde du fichier original
-    def backup_original(self, file_path: str) -> str:
+    # Stratégie de sauvegarde effective (none si les originaux ne sont pas conservés)
+    def backup_strategy(self) -> str:
         if not self.config.preserve_original:
+            return 'none'
+        return self.config.backup_strategy
+
+
+    # Chemin de sauvegarde: arborescence relative au dossier courant (ou absolue) sous originals/
+    def generate_backup_path(self, file_path: str) -> str:
+        absolute_path = os.path.abspath(file_path)
+        relative_path = os.path.relpath(absolute_path)
+        if relative_path.startswith(os.pardir) or os.path.isabs(relative_path):
+            relative_path = os.path.splitdrive(absolute_path)[1].lstrip(os.sep + (os.altsep or ''))
+        return os.path.join(self.config.output_dir, 'originals', relative_path)
+
+
+    # Sauvegarde du fichier original (reflink, lien physique ou copie, avec repli sur la copie)
+    def backup_original(self, file_path: str) -> str:
+        strategy = self.backup_strategy()
+        if strategy == 'none':
             return file_path
-        backup_dir = os.path.join(self.config.output_dir, 'originals')
-        os.makedirs(backup_dir, exist_ok=True)
-        backup_path = os.path.join(backup_dir, Path(file_path).name)
-        shutil.copy2(file_path, backup_path)
+        
+        backup_path = self.generate_backup_path(file_path)
+        os.makedirs(os.path.dirname(backup_path), exist_ok=True)
+        if self.backup_is_current(file_path, backup_path, strategy):
+            return backup_path
+        
+        temp_path = f"{backup_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            if strategy == 'hardlink':
+                linked = self.hardlink(file_path, temp_path)
+            elif strategy == 'reflink':
+                linked = reflink(file_path, temp_path)
+                if linked:
+                    shutil.copystat(file_path, temp_path)
+            else:
+                linked = False
+            if strategy in ('hardlink', 'reflink'):
+                self.link_results[(os.stat(file_path).st_dev, self.config.output_dir, strategy)] = linked
+            
+            if not linked:
+                shutil.copy2(file_path, temp_path)
+            os.replace(temp_path, backup_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
         return backup_path
 
 
-    # Nettoyage des fichiers temporaires
+    # Sauvegarde déjà à jour: même inode pour un lien, même taille et date pour une copie
+    def backup_is_current(self, file_path: str, backup_path: str, strategy: str) -> bool:
+        try:
+            source = os.stat(file_path)
+            backup = os.stat(backup_path)
+        except OSError:
+            return False
+        same_inode = (source.st_dev, source.st_ino) == (backup.st_dev, backup.st_ino)
+        if strategy == 'hardlink':
+            return same_inode
+        return not same_inode and (source.st_size, source.st_mtime_ns) == (backup.st_size, backup.st_mtime_ns)
+
+
+    # Lien physique; False si non supporté (autre volume, système de fichiers...)
+    def hardlink(self, source: str, destination: str) -> bool:
+        try:
+            os.link(source, destination)
+            return True
+        except OSError:
+            return False
+
+
+    # Nettoyage des fichiers temporaires: sessions orphelines et session de ce processus
     def cleanup_temp_files(self):
-        if os.path.exists(self.config.temp_dir):
-            shutil.rmtree(self.config.temp_dir)
-        os.makedirs(self.config.temp_dir, exist_ok=True)
+        scratch = scratch_space(self.config)
+        scratch.purge_stale()
+        scratch.close()
 
 
     # Scan des fichiers dans un dossier
     def scan_directory(self, directory: str) -> List[str]:
-        supported_files = []
-        for root, dirs, files in os.walk(directory):
-            for file in files:
-                file_path = os.path.join(root, file)
-                if self.detect_media_type(file_path) and self.validate_file(file_path):
-                    supported_files.append(file_path)
-        return supported_files
+        return [media_file.path for media_file in self.iter_media_files(directory)]
+
+
+    # Scan paresseux: (chemin, type, taille) produits au fil du parcours
+    def iter_media_files(self, directory: str, recursive: bool = True, workers: int = None) -> Iterator[MediaFile]:
+        workers = workers or self.config.scan_workers
+        if recursive and workers > 1:
+            yield from self.iter_media_files_parallel(directory, workers)
+            return
+        
+        pending = [directory]
+        while pending:
+            media_files, subdirectories = self.scan_entries(pending.pop())
+            yield from media_files
+            if recursive:
+                pending.extend(reversed(subdirectories))
+
+
+    # Parcours des sous-dossiers en parallèle (utile sur les montages réseau)
+    def iter_media_files_parallel(self, directory: str, workers: int) -> Iterator[MediaFile]:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(self.scan_entries, directory)}
+            try:
+                while futures:
+                    done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        media_files, subdirectories = future.result()
+                        futures.update(pool.submit(self.scan_entries, subdirectory) for subdirectory in subdirectories)
+                        yield from media_files
+            finally:
+                for future in futures:
+                    future.cancel()
+
+
+    # Dossiers jamais parcourus: sortie (sauvegardes, cache) et espace de travail
+    def excluded_directories(self) -> set:
+        roots = (self.config.output_dir, self.config.temp_dir, self.config.scratch_root)
+        return {os.path.abspath(root) for root in roots if root}
+
+
+    # Lecture d'un seul dossier: fichiers média non vides et sous-dossiers (hors dossiers exclus)
+    def scan_entries(self, directory: str):
+        media_files = []
+        subdirectories = []
+        excluded = self.excluded_directories()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if os.path.abspath(entry.path) not in excluded:
+                                subdirectories.append(entry.path)
+                            continue
+                        media_type = self.extension_types.get(os.path.splitext(entry.name)[1].lower())
+                        if media_type and entry.is_file():
+                            size = entry.stat().st_size
+                            if size > 0:
+                                media_files.append(MediaFile(entry.path, media_type, size))
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return media_files, subdirectories
+
+
+    # Multiplicateur d'espace requis: la sauvegarde compte comme une copie (2.0) tant qu'un lien
+    # (reflink ou physique) n'a pas réussi depuis ce système de fichiers vers la sortie, le repli étant la copie
+    def space_multiplier(self, file_path: str) -> float:
+        strategy = self.backup_strategy()
+        if strategy == 'none':
+            return 1.0
+        if strategy in ('hardlink', 'reflink') and self.link_results.get((os.stat(file_path).st_dev, self.config.output_dir, strategy)):
+            return 1.0
+        return 2.0
 
 
     # Vérification de l'espace disque
-    def check_disk_space(self, file_path: str, multiplier: float = 2.0) -> bool:
+    def check_disk_space(self, file_path: str, multiplier: float = None) -> bool:
         file_size = os.path.getsize(file_path)
+        if multiplier is None:
+            multiplier = self.space_multiplier(file_path)
         required_space = file_size * multiplier
         free_space = shutil.disk_usage(self.config.output_dir).free
         return free_space > required_space
 
 
     # Enregistrement des fichiers traités
-    def log_processed_file(self, input_path: str, output_path: str, status: str):
-        self.processed_files.append({
+    def log_processed_file(self, input_path: str, output_path: str, status: str, details: dict = None):
+        record = {
             'input': input_path,
             'output': output_path,
             'status': status,
             'size_before': os.path.getsize(input_path) if os.path.exists(input_path) else 0,
             'size_after': os.path.getsize(output_path) if os.path.exists(output_path) else 0
-        })
+        }
+        if details:
+            record.update(details)
+        self.processed_files.append(record)
+
+
+# Copie sur écriture (ioctl FICLONE, Btrfs/XFS/...); False si non supportée
+def reflink(source: str, destination: str) -> bool:
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    
+    try:
+        with open(source, 'rb') as src, open(destination, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except OSError:
+        if os.path.exists(destination):
+            os.remove(destination)
+        return False
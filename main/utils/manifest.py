@@ -0,0 +1,89 @@
+import os
+import time
+import sqlite3
+import threading
+
+
+COMMIT_INTERVAL = 64
+COMMIT_SECONDS = 2.0
+
+#------------------------------------------------------------------#
+#                      Processing Manifest                         #
+#------------------------------------------------------------------#
+class Manifest:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.last_commit = time.monotonic()
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.connection = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute('''
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime_ns INTEGER,
+                fingerprint TEXT,
+                status TEXT,
+                output_path TEXT,
+                processed_at REAL
+            )
+        ''')
+        self.connection.commit()
+
+
+    # Fichier nouveau, modifié, en échec ou traité avec d'autres réglages
+    def needs_processing(self, file_path, fingerprint) -> bool:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+        
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT size, mtime_ns, fingerprint, status FROM files WHERE path = ?',
+                (os.path.abspath(file_path),)
+            ).fetchone()
+        return row != (stat.st_size, stat.st_mtime_ns, fingerprint, 'success')
+
+
+    # Enregistrement du résultat d'un fichier traité (validé par lots de COMMIT_INTERVAL fichiers
+    # ou toutes les COMMIT_SECONDS secondes; les lectures de cette connexion le voient aussitôt)
+    def record(self, file_path, fingerprint, status, output_path=None):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return
+        
+        with self.lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns, fingerprint, status, output_path, time.time())
+            )
+            self.pending += 1
+            if self.pending >= COMMIT_INTERVAL or time.monotonic() - self.last_commit >= COMMIT_SECONDS:
+                self.commit()
+
+
+    # Validation des enregistrements en attente (verrou tenu par l'appelant)
+    def commit(self):
+        self.connection.commit()
+        self.pending = 0
+        self.last_commit = time.monotonic()
+
+
+    # Validation immédiate (fin de lot)
+    def flush(self):
+        with self.lock:
+            if self.pending:
+                self.commit()
+
+
+    # Fermeture de la base (enregistrements en attente validés)
+    def close(self):
+        with self.lock:
+            if self.pending:
+                self.commit()
+            self.connection.close()
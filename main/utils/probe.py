@@ -0,0 +1,123 @@
+import os
+import re
+import shutil
+import subprocess
+import importlib.util
+from functools import lru_cache
+
+
+#------------------------------------------------------------------#
+#                     Capability Probe                             #
+#------------------------------------------------------------------#
+
+# Capacités de la machine, sondées une seule fois par processus
+@lru_cache(maxsize=None)
+def probe_capabilities() -> dict:
+    ffmpeg_path = shutil.which('ffmpeg')
+    encoders = frozenset()
+    if ffmpeg_path:
+        try:
+            output = subprocess.run([ffmpeg_path, '-hide_banner', '-encoders'], capture_output=True, text=True, timeout=30).stdout
+            encoders = frozenset(match.group(1) for match in re.finditer(r'^\s[VAS][\w.]{5}\s+(\S+)', output, re.MULTILINE))
+        except (OSError, subprocess.SubprocessError):
+            ffmpeg_path = None
+    
+    return {
+        'ffmpeg': ffmpeg_path,
+        'ffprobe': shutil.which('ffprobe'),
+        'encoders': encoders,
+        'moviepy': importlib.util.find_spec('moviepy') is not None
+    }
+
+
+#------------------------------------------------------------------#
+#                        Media Probe                               #
+#------------------------------------------------------------------#
+
+# Description d'un fichier: flux, codec, résolution, durée (ou raison d'échec dans 'error')
+def probe_media(path: str) -> dict:
+    capabilities = probe_capabilities()
+    if not os.path.isfile(path):
+        return {'error': 'File not found'}
+    
+    if capabilities['ffprobe']:
+        media = probe_with_ffprobe(path)
+    elif capabilities['ffmpeg']:
+        media = probe_with_ffmpeg(path, capabilities['ffmpeg'])
+    else:
+        media = probe_with_opencv(path)
+    
+    if 'error' not in media and not media.get('width'):
+        media['error'] = 'No video stream'
+    return media
+
+
+# Sonde ffprobe (JSON)
+def probe_with_ffprobe(path):
+    import ffmpeg
+    try:
+        data = ffmpeg.probe(path)
+    except ffmpeg.Error as e:
+        lines = e.stderr.decode('utf-8', 'replace').strip().splitlines()
+        return {'error': f"Unreadable media: {lines[-1] if lines else 'ffprobe failed'}"}
+    
+    streams = data.get('streams', [])
+    video = next((s for s in streams if s.get('codec_type') == 'video'), {})
+    rate = video.get('avg_frame_rate') or video.get('r_frame_rate') or '0/1'
+    num, _, den = rate.partition('/')
+    return {
+        'video_codec': video.get('codec_name'),
+        'width': int(video.get('width', 0)),
+        'height': int(video.get('height', 0)),
+        'fps': float(num) / float(den) if den and float(den) else float(num or 0),
+        'duration': float(data.get('format', {}).get('duration', 0) or 0),
+        'has_audio': any(s.get('codec_type') == 'audio' for s in streams)
+    }
+
+
+# Sonde via la bannière de `ffmpeg -i` quand ffprobe est absent
+def probe_with_ffmpeg(path, ffmpeg_path):
+    try:
+        output = subprocess.run([ffmpeg_path, '-hide_banner', '-nostdin', '-i', path], capture_output=True, text=True, timeout=30).stderr
+    except (OSError, subprocess.SubprocessError) as e:
+        return {'error': f"Probe failed: {e}"}
+    
+    if 'Input #0' not in output:
+        lines = output.strip().splitlines()
+        return {'error': f"Unreadable media: {lines[-1] if lines else 'unknown format'}"}
+    
+    media = {'video_codec': None, 'width': 0, 'height': 0, 'fps': 0.0, 'duration': 0.0, 'has_audio': ' Audio: ' in output}
+    duration = re.search(r'Duration: (\d+):(\d+):([\d.]+)', output)
+    if duration:
+        hours, minutes, seconds = duration.groups()
+        media['duration'] = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    
+    video = re.search(r'Stream #\S+.*?: Video: (\w+).*?, (\d{2,})x(\d{2,})', output)
+    if video:
+        media['video_codec'] = video.group(1)
+        media['width'], media['height'] = int(video.group(2)), int(video.group(3))
+        fps = re.search(r'Video: .*?([\d.]+) (?:fps|tbr)', output)
+        media['fps'] = float(fps.group(1)) if fps else 0.0
+    return media
+
+
+# Sonde OpenCV de dernier recours (présence d'audio inconnue)
+def probe_with_opencv(path):
+    import cv2
+    cap = cv2.VideoCapture(path)
+    try:
+        if not cap.isOpened():
+            return {'error': 'Unreadable media: OpenCV cannot open file'}
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frames = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+        return {
+            'video_codec': ''.join(chr((fourcc >> 8 * i) & 0xFF) for i in range(4)).strip() or None,
+            'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            'fps': fps,
+            'duration': frames / fps if fps else 0.0,
+            'has_audio': None
+        }
+    finally:
+        cap.release()
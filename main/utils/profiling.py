@@ -0,0 +1,226 @@
+import os
+import json
+import time
+import threading
+import functools
+import contextvars
+from contextlib import contextmanager
+
+
+_current_profile = contextvars.ContextVar('media_refiner_profile', default=None)
+
+
+#------------------------------------------------------------------#
+#                          Job Profile                             #
+#------------------------------------------------------------------#
+class JobProfile:
+    def __init__(self, name, trace=False):
+        self.name = name
+        self.trace = trace
+        self.stages = {}
+        self.events = []
+        self.lock = threading.Lock()
+
+
+    # Ajout d'une mesure d'étape (et de son événement de trace si demandé)
+    def add(self, stage, start, wall, cpu, amount, unit):
+        with self.lock:
+            totals = self.stages.get(stage)
+            if totals is None:
+                totals = self.stages[stage] = {'calls': 0, 'wall': 0.0, 'cpu': 0.0, 'amount': 0, 'unit': unit}
+            totals['calls'] += 1
+            totals['wall'] += wall
+            totals['cpu'] += cpu
+            totals['amount'] += amount
+            if self.trace:
+                self.events.append((stage, start, wall, os.getpid(), threading.get_ident(), self.name))
+
+
+    # Mesures par étape du job (secondes, quantité traitée et unité)
+    def timings(self) -> dict:
+        with self.lock:
+            return {
+                stage: {
+                    'calls': totals['calls'],
+                    'wall': round(totals['wall'], 6),
+                    'cpu': round(totals['cpu'], 6),
+                    'amount': totals['amount'],
+                    'unit': totals['unit']
+                }
+                for stage, totals in self.stages.items()
+            }
+
+
+
+
+#------------------------------------------------------------------#
+#                          Stage Timer                             #
+#------------------------------------------------------------------#
+class StageTimer:
+    __slots__ = ('name', 'amount', 'unit', 'profile', 'start', 'cpu')
+    
+    def __init__(self, name, amount=0, unit='bytes'):
+        self.name = name
+        self.amount = amount
+        self.unit = unit
+        self.profile = None
+
+
+    # Début de mesure (aucun coût hors d'un job profilé)
+    def __enter__(self):
+        self.profile = _current_profile.get()
+        if self.profile is not None:
+            self.cpu = time.thread_time()
+            self.start = time.perf_counter()
+        return self
+
+
+    # Fin de mesure: temps réel, temps CPU du thread et quantité traitée
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.profile is not None:
+            wall = time.perf_counter() - self.start
+            cpu = time.thread_time() - self.cpu
+            self.profile.add(self.name, self.start, wall, cpu, self.amount, self.unit)
+        return False
+
+
+# Mesure d'une étape du job courant (la quantité peut être fixée dans le bloc)
+def stage(name, amount=0, unit='bytes') -> StageTimer:
+    return StageTimer(name, amount, unit)
+
+
+# Décorateur d'étape de traitement: quantité = 1 frame, ou octets du premier argument
+def profiled(name, unit='bytes'):
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(self, data, *args, **kwargs):
+            if _current_profile.get() is None:
+                return function(self, data, *args, **kwargs)
+            amount = 1 if unit == 'frames' else getattr(data, 'nbytes', 0)
+            with StageTimer(name, amount, unit):
+                return function(self, data, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# Itération mesurée: la production de chaque élément compte comme un appel de l'étape
+def profiled_iter(iterable, name, unit='bytes'):
+    iterator = iter(iterable)
+    done = object()
+    while True:
+        with StageTimer(name, unit=unit) as timer:
+            item = next(iterator, done)
+            if item is not done:
+                timer.amount = 1 if unit == 'frames' else getattr(item, 'nbytes', 0)
+        if item is done:
+            return
+        yield item
+
+
+# Profil du job courant pendant le bloc
+@contextmanager
+def job_profile(name, trace=False):
+    profile = JobProfile(name, trace)
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+# Contexte d'exécution portant le profil d'un job suivi d'un thread à l'autre (un thread à la fois)
+def profile_context(profile) -> contextvars.Context:
+    context = contextvars.copy_context()
+    context.run(_current_profile.set, profile)
+    return context
+
+
+# Fonction liée au contexte courant, pour un autre thread (une copie par appel)
+def bind_context(function):
+    return functools.partial(contextvars.copy_context().run, function)
+
+
+
+
+#------------------------------------------------------------------#
+#                         Stage Totals                             #
+#------------------------------------------------------------------#
+class StageTotals:
+    def __init__(self):
+        self.stages = {}
+        self.lock = threading.Lock()
+
+
+    # Cumul des mesures d'un job
+    def add(self, timings):
+        with self.lock:
+            for stage_name, timing in (timings or {}).items():
+                totals = self.stages.setdefault(stage_name, {'calls': 0, 'wall': 0.0, 'cpu': 0.0, 'amount': 0, 'unit': timing['unit']})
+                totals['calls'] += timing['calls']
+                totals['wall'] += timing['wall']
+                totals['cpu'] += timing['cpu']
+                totals['amount'] += timing['amount']
+
+
+    # Rapport trié par temps réel décroissant, avec débit par étape
+    def report(self) -> dict:
+        with self.lock:
+            stages = {stage_name: dict(totals) for stage_name, totals in self.stages.items()}
+        report = {}
+        for stage_name, totals in sorted(stages.items(), key=lambda item: -item[1]['wall']):
+            report[stage_name] = {
+                'calls': totals['calls'],
+                'wall': round(totals['wall'], 4),
+                'cpu': round(totals['cpu'], 4),
+                'amount': totals['amount'],
+                'unit': totals['unit'],
+                'throughput': round(totals['amount'] / totals['wall'], 3) if totals['wall'] > 0 and totals['amount'] else None
+            }
+        return report
+
+
+
+
+#------------------------------------------------------------------#
+#                         Trace Recorder                           #
+#------------------------------------------------------------------#
+class TraceRecorder:
+    def __init__(self):
+        self.events = []
+        self.lock = threading.Lock()
+
+
+    # Ajout des événements d'un job
+    def extend(self, events):
+        with self.lock:
+            self.events.extend(events)
+
+
+    # Retrait des événements accumulés (renvoyés par les processus workers)
+    def drain(self) -> list:
+        with self.lock:
+            events, self.events = self.events, []
+        return events
+
+
+    # Écriture d'une trace Chrome/Perfetto: une piste par worker
+    def write(self, path):
+        with self.lock:
+            events = list(self.events)
+        
+        tracks = {}
+        trace_events = []
+        for name, start, wall, pid, thread_id, job in sorted(events, key=lambda event: event[1]):
+            if (pid, thread_id) not in tracks:
+                tracks[(pid, thread_id)] = len(tracks) + 1
+                trace_events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tracks[(pid, thread_id)],
+                                     'args': {'name': f"worker {tracks[(pid, thread_id)]}"}})
+            trace_events.append({'name': name, 'cat': name.split('.', 1)[0], 'ph': 'X', 'pid': pid,
+                                 'tid': tracks[(pid, thread_id)], 'ts': round(start * 1e6, 3),
+                                 'dur': round(wall * 1e6, 3), 'args': {'file': job}})
+        
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, f)
+        return len(events)
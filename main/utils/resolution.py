@@ -0,0 +1,71 @@
+#------------------------------------------------------------------#
+#                       Resolution Planner                         #
+#------------------------------------------------------------------#
+
+
+# Plan vidéo: réduction avant filtrage, agrandissement en dernier, letterbox vers la cible
+def plan_video_resolution(source_width: int, source_height: int, target_width: int, target_height: int) -> dict:
+    scale = min(target_width / source_width, target_height / source_height)
+    fit_width = min(target_width, max(2, int(round(source_width * scale / 2)) * 2))
+    fit_height = min(target_height, max(2, int(round(source_height * scale / 2)) * 2))
+    
+    if scale < 1:
+        work = (fit_width, fit_height)
+        resize = 'down-first'
+    elif scale > 1:
+        work = (source_width, source_height)
+        resize = 'up-last'
+    else:
+        work = (source_width, source_height)
+        resize = 'none'
+    
+    left = (target_width - fit_width) // 2
+    top = (target_height - fit_height) // 2
+    return {
+        'source': (source_width, source_height),
+        'work': work,
+        'fit': (fit_width, fit_height),
+        'output': (target_width, target_height),
+        'resize': resize,
+        'padding': (top, target_height - fit_height - top, left, target_width - fit_width - left)
+    }
+
+
+# Plan image: filtrage à la résolution source, agrandissement éventuel en dernier
+def plan_image_resolution(source_width: int, source_height: int, min_side: int = 1080, max_scale: float = 3) -> dict:
+    scale = min_side / min(source_width, source_height)
+    if 1 < scale <= max_scale:
+        output = (int(source_width * scale), int(source_height * scale))
+        resize = 'up-last'
+    else:
+        output = (source_width, source_height)
+        resize = 'none'
+    
+    return {
+        'source': (source_width, source_height),
+        'work': (source_width, source_height),
+        'fit': output,
+        'output': output,
+        'resize': resize,
+        'padding': (0, 0, 0, 0)
+    }
+
+
+# Plan audio: rééchantillonnage vers le bas avant la chaîne, vers le haut en dernier
+def plan_audio_rate(source_rate: int, target_rate: int) -> dict:
+    if source_rate > target_rate:
+        work_rate = target_rate
+        resample = 'down-first'
+    elif source_rate < target_rate:
+        work_rate = source_rate
+        resample = 'up-last'
+    else:
+        work_rate = source_rate
+        resample = 'none'
+    
+    return {
+        'source_rate': source_rate,
+        'work_rate': work_rate,
+        'output_rate': target_rate,
+        'resample': resample
+    }
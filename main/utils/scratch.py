@@ -0,0 +1,126 @@
+import os
+import shutil
+import socket
+import tempfile
+import threading
+from contextlib import contextmanager
+
+
+SESSION_PREFIX = 'mr-'
+_spaces = {}
+_spaces_lock = threading.Lock()
+
+
+#------------------------------------------------------------------#
+#                         Scratch Space                            #
+#------------------------------------------------------------------#
+class ScratchSpace:
+    def __init__(self, root, budget=None, fallback_root=None):
+        self.root = os.path.abspath(root)
+        self.budget = budget
+        self.fallback_root = os.path.abspath(fallback_root) if fallback_root else None
+        self.reserved = 0
+        self.active_jobs = 0
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+
+    # Dossier de session propre à ce processus (hôte et pid dans le nom)
+    def session_dir(self, root):
+        with self.lock:
+            session = self.sessions.get(root)
+            if session is None or not os.path.isdir(session):
+                os.makedirs(root, exist_ok=True)
+                session = tempfile.mkdtemp(prefix=f"{SESSION_PREFIX}{socket.gethostname()}-{os.getpid()}-", dir=root)
+                self.sessions[root] = session
+            return session
+
+
+    # Réservation dans le budget de la racine rapide, sinon repli
+    def reserve(self, estimate):
+        with self.lock:
+            fits = self.budget is None or self.reserved + estimate <= self.budget
+            if fits and estimate:
+                try:
+                    os.makedirs(self.root, exist_ok=True)
+                    fits = shutil.disk_usage(self.root).free > estimate
+                except OSError:
+                    fits = False
+            if fits or not self.fallback_root:
+                self.reserved += estimate
+                self.active_jobs += 1
+                return self.root, estimate
+            self.active_jobs += 1
+            return self.fallback_root, 0
+
+
+    # Dossier de travail isolé d'un job, supprimé à la sortie quoi qu'il arrive
+    @contextmanager
+    def job(self, estimate=0):
+        root, reserved = self.reserve(estimate)
+        path = None
+        try:
+            path = tempfile.mkdtemp(prefix='job-', dir=self.session_dir(root))
+            yield path
+        finally:
+            if path:
+                shutil.rmtree(path, ignore_errors=True)
+            with self.lock:
+                self.reserved -= reserved
+                self.active_jobs -= 1
+
+
+    # Suppression des sessions laissées par des processus terminés sur cet hôte
+    def purge_stale(self):
+        prefix = f"{SESSION_PREFIX}{socket.gethostname()}-"
+        for root in filter(None, (self.root, self.fallback_root)):
+            try:
+                entries = os.listdir(root)
+            except OSError:
+                continue
+            for name in entries:
+                if not name.startswith(prefix):
+                    continue
+                try:
+                    pid = int(name[len(prefix):].split('-', 1)[0])
+                except ValueError:
+                    continue
+                if pid != os.getpid() and not process_alive(pid):
+                    shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+    # Fermeture des sessions de ce processus (si aucun job n'est en cours)
+    def close(self):
+        with self.lock:
+            if self.active_jobs:
+                return
+            sessions = list(self.sessions.values())
+            self.sessions.clear()
+        for session in sessions:
+            shutil.rmtree(session, ignore_errors=True)
+
+
+# Processus encore vivant sur cet hôte (non vérifiable sous Windows: considéré vivant)
+def process_alive(pid):
+    if os.name == 'nt':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+# Espace de travail partagé du processus courant pour une configuration
+def scratch_space(config) -> ScratchSpace:
+    root = config.scratch_root or config.temp_dir
+    fallback = config.temp_dir if config.scratch_root else None
+    key = (os.getpid(), os.path.abspath(root), config.scratch_budget, fallback and os.path.abspath(fallback))
+    with _spaces_lock:
+        space = _spaces.get(key)
+        if space is None:
+            space = ScratchSpace(root, config.scratch_budget, fallback)
+            _spaces[key] = space
+        return space
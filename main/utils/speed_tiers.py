@@ -0,0 +1,162 @@
+import copy
+import json
+
+
+# Débruitage NL-means par défaut (images et vidéo) et variante à petite fenêtre de recherche
+NLMEANS_MAX = {'method': 'nlmeans', 'h': 10, 'h_color': 10, 'template': 7, 'search': 21}
+NLMEANS_BALANCED = {'method': 'nlmeans', 'h': 10, 'h_color': 10, 'template': 5, 'search': 11}
+BILATERAL = {'method': 'bilateral', 'diameter': 5, 'sigma_color': 40, 'sigma_space': 40}
+TEMPORAL = {'method': 'temporal', 'radius': 1, 'h': 6, 'h_color': 6, 'template': 5, 'search': 7}
+
+# Niveaux historiques de --video-denoise (None: étape retirée)
+VIDEO_DENOISE_TIERS = {
+    'off': None,
+    'fast': BILATERAL,
+    'temporal': TEMPORAL,
+    'quality': NLMEANS_MAX
+}
+
+# Étapes connues par type de média et méthodes de débruitage acceptées
+KNOWN_STAGES = {
+    'image': {'denoise', 'colors', 'sharpen'},
+    'video': {'denoise', 'colors', 'sharpen', 'stabilize'},
+    'audio': {'spectral', 'clarity', 'dynamics', 'normalize'}
+}
+DENOISE_METHODS = {
+    'image': {'nlmeans', 'bilateral'},
+    'video': {'nlmeans', 'bilateral', 'temporal'}
+}
+
+# Paramètres obligatoires (nombres positifs) de chaque méthode; fenêtres OpenCV de taille impaire
+DENOISE_PARAMS = {
+    'nlmeans': ('h', 'h_color', 'template', 'search'),
+    'bilateral': ('diameter', 'sigma_color', 'sigma_space'),
+    'temporal': ('radius', 'h', 'h_color', 'template', 'search')
+}
+ODD_PARAMS = {'template', 'search', 'click_kernel'}
+
+# Chaînes ordonnées par niveau: fast remplace ou retire les étapes coûteuses, max est la chaîne complète
+SPEED_TIERS = {
+    'image': {
+        'fast': [
+            dict(BILATERAL, stage='denoise'),
+            {'stage': 'colors'},
+            {'stage': 'sharpen'}
+        ],
+        'balanced': [
+            dict(NLMEANS_BALANCED, stage='denoise'),
+            {'stage': 'colors'},
+            {'stage': 'sharpen'}
+        ],
+        'max': [
+            dict(NLMEANS_MAX, stage='denoise'),
+            {'stage': 'colors'},
+            {'stage': 'sharpen'}
+        ]
+    },
+    'video': {
+        'fast': [
+            dict(BILATERAL, stage='denoise'),
+            {'stage': 'colors'},
+            {'stage': 'sharpen'}
+        ],
+        'balanced': [
+            dict(NLMEANS_BALANCED, stage='denoise'),
+            {'stage': 'colors'},
+            {'stage': 'sharpen'},
+            {'stage': 'stabilize'}
+        ],
+        'max': [
+            dict(NLMEANS_MAX, stage='denoise'),
+            {'stage': 'colors'},
+            {'stage': 'sharpen'},
+            {'stage': 'stabilize'}
+        ]
+    },
+    'audio': {
+        'fast': [
+            {'stage': 'spectral', 'clicks': False},
+            {'stage': 'clarity'},
+            {'stage': 'dynamics'},
+            {'stage': 'normalize'}
+        ],
+        'balanced': [
+            {'stage': 'spectral', 'clicks': True, 'click_kernel': 3},
+            {'stage': 'clarity'},
+            {'stage': 'dynamics'},
+            {'stage': 'normalize'}
+        ],
+        'max': [
+            {'stage': 'spectral', 'clicks': True, 'click_kernel': 5},
+            {'stage': 'clarity'},
+            {'stage': 'dynamics'},
+            {'stage': 'normalize'}
+        ]
+    }
+}
+
+
+#------------------------------------------------------------------#
+#                          Speed Tiers                             #
+#------------------------------------------------------------------#
+
+# Vérification d'une définition de niveaux {type: {niveau: [étapes]}}
+def validate_tiers(tiers):
+    if not isinstance(tiers, dict):
+        raise ValueError("Speed tiers must map media types to tiers")
+    for media_type, media_tiers in tiers.items():
+        if media_type not in KNOWN_STAGES:
+            raise ValueError(f"Unknown media type in speed tiers: {media_type}")
+        for tier, stages in media_tiers.items():
+            if not isinstance(stages, list) or not all(isinstance(step, dict) for step in stages):
+                raise ValueError(f"Tier '{tier}' for {media_type} must be a list of stages")
+            for step in stages:
+                validate_stage(media_type, tier, step)
+    return tiers
+
+
+# Vérification d'une étape: nom connu, méthode de débruitage et paramètres valides
+def validate_stage(media_type, tier, step):
+    name = step.get('stage')
+    if name not in KNOWN_STAGES[media_type]:
+        raise ValueError(f"Unknown {media_type} stage in tier '{tier}': {name}")
+    
+    required = ()
+    if name == 'denoise':
+        if step.get('method') not in DENOISE_METHODS[media_type]:
+            raise ValueError(f"Unknown {media_type} denoise method in tier '{tier}': {step.get('method')}")
+        required = DENOISE_PARAMS[step['method']]
+    elif name == 'spectral' and step.get('clicks', True):
+        required = ('click_kernel',) if 'click_kernel' in step else ()
+    
+    for key in required:
+        value = step.get(key)
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+            raise ValueError(f"Invalid {media_type} {name} parameter '{key}' in tier '{tier}': {value!r}")
+        if key in ODD_PARAMS and (value != int(value) or int(value) % 2 == 0):
+            raise ValueError(f"{media_type} {name} parameter '{key}' in tier '{tier}' must be an odd integer: {value!r}")
+
+
+# Chargement d'un fichier JSON de niveaux (remplace ou ajoute des niveaux par type de média)
+def load_tiers(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return validate_tiers(json.load(f))
+
+
+# Étapes d'un niveau pour un type de média (copie modifiable), niveaux personnalisés prioritaires
+# (un niveau personnalisé absent pour ce type de média reprend la chaîne max)
+def resolve_stages(media_type, speed, overrides=None):
+    overrides = overrides or {}
+    stages = overrides.get(media_type, {}).get(speed)
+    if stages is None:
+        stages = SPEED_TIERS[media_type].get(speed)
+    if stages is None and any(speed in media_tiers for media_tiers in overrides.values()):
+        stages = SPEED_TIERS[media_type]['max']
+    if stages is None:
+        raise ValueError(f"Unknown speed tier: {speed}")
+    return copy.deepcopy(stages)
+
+
+# Paramètres d'une étape dans une chaîne, None si l'étape est absente
+def find_stage(stages, name):
+    return next((step for step in stages if step['stage'] == name), None)
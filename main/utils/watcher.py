@@ -0,0 +1,194 @@
+import os
+import time
+import struct
+import select
+import ctypes
+import ctypes.util
+
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+EVENT_HEADER = struct.Struct('iIII')
+
+
+#------------------------------------------------------------------#
+#                       Directory Watcher                          #
+#------------------------------------------------------------------#
+class DirectoryWatcher:
+    def __init__(self, directory, accept, recursive=True, exclude=(), settle_time=2.0, poll_interval=1.0, use_inotify=True):
+        self.directory = os.path.abspath(directory)
+        self.accept = accept
+        self.recursive = recursive
+        self.exclude = [os.path.abspath(path) for path in exclude]
+        self.settle_time = settle_time
+        self.poll_interval = poll_interval
+        self.candidates = {}
+        self.snapshot = {}
+        self.watches = {}
+        self.inotify_fd = self.open_inotify() if use_inotify else None
+
+
+    # Mode utilisé: inotify (Linux) ou scrutation périodique
+    @property
+    def mode(self):
+        return 'inotify' if self.inotify_fd is not None else 'polling'
+
+
+    # Ouverture d'une instance inotify via la libc, None si indisponible
+    def open_inotify(self):
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+        self.libc = libc
+        return fd
+
+
+    # Chemin exclu (dossier de sortie, cache...)
+    def is_excluded(self, path):
+        return any(path == root or path.startswith(root + os.sep) for root in self.exclude)
+
+
+    # Surveillance d'un dossier (et de ses sous-dossiers en mode récursif)
+    def add_watch(self, directory):
+        if self.inotify_fd is None or self.is_excluded(directory):
+            return
+        wd = self.libc.inotify_add_watch(self.inotify_fd, os.fsencode(directory), WATCH_MASK)
+        if wd >= 0:
+            self.watches[wd] = directory
+
+
+    # Parcours du dossier: fichiers acceptés avec (taille, mtime)
+    def scan(self):
+        found = {}
+        for root, dirs, files in os.walk(self.directory):
+            dirs[:] = [d for d in dirs if not self.is_excluded(os.path.join(root, d))] if self.recursive else []
+            for name in files:
+                path = os.path.join(root, name)
+                if self.accept(path):
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    found[path] = (stat.st_size, stat.st_mtime_ns)
+        return found
+
+
+    # Nouveau fichier ou fichier modifié: en attente de stabilisation
+    def mark(self, path):
+        if not self.is_excluded(path) and self.accept(path):
+            self.candidates[path] = (None, time.monotonic())
+
+
+    # Lecture des événements inotify disponibles
+    def read_events(self, timeout):
+        readable, _, _ = select.select([self.inotify_fd], [], [], timeout)
+        if not readable:
+            return
+        try:
+            data = os.read(self.inotify_fd, 65536)
+        except BlockingIOError:
+            return
+        
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b'\0')
+            offset += EVENT_HEADER.size + length
+            
+            if mask & IN_Q_OVERFLOW:
+                for path in self.scan():
+                    self.mark(path)
+                continue
+            directory = self.watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & IN_ISDIR:
+                if self.recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                    self.add_directory(path)
+            else:
+                self.mark(path)
+
+
+    # Nouveau sous-dossier: surveillance et prise en compte de son contenu
+    def add_directory(self, directory):
+        for root, dirs, files in os.walk(directory):
+            dirs[:] = [d for d in dirs if not self.is_excluded(os.path.join(root, d))]
+            self.add_watch(root)
+            for name in files:
+                self.mark(os.path.join(root, name))
+
+
+    # Scrutation: comparaison avec le parcours précédent
+    def poll(self, timeout):
+        time.sleep(timeout)
+        current = self.scan()
+        for path, signature in current.items():
+            if self.snapshot.get(path) != signature:
+                self.mark(path)
+        self.snapshot = current
+
+
+    # Fichiers dont la taille et la date n'ont pas bougé depuis settle_time
+    def settled(self):
+        now = time.monotonic()
+        ready = []
+        for path, (signature, since) in list(self.candidates.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del self.candidates[path]
+                continue
+            current = (stat.st_size, stat.st_mtime_ns)
+            if current != signature:
+                self.candidates[path] = (current, now)
+            elif now - since >= self.settle_time:
+                del self.candidates[path]
+                ready.append(path)
+        return ready
+
+
+    # Flux infini: chemins prêts, ou None à chaque tick sans nouveau fichier
+    def iter_ready(self):
+        if self.inotify_fd is not None and self.recursive:
+            self.add_directory(self.directory)
+        elif self.inotify_fd is not None:
+            self.add_watch(self.directory)
+            for path in self.scan():
+                self.mark(path)
+        else:
+            self.snapshot = self.scan()
+            for path in self.snapshot:
+                self.mark(path)
+        
+        try:
+            while True:
+                timeout = self.poll_interval
+                if self.inotify_fd is not None:
+                    self.read_events(timeout)
+                else:
+                    self.poll(timeout)
+                
+                ready = self.settled()
+                for path in ready:
+                    yield path
+                if not ready:
+                    yield None
+        finally:
+            self.close()
+
+
+    # Libération de l'instance inotify
+    def close(self):
+        if self.inotify_fd is not None:
+            os.close(self.inotify_fd)
+            self.inotify_fd = None
@@ -0,0 +1,148 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import soundfile as sf
+from main.bench import make_wav, reference_compressor
+from main.processors.audio_processor import AudioProcessor
+from main.utils.config import Config
+
+
+SAMPLE_RATE = 22050
+
+
+# Signal de test déterministe: deux tons modulés, bruit de fond et clics isolés
+def make_signal(seconds=5, sr=SAMPLE_RATE, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(sr * seconds)) / sr
+    tones = 0.3 * np.sin(2 * np.pi * 220 * t) + 0.2 * np.sin(2 * np.pi * 1500 * t) * (1 + np.sin(2 * np.pi * 0.5 * t)) / 2
+    audio = (tones + 0.02 * rng.standard_normal(len(t))).astype(np.float32)
+    audio[rng.integers(0, len(audio), 20)] += 0.8
+    return audio
+
+
+# Erreur RMS relative d'un signal par rapport à une référence
+def relative_rms(reference, actual):
+    return float(np.sqrt(np.mean((reference - actual) ** 2)) / np.sqrt(np.mean(reference ** 2)))
+
+
+#------------------------------------------------------------------#
+#                      Spectral Chain Tests                        #
+#------------------------------------------------------------------#
+class SpectralChainTests(unittest.TestCase):
+    
+    # Processeur aux réglages par défaut et signal de test
+    def setUp(self):
+        self.processor = AudioProcessor(Config())
+        self.audio = make_signal()
+
+
+    def test_fused_chain_matches_three_stft_chain(self):
+        processor, audio = self.processor, self.audio
+        separate = processor.reduce_noise(audio, SAMPLE_RATE)
+        separate = processor.remove_clicks(separate, SAMPLE_RATE)
+        separate = processor.enhance_clarity(separate, SAMPLE_RATE)
+        separate = processor.equalize_audio(separate, SAMPLE_RATE)
+        fused = processor.enhance_clarity(processor.apply_spectral_chain(audio, SAMPLE_RATE), SAMPLE_RATE)
+        
+        self.assertEqual(len(fused), len(audio))
+        self.assertLess(relative_rms(separate, fused), 0.01)
+
+
+    def test_fused_chain_without_clicks_matches_noise_and_eq(self):
+        processor, audio = self.processor, self.audio
+        separate = processor.equalize_audio(processor.reduce_noise(audio, SAMPLE_RATE), SAMPLE_RATE)
+        fused = processor.apply_spectral_chain(audio, SAMPLE_RATE, click_kernel=0)
+        self.assertLess(relative_rms(separate, fused), 0.01)
+
+
+#------------------------------------------------------------------#
+#                        Compressor Tests                          #
+#------------------------------------------------------------------#
+class CompressorTests(unittest.TestCase):
+    
+    # Processeur aux réglages de dynamique donnés (défaut de Config sinon)
+    def make_processor(self, **dynamics):
+        config = Config()
+        config.dynamics.update(dynamics)
+        return AudioProcessor(config)
+
+
+    def test_vectorized_compressor_matches_reference_loop(self):
+        for sr, seconds in ((SAMPLE_RATE, 2), (48000, 1.3), (8000, 1)):
+            audio = make_signal(seconds, sr)
+            for dynamics in ({}, {'makeup_gain': 1.5, 'ratio': 8.0, 'hold': 0.005}):
+                processor = self.make_processor(**dynamics)
+                with self.subTest(sr=sr, **dynamics):
+                    compressed = processor.enhance_dynamics(audio, sr)
+                    self.assertEqual(compressed.dtype, np.float32)
+                    np.testing.assert_allclose(compressed, reference_compressor(audio, sr, processor.dynamics_params), atol=1e-6)
+
+
+    def test_quiet_signal_is_unchanged(self):
+        audio = make_signal(1) * 0.05
+        np.testing.assert_allclose(self.make_processor().enhance_dynamics(audio, SAMPLE_RATE), audio, atol=1e-6)
+
+
+    def test_chunked_calls_match_a_single_call(self):
+        processor = self.make_processor()
+        audio = make_signal(2)
+        whole, _ = processor.compress_dynamics(audio, SAMPLE_RATE)
+        
+        state, chunks = None, []
+        for start in range(0, len(audio), 4096):
+            chunk, state = processor.compress_dynamics(audio[start:start + 4096], SAMPLE_RATE, state)
+            chunks.append(chunk)
+        np.testing.assert_allclose(np.concatenate(chunks), whole, atol=1e-6)
+
+
+#------------------------------------------------------------------#
+#                        Streaming Tests                           #
+#------------------------------------------------------------------#
+class StreamingTests(unittest.TestCase):
+    
+    # Fichier WAV synthétique dans un dossier temporaire
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir, ignore_errors=True)
+        self.input_path = make_wav(os.path.join(self.work_dir, 'input.wav'), 12, sr=SAMPLE_RATE)
+
+
+    # Traitement du fichier en mémoire ou en flux: (échantillons, fréquence, taille de bloc, plan)
+    def refine(self, streaming, block_size=32768):
+        config = Config()
+        config.temp_dir = os.path.join(self.work_dir, 'temp')
+        config.audio_streaming = streaming
+        config.audio_block_size = block_size
+        processor = AudioProcessor(config)
+        output_path = os.path.join(self.work_dir, f"refined_{streaming}.wav")
+        info = {}
+        self.assertTrue(processor.process_audio(self.input_path, output_path, info))
+        audio, sr = sf.read(output_path)
+        return audio, sr, max(block_size // processor.hop_length, 1) * processor.hop_length, info['audio_plan']
+
+
+    def test_streaming_matches_in_memory_output(self):
+        in_memory, sr, _, plan = self.refine(False)
+        for block_size in (32768, 20000):
+            streamed, streamed_sr, _, streamed_plan = self.refine(True, block_size)
+            with self.subTest(block_size=block_size):
+                self.assertEqual((streamed_sr, streamed_plan), (sr, plan))
+                self.assertEqual(len(streamed), len(in_memory))
+                self.assertLess(relative_rms(in_memory, streamed), 0.01)
+
+
+    def test_block_seams_are_seamless(self):
+        in_memory, sr, _, plan = self.refine(False)
+        streamed, _, block_size, _ = self.refine(True, 16384)
+        seams = np.arange(block_size, 12 * plan['work_rate'], block_size) * sr // plan['work_rate']
+        self.assertGreater(len(seams), 10)
+        for seam in seams:
+            window = slice(seam - 1024, seam + 1024)
+            with self.subTest(seam=int(seam)):
+                self.assertLess(relative_rms(in_memory[window], streamed[window]), 0.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import shutil
+import tempfile
+import unittest
+from main.utils.config import Config
+from main.utils.file_handler import FileHandler, reflink
+
+
+#------------------------------------------------------------------#
+#                        Backup Space Tests                        #
+#------------------------------------------------------------------#
+class BackupSpaceTests(unittest.TestCase):
+    
+    # Original et dossier de sortie sur le même système de fichiers temporaire
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir, ignore_errors=True)
+        self.config = Config()
+        self.config.output_dir = os.path.join(self.work_dir, 'refined')
+        self.handler = FileHandler(self.config)
+        self.file_path = os.path.join(self.work_dir, 'clip.wav')
+        with open(self.file_path, 'wb') as f:
+            f.write(b'audio' * 100)
+
+
+    # Réglage de la stratégie de sauvegarde
+    def use_strategy(self, strategy):
+        self.config.preserve_original = strategy != 'none'
+        self.config.backup_strategy = strategy
+
+
+    def test_copy_and_none_multipliers(self):
+        self.use_strategy('copy')
+        self.assertEqual(self.handler.space_multiplier(self.file_path), 2.0)
+        self.use_strategy('none')
+        self.assertEqual(self.handler.space_multiplier(self.file_path), 1.0)
+
+
+    def test_links_count_as_copies_until_one_succeeds(self):
+        self.use_strategy('hardlink')
+        self.assertEqual(self.handler.space_multiplier(self.file_path), 2.0)
+        backup_path = self.handler.backup_original(self.file_path)
+        self.assertTrue(os.path.samefile(backup_path, self.file_path))
+        self.assertEqual(self.handler.space_multiplier(self.file_path), 1.0)
+        
+        self.config.output_dir = os.path.join(self.work_dir, 'elsewhere')
+        self.assertEqual(self.handler.space_multiplier(self.file_path), 2.0)
+
+
+    def test_reflink_multiplier_follows_the_actual_outcome(self):
+        self.use_strategy('reflink')
+        self.assertEqual(self.handler.space_multiplier(self.file_path), 2.0)
+        probe_path = os.path.join(self.work_dir, 'probe')
+        supported = reflink(self.file_path, probe_path)
+        
+        backup_path = self.handler.backup_original(self.file_path)
+        with open(backup_path, 'rb') as f:
+            self.assertEqual(f.read(), b'audio' * 100)
+        self.assertEqual(self.handler.space_multiplier(self.file_path), 1.0 if supported else 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
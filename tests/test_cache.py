@@ -0,0 +1,146 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from main.utils.cache import ResultCache, INDEX_NAME, EVICT_INTERVAL
+from main.utils.config import Config
+
+
+#------------------------------------------------------------------#
+#                        Result Cache Tests                        #
+#------------------------------------------------------------------#
+class ResultCacheTests(unittest.TestCase):
+    
+    # Cache isolé dans un dossier de sortie temporaire
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir, ignore_errors=True)
+        self.config = Config()
+        self.config.output_dir = os.path.join(self.work_dir, 'refined')
+        self.cache = ResultCache(self.config)
+        self.input_path = self.write('input.wav', b'source' * 100)
+
+
+    # Fichier de contenu donné dans le dossier de travail
+    def write(self, name, data):
+        path = os.path.join(self.work_dir, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+
+    # Lecture complète d'un fichier
+    def read(self, path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+
+    # Sortie produite puis enregistrée dans le cache; clé utilisée
+    def store_output(self, name, data):
+        output_path = self.write(name, data)
+        key = self.cache.make_key(self.input_path, 'audio', output_path)
+        self.cache.store(key, output_path)
+        return key, output_path
+
+
+    def test_miss_then_hit(self):
+        output_path = os.path.join(self.work_dir, 'out.wav')
+        key = self.cache.make_key(self.input_path, 'audio', output_path)
+        self.assertFalse(self.cache.fetch(key, output_path))
+        self.assertFalse(os.path.exists(output_path))
+        
+        key, stored_path = self.store_output('out.wav', b'refined')
+        os.remove(stored_path)
+        self.assertTrue(self.cache.fetch(key, output_path))
+        self.assertEqual(self.read(output_path), b'refined')
+
+
+    def test_published_output_is_independent_of_the_cache(self):
+        key, output_path = self.store_output('out.wav', b'refined')
+        self.assertEqual(os.stat(output_path).st_nlink, 1)
+        with open(output_path, 'r+b') as f:
+            f.write(b'EDITED')
+        
+        fetched_path = os.path.join(self.work_dir, 'again.wav')
+        self.assertTrue(self.cache.fetch(key, fetched_path))
+        self.assertEqual(self.read(fetched_path), b'refined')
+        self.assertEqual(os.stat(fetched_path).st_nlink, 1)
+
+
+    def test_config_change_invalidates_entries(self):
+        key, output_path = self.store_output('out.wav', b'refined')
+        self.config.audio_quality = 'medium'
+        self.assertNotEqual(self.cache.make_key(self.input_path, 'audio', output_path), key)
+        self.config.audio_quality = 'high'
+        self.config.scan_workers = 4
+        self.assertEqual(self.cache.make_key(self.input_path, 'audio', output_path), key)
+        
+        self.write('input.wav', b'changed' * 100)
+        self.assertNotEqual(self.cache.make_key(self.input_path, 'audio', output_path), key)
+
+
+    def test_eviction_removes_least_recently_used_entries(self):
+        self.config.cache_max_bytes = 250
+        keys = []
+        for name in ('a', 'b', 'c'):
+            self.input_path = self.write('input.wav', name.encode('utf-8') * 100)
+            keys.append(self.store_output(name + '.wav', b'x' * 100)[0])
+            os.utime(self.cache.object_path(keys[-1], 'out.wav'), (len(keys), len(keys)))
+        first, second, third = keys
+        
+        self.assertFalse(os.path.exists(self.cache.object_path(first, 'out.wav')))
+        self.assertTrue(os.path.exists(self.cache.object_path(second, 'out.wav')))
+        self.assertTrue(os.path.exists(self.cache.object_path(third, 'out.wav')))
+        self.assertEqual(self.cache.read_index(), 200)
+
+
+    def test_size_index_avoids_walking_the_cache_on_each_store(self):
+        self.store_output('first.wav', b'x' * 10)
+        self.assertEqual(self.cache.read_index(), 10)
+        self.assertTrue(os.path.exists(os.path.join(self.cache.cache_dir, INDEX_NAME)))
+        
+        self.cache = ResultCache(self.config)
+        with mock.patch.object(ResultCache, 'evict', autospec=True, side_effect=ResultCache.evict) as evict:
+            for index in range(EVICT_INTERVAL - 1):
+                self.input_path = self.write('input.wav', b'%d' % index)
+                self.store_output('out.wav', b'x' * 10)
+            self.assertEqual(evict.call_count, 0)
+            self.assertEqual(self.cache.read_index(), 10 * EVICT_INTERVAL)
+            
+            self.input_path = self.write('input.wav', b'last')
+            self.store_output('out.wav', b'x' * 10)
+            self.assertEqual(evict.call_count, 1)
+
+
+
+    def test_large_outputs_are_only_cached_by_reflink(self):
+        self.config.cache_max_object_bytes = 100
+        with mock.patch('main.utils.cache.reflink', return_value=False):
+            key, _ = self.store_output('out.wav', b'x' * 101)
+            self.assertFalse(os.path.exists(self.cache.object_path(key, 'out.wav')))
+            self.assertEqual(os.listdir(os.path.dirname(self.cache.object_path(key, 'out.wav'))), [])
+            
+            key, _ = self.store_output('small.wav', b'x' * 100)
+            self.assertTrue(os.path.exists(self.cache.object_path(key, 'out.wav')))
+        
+        def fake_reflink(source, destination):
+            shutil.copyfile(source, destination)
+            return True
+        
+        with mock.patch('main.utils.cache.reflink', side_effect=fake_reflink):
+            self.input_path = self.write('input.wav', b'other')
+            key, _ = self.store_output('out.wav', b'x' * 101)
+            self.assertTrue(os.path.exists(self.cache.object_path(key, 'out.wav')))
+        self.assertEqual(self.cache.read_index(), 201)
+
+
+    def test_large_outputs_are_copied_when_the_limit_is_lifted(self):
+        self.config.cache_max_object_bytes = None
+        with mock.patch('main.utils.cache.reflink', return_value=False):
+            key, _ = self.store_output('out.wav', b'x' * 4096)
+        self.assertEqual(self.read(self.cache.object_path(key, 'out.wav')), b'x' * 4096)
+
+
+if __name__ == '__main__':
+    unittest.main()
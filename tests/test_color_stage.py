@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+import unittest
+import cv2
+import numpy as np
+from main.processors.color_stage import ColorStage
+from main.processors.image_processor import ImageProcessor
+from main.utils.config import Config
+
+
+# Image synthétique lisse et déterministe (BGR)
+def make_image(width, height, seed=0):
+    noise = (np.random.default_rng(seed).random((height, width, 3)) * 255).astype(np.uint8)
+    return cv2.GaussianBlur(noise, (9, 9), 3)
+
+
+# Chaîne couleur historique: CLAHE sur L (Lab) puis saturation en HSV
+def reference_colors(image, clip_limit, saturation):
+    lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
+    l, a, b = cv2.split(lab)
+    l = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=(8, 8)).apply(l)
+    image = cv2.cvtColor(cv2.merge([l, a, b]), cv2.COLOR_LAB2BGR)
+    h, s, v = cv2.split(cv2.cvtColor(image, cv2.COLOR_BGR2HSV))
+    s = cv2.multiply(s, saturation)
+    return cv2.cvtColor(cv2.merge([h, s, v]), cv2.COLOR_HSV2BGR)
+
+
+#------------------------------------------------------------------#
+#                        Color Stage Tests                         #
+#------------------------------------------------------------------#
+class ColorStageTests(unittest.TestCase):
+    
+    def test_default_contrast_equalizes_lab_lightness(self):
+        image = make_image(160, 120)
+        stage = ColorStage(clip_limit=2.0, saturation=1.2)
+        self.assertEqual(stage.contrast_space, 'lab')
+        np.testing.assert_array_equal(stage.apply(image), reference_colors(image, 2.0, 1.2))
+        np.testing.assert_array_equal(stage.apply_hsv(stage.apply_contrast(image)), stage.apply(image))
+
+
+    def test_hsv_contrast_is_opt_in(self):
+        image = make_image(160, 120)
+        lab = ColorStage(clip_limit=2.0, saturation=1.2).apply(image)
+        hsv = ColorStage(clip_limit=2.0, saturation=1.2, contrast_space='hsv').apply(image)
+        self.assertGreater(np.abs(lab.astype(int) - hsv).max(), 0)
+        with self.assertRaisesRegex(ValueError, 'Unknown contrast space'):
+            ColorStage(contrast_space='yuv')
+
+
+#------------------------------------------------------------------#
+#                      Tiled Color Stage Tests                     #
+#------------------------------------------------------------------#
+class TiledColorStageTests(unittest.TestCase):
+    
+    # Dossier de travail temporaire pour les intermédiaires mappés
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir, ignore_errors=True)
+
+
+    # Image traitée par tuiles puis relue depuis le PNG de sortie
+    def refine_tiled(self, processor, image):
+        output_path = os.path.join(self.work_dir, 'tiled.png')
+        self.assertTrue(processor.process_image_tiled('memory', output_path, image=image))
+        return cv2.imread(output_path)
+
+
+    def test_tiled_colors_match_full_image_in_both_spaces(self):
+        image = make_image(517, 389, seed=1)
+        for space in ('lab', 'hsv'):
+            config = Config()
+            config.temp_dir = self.work_dir
+            config.image_tile_size = 128
+            config.image_tile_workers = 2
+            config.color_contrast_space = space
+            config.speed_tiers = {'image': {'colors': [{'stage': 'colors'}]}}
+            config.speed = 'colors'
+            processor = ImageProcessor(config)
+            with self.subTest(space=space):
+                np.testing.assert_array_equal(self.refine_tiled(processor, image), processor.color_stage.apply(image))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+import os
+import sys
+import json
+import shutil
+import signal
+import tempfile
+import threading
+import subprocess
+import unittest
+from unittest import mock
+from main.bench import make_image, make_wav, make_video
+from main.core.engine import MediaRefinerEngine
+from main.utils.config import Config
+from main.utils.probe import probe_capabilities
+
+
+# Lot traité par le pool de processus dans un interpréteur séparé (un blocage y est borné par un délai)
+PROCESS_BATCH_SCRIPT = '''
+import sys, json
+from main.core.engine import MediaRefinerEngine
+from main.utils.config import Config
+file_paths, output_dir = json.loads(sys.argv[1])
+config = Config()
+config.output_dir = output_dir
+config.temp_dir = output_dir + '_temp'
+config.preserve_original = False
+config.result_cache = False
+config.speed = 'fast'
+engine = MediaRefinerEngine(config)
+engine.initialize()
+try:
+    engine.process_batch(file_paths, max_workers=2, executor='process')
+finally:
+    engine.cleanup()
+print(json.dumps(engine.results))
+'''
+
+
+#------------------------------------------------------------------#
+#                      Execution Backend Tests                     #
+#------------------------------------------------------------------#
+@unittest.skipUnless(probe_capabilities()['ffmpeg'] and 'libx264' in probe_capabilities()['encoders'], 'FFmpeg with libx264 not found')
+class ExecutorTests(unittest.TestCase):
+    
+    # Lot mixte (images, audio, vidéos) dans un dossier temporaire
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir, ignore_errors=True)
+        self.file_paths = [
+            make_video(os.path.join(self.work_dir, 'clip1.avi'), 96, 64, 4),
+            make_wav(os.path.join(self.work_dir, 'tone1.wav'), 0.5),
+            make_image(os.path.join(self.work_dir, 'photo1.png'), 96, 64),
+            make_video(os.path.join(self.work_dir, 'clip2.avi'), 96, 64, 4, seed=1),
+            make_wav(os.path.join(self.work_dir, 'tone2.wav'), 0.5, seed=1),
+            make_image(os.path.join(self.work_dir, 'photo2.png'), 96, 64, seed=1)
+        ]
+
+
+    # Traitement du lot avec un exécuteur donné; résultats indexés par fichier d'entrée
+    def run_batch(self, executor):
+        config = Config()
+        config.output_dir = os.path.join(self.work_dir, executor)
+        config.temp_dir = os.path.join(self.work_dir, executor + '_temp')
+        config.preserve_original = False
+        config.result_cache = False
+        config.speed = 'fast'
+        
+        engine = MediaRefinerEngine(config)
+        engine.initialize()
+        try:
+            results = engine.process_batch(self.file_paths, max_workers=2, executor=executor)
+        finally:
+            engine.cleanup()
+        self.assertEqual(engine.results['processed'], len(self.file_paths))
+        return {result['input_path']: result for result in results['details']}
+
+
+    # Lecture complète d'un fichier
+    def read(self, path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+
+    def test_process_pool_matches_thread_pool_on_a_mixed_batch(self):
+        threaded = self.run_batch('thread')
+        processes = self.run_batch('process')
+        self.assertEqual(set(processes), set(self.file_paths))
+        
+        for file_path in self.file_paths:
+            with self.subTest(file_path=os.path.basename(file_path)):
+                expected, result = threaded[file_path], processes[file_path]
+                self.assertEqual(result['status'], 'success', result.get('error'))
+                self.assertEqual(result['media_type'], expected['media_type'])
+                self.assertEqual(result.get('stages'), expected.get('stages'))
+                self.assertEqual(os.path.basename(result['output_path']), os.path.basename(expected['output_path']))
+                if result['media_type'] != 'video':
+                    self.assertEqual(self.read(result['output_path']), self.read(expected['output_path']))
+
+
+    def test_mixed_process_batch_finishes_while_probe_threads_run(self):
+        arguments = json.dumps([self.file_paths, os.path.join(self.work_dir, 'isolated')])
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        process = subprocess.Popen([sys.executable, '-c', PROCESS_BATCH_SCRIPT, arguments], cwd=root, text=True,
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE, start_new_session=True)
+        try:
+            stdout, stderr = process.communicate(timeout=120)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+            process.communicate()
+            self.fail('process-pool batch hung')
+        self.assertEqual(process.returncode, 0, stderr)
+        self.assertEqual(json.loads(stdout.splitlines()[-1]), {'processed': len(self.file_paths), 'failed': 0, 'skipped': 0})
+
+
+#------------------------------------------------------------------#
+#                      Completion Order Tests                      #
+#------------------------------------------------------------------#
+class CompletionOrderTests(unittest.TestCase):
+    
+    # Moteur isolé dont le traitement d'un fichier est remplacé par un job factice
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir, ignore_errors=True)
+        config = Config()
+        config.output_dir = os.path.join(self.work_dir, 'refined')
+        config.temp_dir = os.path.join(self.work_dir, 'temp')
+        config.image_pipeline = False
+        self.engine = MediaRefinerEngine(config)
+        self.engine.initialize()
+        self.addCleanup(self.engine.cleanup)
+        self.release = threading.Event()
+        patcher = mock.patch.object(self.engine, 'process_single_file', side_effect=self.fake_job)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+    # Job factice: 'slow' attend le signal du test, 'broken' lève, 'bad' échoue, les autres réussissent
+    def fake_job(self, file_path, output_path=None, media=None):
+        name = os.path.basename(file_path)
+        if name.startswith('slow'):
+            self.assertTrue(self.release.wait(10))
+        if name.startswith('broken'):
+            raise RuntimeError('decoder crashed')
+        status = 'failed' if name.startswith('bad') else 'success'
+        return {'status': status, 'input_path': file_path, 'output_path': file_path + '.out'}
+
+
+    # Fichiers WAV de durées données (la durée fixe le coût estimé par l'ordonnanceur)
+    def make_files(self, **durations):
+        return [make_wav(os.path.join(self.work_dir, name + '.wav'), seconds) for name, seconds in durations.items()]
+
+
+    def test_fast_result_is_yielded_before_a_slow_job_submitted_first(self):
+        slow_path, fast_path = self.make_files(slow=2.0, fast=0.2)
+        with mock.patch.object(self.engine, 'submit_job', wraps=self.engine.submit_job) as submit_job:
+            results = self.engine.iter_process([fast_path, slow_path], max_workers=2)
+            first = next(results)
+            self.release.set()
+            second = next(results)
+            self.assertEqual(list(results), [])
+        
+        self.assertEqual([call.args[1] for call in submit_job.call_args_list], [slow_path, fast_path])
+        self.assertEqual(first['input_path'], fast_path)
+        self.assertEqual(second['input_path'], slow_path)
+
+
+    def test_process_batch_aggregates_every_result(self):
+        self.release.set()
+        file_paths = self.make_files(slow=1.0, good=0.5, bad=0.3, broken=0.2)
+        results = self.engine.process_batch(file_paths, max_workers=2)
+        
+        self.assertEqual(sorted(result['input_path'] for result in results['details']), sorted(file_paths))
+        self.assertEqual(sorted(results['success']), sorted(path + '.out' for path in file_paths[:2]))
+        self.assertEqual(sorted(results['failed']), sorted(file_paths[2:]))
+        self.assertEqual(self.engine.results, {'processed': 2, 'failed': 2, 'skipped': 0})
+
+
+    def test_process_directory_aggregates_every_discovered_file(self):
+        self.release.set()
+        file_paths = self.make_files(slow=1.0, good=0.5, bad=0.2)
+        results = self.engine.process_directory(self.work_dir, max_workers=2)
+        
+        self.assertEqual(sorted(result['input_path'] for result in results['details']), sorted(file_paths))
+        self.assertEqual(len(results['success']), 2)
+        self.assertEqual(results['failed'], [file_paths[2]])
+        self.assertEqual(results['skipped'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from main.bench import make_image
+from main.core.engine import MediaRefinerEngine
+from main.core.image_pipeline import ImageIOPipeline
+from main.utils.config import Config
+
+
+IMAGE_COUNT = 10
+DEPTH = 2
+
+
+#------------------------------------------------------------------#
+#                      Image Pipeline Tests                        #
+#------------------------------------------------------------------#
+class ImagePipelineTests(unittest.TestCase):
+    
+    # Moteur isolé, petites images et pipeline à deux workers par étage
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir, ignore_errors=True)
+        config = Config()
+        config.output_dir = os.path.join(self.work_dir, 'refined')
+        config.temp_dir = os.path.join(self.work_dir, 'temp')
+        config.preserve_original = False
+        config.result_cache = False
+        config.speed = 'fast'
+        self.engine = MediaRefinerEngine(config)
+        self.engine.initialize()
+        self.addCleanup(self.engine.cleanup)
+        self.processor = self.engine.image_processor
+        self.file_paths = [make_image(os.path.join(self.work_dir, f"photo{index}.png"), 64, 48, seed=index)
+                           for index in range(IMAGE_COUNT)]
+        self.pipeline = ImageIOPipeline(self.engine, compute_workers=2, io_workers=2, depth=DEPTH)
+
+
+    # Traitement de toutes les images par le pipeline; résultats indexés par fichier d'entrée
+    def run_pipeline(self):
+        futures = [self.pipeline.submit(file_path) for file_path in self.file_paths]
+        try:
+            results = [future.result(timeout=30) for future in futures]
+        finally:
+            self.pipeline.close()
+        return {result['input_path']: result for result in results}
+
+
+    # Étape remplacée qui lève pour un fichier donné (argument path_index) et délègue sinon
+    def failing(self, original, failing_name, message, path_index=0):
+        def step(*args):
+            if os.path.basename(args[path_index]).startswith(failing_name):
+                raise IOError(message)
+            return original(*args)
+        return step
+
+
+    def test_every_output_is_written(self):
+        results = self.run_pipeline()
+        self.assertEqual(set(results), set(self.file_paths))
+        for result in results.values():
+            self.assertEqual(result['status'], 'success', result.get('error'))
+            self.assertTrue(os.path.getsize(result['output_path']) > 0)
+            self.assertEqual(result['timings']['job']['calls'], 1)
+        
+        stats = self.pipeline.stats()
+        self.assertEqual(stats['workers'], {'read': 2, 'compute': 2, 'write': 2})
+        self.assertEqual(set(stats['stages']), {'read', 'compute', 'write'})
+        self.assertTrue(all(stats['stages'][name]['busy'] > 0 for name in ('read', 'compute', 'write')))
+        self.assertEqual(self.pipeline.threads, [])
+
+
+    def test_failed_read_is_reported_without_stalling_other_files(self):
+        decode = self.failing(self.processor.decode_image, 'photo3', 'truncated file')
+        with mock.patch.object(self.processor, 'decode_image', side_effect=decode):
+            results = self.run_pipeline()
+        
+        failed = results.pop(self.file_paths[3])
+        self.assertEqual((failed['status'], failed['error']), ('failed', 'truncated file'))
+        self.assertIsNone(failed['output_path'])
+        self.assertTrue(all(result['status'] == 'success' for result in results.values()))
+
+
+    def test_failed_write_is_reported_without_stalling_other_files(self):
+        encode = self.failing(self.processor.encode_image, 'photo5', 'disk full', path_index=1)
+        with mock.patch.object(self.processor, 'encode_image', side_effect=encode):
+            results = self.run_pipeline()
+        
+        failed = results.pop(self.file_paths[5])
+        self.assertEqual((failed['status'], failed['error']), ('failed', 'disk full'))
+        self.assertTrue(all(result['status'] == 'success' for result in results.values()))
+
+
+    def test_queues_stay_within_their_depth_when_compute_is_slow(self):
+        refine = self.processor.refine_image
+        
+        def slow_refine(image, plan):
+            time.sleep(0.02)
+            return refine(image, plan)
+        
+        with mock.patch.object(self.processor, 'refine_image', side_effect=slow_refine):
+            results = self.run_pipeline()
+        self.assertTrue(all(result['status'] == 'success' for result in results.values()))
+        
+        stats = self.pipeline.stats()
+        decoded, refined = stats['queues']['decoded'], stats['queues']['refined']
+        self.assertEqual(decoded['capacity'], DEPTH)
+        self.assertEqual(decoded['max'], DEPTH)
+        self.assertLessEqual(refined['max'], DEPTH)
+        self.assertGreater(stats['stages']['read']['blocked'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from main.utils.manifest import Manifest, COMMIT_INTERVAL
+
+
+#------------------------------------------------------------------#
+#                          Manifest Tests                          #
+#------------------------------------------------------------------#
+class ManifestTests(unittest.TestCase):
+    
+    # Manifeste et fichier média dans un dossier temporaire
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir, ignore_errors=True)
+        self.db_path = os.path.join(self.work_dir, '.cache', 'manifest.db')
+        self.manifest = Manifest(self.db_path)
+        self.addCleanup(self.manifest.close)
+        self.file_path = self.write('clip.wav', b'audio')
+
+
+    # Fichier de contenu donné dans le dossier de travail
+    def write(self, name, data):
+        path = os.path.join(self.work_dir, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+
+    # Nombre de lignes visibles depuis une autre connexion (enregistrements validés)
+    def committed_rows(self):
+        connection = sqlite3.connect(self.db_path)
+        try:
+            return connection.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+        finally:
+            connection.close()
+
+
+    def test_new_file_needs_processing_until_recorded(self):
+        self.assertTrue(self.manifest.needs_processing(self.file_path, 'abc'))
+        self.manifest.record(self.file_path, 'abc', 'success', 'out.wav')
+        self.assertFalse(self.manifest.needs_processing(self.file_path, 'abc'))
+
+
+    def test_touch_marks_file_as_changed(self):
+        self.manifest.record(self.file_path, 'abc', 'success')
+        stat = os.stat(self.file_path)
+        os.utime(self.file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+        self.assertTrue(self.manifest.needs_processing(self.file_path, 'abc'))
+
+
+    def test_rename_is_a_new_file(self):
+        self.manifest.record(self.file_path, 'abc', 'success')
+        renamed = os.path.join(self.work_dir, 'renamed.wav')
+        os.rename(self.file_path, renamed)
+        self.assertTrue(self.manifest.needs_processing(renamed, 'abc'))
+        self.assertFalse(self.manifest.needs_processing(self.file_path, 'abc'))
+
+
+    def test_config_change_and_failure_require_processing(self):
+        self.manifest.record(self.file_path, 'abc', 'success')
+        self.assertTrue(self.manifest.needs_processing(self.file_path, 'def'))
+        self.manifest.record(self.file_path, 'abc', 'failed')
+        self.assertTrue(self.manifest.needs_processing(self.file_path, 'abc'))
+
+
+    def test_records_are_committed_in_batches(self):
+        paths = [self.write(f"clip_{index}.wav", b'audio') for index in range(COMMIT_INTERVAL + 1)]
+        self.manifest.record(paths[0], 'abc', 'success')
+        self.assertEqual(self.committed_rows(), 0)
+        for path in paths[1:COMMIT_INTERVAL]:
+            self.manifest.record(path, 'abc', 'success')
+        self.assertEqual(self.committed_rows(), COMMIT_INTERVAL)
+        
+        self.manifest.record(paths[-1], 'abc', 'success')
+        self.manifest.flush()
+        self.assertEqual(self.committed_rows(), COMMIT_INTERVAL + 1)
+
+
+    def test_records_survive_reopening(self):
+        self.manifest.record(self.file_path, 'abc', 'success')
+        self.manifest.close()
+        self.manifest = Manifest(self.db_path)
+        self.addCleanup(self.manifest.close)
+        self.assertFalse(self.manifest.needs_processing(self.file_path, 'abc'))
+
+
+if __name__ == '__main__':
+    unittest.main()
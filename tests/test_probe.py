@@ -0,0 +1,128 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from main.bench import make_video
+from main.processors.video_processor import VideoProcessor
+from main.utils import probe
+from main.utils.config import Config
+
+
+FULL_ENCODERS = frozenset({'libx264', 'aac'})
+MEDIA = {'video_codec': 'mjpeg', 'width': 160, 'height': 120, 'fps': 24.0, 'duration': 1.0, 'has_audio': True}
+
+
+# Capacités factices de la machine
+def capabilities(ffmpeg=True, ffprobe=False, encoders=FULL_ENCODERS, moviepy=True):
+    return {
+        'ffmpeg': '/usr/bin/ffmpeg' if ffmpeg else None,
+        'ffprobe': '/usr/bin/ffprobe' if ffprobe else None,
+        'encoders': encoders if ffmpeg else frozenset(),
+        'moviepy': moviepy
+    }
+
+
+#------------------------------------------------------------------#
+#                        Media Probe Tests                         #
+#------------------------------------------------------------------#
+class MediaProbeTests(unittest.TestCase):
+    
+    # Fichiers de test dans un dossier temporaire
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir, ignore_errors=True)
+        self.garbage_path = os.path.join(self.work_dir, 'broken.mp4')
+        with open(self.garbage_path, 'wb') as f:
+            f.write(b'not a video' * 100)
+
+
+    # Sondage avec des capacités factices et des sondes ffprobe / ffmpeg / OpenCV remplacées
+    def probe_with(self, **caps):
+        with mock.patch.object(probe, 'probe_capabilities', return_value=capabilities(**caps)), \
+                mock.patch.object(probe, 'probe_with_ffprobe', return_value=dict(MEDIA, video_codec='ffprobe')), \
+                mock.patch.object(probe, 'probe_with_ffmpeg', return_value=dict(MEDIA, video_codec='ffmpeg')), \
+                mock.patch.object(probe, 'probe_with_opencv', return_value=dict(MEDIA, video_codec='opencv')):
+            return probe.probe_media(self.garbage_path)['video_codec']
+
+
+    def test_fallback_chain_prefers_ffprobe_then_ffmpeg_banner_then_opencv(self):
+        self.assertEqual(self.probe_with(ffprobe=True), 'ffprobe')
+        self.assertEqual(self.probe_with(ffprobe=False), 'ffmpeg')
+        self.assertEqual(self.probe_with(ffmpeg=False, ffprobe=False), 'opencv')
+
+
+    def test_missing_file_and_missing_video_stream_are_errors(self):
+        self.assertEqual(probe.probe_media(os.path.join(self.work_dir, 'missing.mp4')), {'error': 'File not found'})
+        with mock.patch.object(probe, 'probe_capabilities', return_value=capabilities(ffmpeg=False)), \
+                mock.patch.object(probe, 'probe_with_opencv', return_value=dict(MEDIA, width=0)):
+            self.assertEqual(probe.probe_media(self.garbage_path)['error'], 'No video stream')
+
+
+    @unittest.skipUnless(shutil.which('ffmpeg'), 'FFmpeg not found')
+    def test_ffmpeg_banner_probe_reads_a_real_file(self):
+        video_path = make_video(os.path.join(self.work_dir, 'clip.avi'), 160, 120, 6)
+        media = probe.probe_with_ffmpeg(video_path, shutil.which('ffmpeg'))
+        self.assertEqual((media['width'], media['height']), (160, 120))
+        self.assertAlmostEqual(media['fps'], 24.0)
+        self.assertFalse(media['has_audio'])
+        self.assertTrue(probe.probe_with_ffmpeg(self.garbage_path, shutil.which('ffmpeg'))['error'].startswith('Unreadable media'))
+
+
+    def test_opencv_probe_rejects_an_unreadable_file(self):
+        self.assertTrue(probe.probe_with_opencv(self.garbage_path)['error'].startswith('Unreadable media'))
+
+
+    def test_unreadable_file_fails_before_any_backend_runs(self):
+        processor = VideoProcessor(Config())
+        info = {}
+        with mock.patch.object(processor, 'select_video_backend') as select_video_backend:
+            self.assertFalse(processor.process_video(self.garbage_path, os.path.join(self.work_dir, 'out.mp4'), info))
+        select_video_backend.assert_not_called()
+        self.assertTrue(info['error'].startswith('Unreadable media'))
+        self.assertNotIn('backend', info)
+
+
+#------------------------------------------------------------------#
+#                     Backend Selection Tests                      #
+#------------------------------------------------------------------#
+class BackendSelectionTests(unittest.TestCase):
+    
+    # Choix du backend pour un réglage, des capacités et une présence d'audio donnés
+    def select(self, backend='auto', has_audio=True, **caps):
+        config = Config()
+        config.video_backend = backend
+        processor = VideoProcessor(config)
+        with mock.patch('main.processors.video_processor.probe_capabilities', return_value=capabilities(**caps)):
+            return processor.select_video_backend(dict(MEDIA, has_audio=has_audio))
+
+
+    def test_auto_prefers_pipe_then_moviepy_then_opencv(self):
+        self.assertEqual(self.select(), ('pipe', None))
+        self.assertEqual(self.select(ffmpeg=False), ('moviepy', None))
+        self.assertEqual(self.select(ffmpeg=False, moviepy=False), ('opencv', None))
+        self.assertEqual(self.select(encoders=frozenset({'aac'})), ('moviepy', None))
+
+
+    def test_aac_is_only_required_when_the_source_has_audio(self):
+        self.assertEqual(self.select(encoders=frozenset({'libx264'}), moviepy=False), ('opencv', None))
+        self.assertEqual(self.select(encoders=frozenset({'libx264'}), has_audio=False), ('pipe', None))
+        self.assertEqual(self.select(encoders=frozenset({'libx264'}), has_audio=None, moviepy=False), ('opencv', None))
+
+
+    def test_ffmpeg_filter_backend_is_only_used_when_requested(self):
+        for caps in ({}, {'moviepy': False}, {'ffprobe': True}):
+            self.assertNotEqual(self.select(**caps)[0], 'ffmpeg')
+        self.assertEqual(self.select('ffmpeg'), ('ffmpeg', None))
+
+
+    def test_explicit_backend_fails_fast_when_unavailable(self):
+        self.assertEqual(self.select('ffmpeg', ffmpeg=False), (None, 'FFmpeg with libx264/aac encoders not found'))
+        self.assertEqual(self.select('pipe', encoders=frozenset({'libx264'})), (None, 'FFmpeg with libx264/aac encoders not found'))
+        self.assertEqual(self.select('moviepy', moviepy=False), (None, 'MoviePy is not installed'))
+        self.assertEqual(self.select('opencv', ffmpeg=False, moviepy=False), ('opencv', None))
+        self.assertEqual(self.select('gstreamer'), (None, 'Unknown video backend: gstreamer'))
+
+
+if __name__ == '__main__':
+    unittest.main()
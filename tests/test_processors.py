@@ -1 +1,39 @@
- 
+import os
+import sys
+import subprocess
+import unittest
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('cv2', 'librosa', 'numba', 'scipy', 'moviepy', 'skimage', 'numpy', 'pydub', 'soundfile', 'soxr', 'PIL')
+
+
+#------------------------------------------------------------------#
+#                        Lazy Import Tests                         #
+#------------------------------------------------------------------#
+class LazyImportTests(unittest.TestCase):
+    
+    # Lance une commande CLI avec -X importtime et renvoie les modules lourds importés
+    def heavy_modules_after(self, *args):
+        script = "import sys\nfrom main.cli import cli\ncli(sys.argv[1:], standalone_mode=False)"
+        env = dict(os.environ, PYTHONPATH=ROOT_DIR)
+        output = subprocess.run([sys.executable, '-X', 'importtime', '-c', script, *args],
+                                capture_output=True, text=True, env=env, check=True)
+        
+        imported = set()
+        for line in output.stderr.splitlines():
+            if line.startswith('import time:') and '|' in line:
+                imported.add(line.rsplit('|', 1)[1].strip().split('.')[0])
+        return sorted(imported.intersection(HEAVY_MODULES))
+
+
+    def test_version_does_not_import_media_libraries(self):
+        self.assertEqual(self.heavy_modules_after('--version'), [])
+
+
+    def test_info_does_not_import_media_libraries(self):
+        self.assertEqual(self.heavy_modules_after('info', os.path.join(ROOT_DIR, 'tests')), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
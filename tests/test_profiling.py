@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+import numpy as np
+from main.bench import make_wav
+from main.core.engine import MediaRefinerEngine
+from main.utils.config import Config
+from main.utils.profiling import StageTotals, TraceRecorder, job_profile, stage, profiled, profiled_iter, bind_context
+
+
+#------------------------------------------------------------------#
+#                         Profiled Worker                          #
+#------------------------------------------------------------------#
+class Worker:
+    
+    # Étape par frame
+    @profiled('test.frame', unit='frames')
+    def process_frame(self, frame):
+        return frame + 1
+
+
+    # Étape mesurée en octets du premier argument
+    @profiled('test.block')
+    def process_block(self, block):
+        return block * 2
+
+
+#------------------------------------------------------------------#
+#                         Job Profile Tests                        #
+#------------------------------------------------------------------#
+class JobProfileTests(unittest.TestCase):
+    
+    def test_nested_stages_add_up_inside_their_parent(self):
+        with job_profile('clip.mp4') as profile:
+            with stage('job', unit='files') as timer:
+                for _ in range(3):
+                    with stage('inner', 10):
+                        time.sleep(0.01)
+                timer.amount = 1
+        
+        timings = profile.timings()
+        self.assertEqual(timings['inner']['calls'], 3)
+        self.assertEqual(timings['inner']['amount'], 30)
+        self.assertEqual(timings['inner']['unit'], 'bytes')
+        self.assertEqual((timings['job']['calls'], timings['job']['amount'], timings['job']['unit']), (1, 1, 'files'))
+        self.assertGreaterEqual(timings['inner']['wall'], 0.03)
+        self.assertGreaterEqual(timings['job']['wall'], timings['inner']['wall'])
+        self.assertLess(timings['inner']['cpu'], timings['inner']['wall'])
+
+
+    def test_decorated_stages_count_frames_and_bytes(self):
+        worker = Worker()
+        block = np.zeros(256, dtype=np.float32)
+        with job_profile('clip.mp4') as profile:
+            for frame in profiled_iter([np.zeros((2, 2), dtype=np.uint8)] * 4, 'test.decode', unit='frames'):
+                worker.process_frame(frame)
+            worker.process_block(block)
+        
+        timings = profile.timings()
+        self.assertEqual((timings['test.decode']['calls'], timings['test.decode']['amount']), (5, 4))
+        self.assertEqual((timings['test.frame']['calls'], timings['test.frame']['amount']), (4, 4))
+        self.assertEqual((timings['test.block']['calls'], timings['test.block']['amount']), (1, block.nbytes))
+
+
+    def test_nothing_is_recorded_outside_a_job(self):
+        with job_profile('clip.mp4') as profile:
+            pass
+        with stage('orphan'):
+            pass
+        np.testing.assert_array_equal(Worker().process_block(np.ones(4)), np.full(4, 2.0))
+        self.assertEqual(profile.timings(), {})
+
+
+    def test_concurrent_jobs_keep_their_own_stages(self):
+        barrier = threading.Barrier(2)
+        profiles = {}
+        
+        def run_job(name):
+            with job_profile(name) as profile:
+                barrier.wait()
+                for _ in range(5):
+                    with stage(f"{name}.step"):
+                        time.sleep(0.001)
+                barrier.wait()
+            profiles[name] = profile.timings()
+        
+        threads = [threading.Thread(target=run_job, args=(name,)) for name in ('a', 'b')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(set(profiles['a']), {'a.step'})
+        self.assertEqual(set(profiles['b']), {'b.step'})
+        self.assertEqual(profiles['a']['a.step']['calls'], 5)
+
+
+    def test_helper_threads_only_record_when_bound_to_the_job(self):
+        with job_profile('clip.mp4') as profile:
+            def measure(name):
+                with stage(name):
+                    pass
+            
+            unbound = threading.Thread(target=measure, args=('unbound',))
+            bound = threading.Thread(target=bind_context(measure), args=('bound',))
+            for thread in (unbound, bound):
+                thread.start()
+                thread.join()
+        self.assertEqual(set(profile.timings()), {'bound'})
+
+
+#------------------------------------------------------------------#
+#                         Stage Totals Tests                       #
+#------------------------------------------------------------------#
+class StageTotalsTests(unittest.TestCase):
+    
+    def test_totals_add_jobs_and_sort_by_wall_time(self):
+        totals = StageTotals()
+        totals.add({'decode': {'calls': 2, 'wall': 1.0, 'cpu': 0.5, 'amount': 100, 'unit': 'frames'}})
+        totals.add({'decode': {'calls': 3, 'wall': 1.0, 'cpu': 0.5, 'amount': 100, 'unit': 'frames'},
+                    'encode': {'calls': 1, 'wall': 5.0, 'cpu': 4.0, 'amount': 0, 'unit': 'frames'}})
+        totals.add(None)
+        
+        report = totals.report()
+        self.assertEqual(list(report), ['encode', 'decode'])
+        self.assertEqual(report['decode'], {'calls': 5, 'wall': 2.0, 'cpu': 1.0, 'amount': 200, 'unit': 'frames', 'throughput': 100.0})
+        self.assertIsNone(report['encode']['throughput'])
+
+
+#------------------------------------------------------------------#
+#                        Trace Recorder Tests                      #
+#------------------------------------------------------------------#
+class TraceRecorderTests(unittest.TestCase):
+    
+    # Trace écrite dans un dossier temporaire puis relue
+    def write_trace(self, recorder):
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir, ignore_errors=True)
+        path = os.path.join(work_dir, 'traces', 'run.json')
+        count = recorder.write(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            return count, json.load(f)
+
+
+    def test_trace_is_valid_chrome_json_with_one_track_per_thread(self):
+        recorder = TraceRecorder()
+        barrier = threading.Barrier(2)
+        
+        def run_job(name):
+            with job_profile(name, trace=True) as profile:
+                with stage('video.job'):
+                    with stage('video.denoise', 1, 'frames'):
+                        barrier.wait()
+            recorder.extend(profile.events)
+        
+        threads = [threading.Thread(target=run_job, args=(name,)) for name in ('a.mp4', 'b.mp4')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        count, trace = self.write_trace(recorder)
+        
+        self.assertEqual(count, 4)
+        self.assertEqual(trace['displayTimeUnit'], 'ms')
+        metadata = [event for event in trace['traceEvents'] if event['ph'] == 'M']
+        spans = [event for event in trace['traceEvents'] if event['ph'] == 'X']
+        self.assertEqual(len(metadata), 2)
+        self.assertEqual(len(spans), 4)
+        for event in spans:
+            self.assertEqual(set(event), {'name', 'cat', 'ph', 'pid', 'tid', 'ts', 'dur', 'args'})
+            self.assertEqual(event['pid'], os.getpid())
+            self.assertGreaterEqual(event['dur'], 0)
+        self.assertEqual({event['tid'] for event in spans}, {event['tid'] for event in metadata})
+        self.assertEqual([event['ts'] for event in spans], sorted(event['ts'] for event in spans))
+        
+        for job in ('a.mp4', 'b.mp4'):
+            outer, inner = (next(event for event in spans if event['args']['file'] == job and event['name'] == name)
+                            for name in ('video.job', 'video.denoise'))
+            self.assertEqual(outer['tid'], inner['tid'])
+            self.assertEqual(inner['cat'], 'video')
+            self.assertGreaterEqual(inner['ts'], outer['ts'])
+            self.assertLessEqual(inner['ts'] + inner['dur'], outer['ts'] + outer['dur'] + 0.01)
+
+
+    def test_engine_writes_the_trace_on_cleanup(self):
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir, ignore_errors=True)
+        config = Config()
+        config.output_dir = os.path.join(work_dir, 'refined')
+        config.temp_dir = os.path.join(work_dir, 'temp')
+        config.preserve_original = False
+        config.result_cache = False
+        config.trace_path = os.path.join(work_dir, 'trace.json')
+        
+        engine = MediaRefinerEngine(config)
+        engine.initialize()
+        result = engine.process_single_file(make_wav(os.path.join(work_dir, 'tone.wav'), 0.5))
+        engine.cleanup()
+        self.assertEqual(result['status'], 'success', result.get('error'))
+        
+        with open(config.trace_path, 'r', encoding='utf-8') as f:
+            spans = [event for event in json.load(f)['traceEvents'] if event['ph'] == 'X']
+        self.assertEqual({event['name'] for event in spans}, set(result['timings']))
+        self.assertTrue(all(event['args']['file'].endswith('tone.wav') for event in spans))
+
+
+    def test_drain_hands_events_over_once(self):
+        recorder = TraceRecorder()
+        recorder.extend([('stage', 0.0, 0.1, 1, 2, 'job')])
+        self.assertEqual(len(recorder.drain()), 1)
+        self.assertEqual(recorder.drain(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
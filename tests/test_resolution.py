@@ -0,0 +1,97 @@
+import unittest
+import numpy as np
+from main.processors.video_processor import VideoProcessor
+from main.utils.config import Config
+from main.utils.resolution import plan_image_resolution, plan_video_resolution
+
+
+#------------------------------------------------------------------#
+#                     Video Resolution Plans                       #
+#------------------------------------------------------------------#
+class VideoPlanTests(unittest.TestCase):
+    
+    # Invariants d'un plan: cadre pair, letterbox centré complétant la sortie, proportions conservées
+    def assert_letterbox(self, plan):
+        (fit_width, fit_height), (width, height) = plan['fit'], plan['output']
+        top, bottom, left, right = plan['padding']
+        self.assertEqual((fit_width % 2, fit_height % 2), (0, 0))
+        self.assertEqual((fit_width + left + right, fit_height + top + bottom), (width, height))
+        self.assertLessEqual(abs(top - bottom), 1)
+        self.assertLessEqual(abs(left - right), 1)
+        self.assertTrue(fit_width == width or fit_height == height)
+        source_width, source_height = plan['source']
+        scale = min(width / source_width, height / source_height)
+        self.assertLessEqual(abs(fit_width - source_width * scale), 2)
+        self.assertLessEqual(abs(fit_height - source_height * scale), 2)
+
+
+    def test_larger_source_is_reduced_before_filtering(self):
+        plan = plan_video_resolution(1920, 1080, 1280, 720)
+        self.assertEqual(plan['resize'], 'down-first')
+        self.assertEqual(plan['work'], (1280, 720))
+        self.assertEqual(plan['padding'], (0, 0, 0, 0))
+        self.assert_letterbox(plan)
+
+
+    def test_smaller_source_is_filtered_at_source_size_and_upscaled_last(self):
+        plan = plan_video_resolution(640, 480, 1280, 720)
+        self.assertEqual(plan['resize'], 'up-last')
+        self.assertEqual(plan['work'], (640, 480))
+        self.assertEqual(plan['fit'], (960, 720))
+        self.assertEqual(plan['padding'], (0, 0, 160, 160))
+        self.assert_letterbox(plan)
+
+
+    def test_same_size_is_left_alone(self):
+        plan = plan_video_resolution(1280, 720, 1280, 720)
+        self.assertEqual(plan['resize'], 'none')
+        self.assertEqual(plan['work'], plan['output'])
+        self.assertEqual(plan['padding'], (0, 0, 0, 0))
+
+
+    def test_other_aspect_ratios_are_letterboxed(self):
+        wide = plan_video_resolution(1920, 800, 1280, 720)
+        self.assertEqual(wide['fit'], (1280, 534))
+        self.assertEqual(wide['padding'], (93, 93, 0, 0))
+        portrait = plan_video_resolution(1080, 1920, 1280, 720)
+        self.assertEqual(portrait['fit'][1], 720)
+        self.assertGreater(portrait['padding'][2], 0)
+        for width, height in ((1920, 800), (1080, 1920), (721, 405), (333, 333), (3840, 1600), (15, 9)):
+            with self.subTest(source=(width, height)):
+                self.assert_letterbox(plan_video_resolution(width, height, 1280, 720))
+
+
+    def test_output_frame_has_black_bars(self):
+        processor = VideoProcessor(Config())
+        plan = plan_video_resolution(640, 480, 1280, 720)
+        frame = np.full((480, 640, 3), 200, dtype=np.uint8)
+        output = processor.to_output_resolution(processor.to_work_resolution(frame, plan), plan)
+        self.assertEqual(output.shape, (720, 1280, 3))
+        self.assertFalse(output[:, :160].any())
+        self.assertFalse(output[:, -160:].any())
+        self.assertTrue((output[:, 160:-160] > 0).all())
+
+
+#------------------------------------------------------------------#
+#                     Image Resolution Plans                       #
+#------------------------------------------------------------------#
+class ImagePlanTests(unittest.TestCase):
+    
+    def test_image_upscale_is_bounded(self):
+        plan = plan_image_resolution(640, 480)
+        self.assertEqual((plan['resize'], plan['work'], plan['output']), ('up-last', (640, 480), (1440, 1080)))
+        self.assertEqual(plan_image_resolution(360, 480)['output'], (1080, 1440))
+        self.assertEqual(plan_image_resolution(360, 240)['resize'], 'none')
+        self.assertEqual(plan_image_resolution(200, 100)['output'], (200, 100))
+
+
+    def test_large_images_are_never_resized(self):
+        for width, height in ((1920, 1080), (4000, 3000), (1080, 5000)):
+            plan = plan_image_resolution(width, height)
+            with self.subTest(source=(width, height)):
+                self.assertEqual(plan['resize'], 'none')
+                self.assertEqual(plan['output'], (width, height))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from main.core.engine import MediaRefinerEngine
+from main.utils.config import Config
+from main.utils.file_handler import FileHandler
+
+
+#------------------------------------------------------------------#
+#                        Directory Scan Tests                      #
+#------------------------------------------------------------------#
+class ScanTests(unittest.TestCase):
+    
+    # Arborescence de test: médias imbriqués, fichiers ignorés, sortie et espace de travail dans le dossier scanné
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.config = Config()
+        self.config.output_dir = os.path.join(self.root, 'refined_media')
+        self.config.temp_dir = os.path.join(self.root, 'nested', 'temp_processing')
+        self.handler = FileHandler(self.config)
+        
+        for relative_path in ('a.jpg', 'b.MP3', 'notes.txt', 'nested/c.mp4', 'nested/deep/d.png', 'nested/deep/e.WAV',
+                              'other/f.webm', 'refined_media/a_refined.jpg', 'refined_media/originals/a.jpg',
+                              'nested/temp_processing/job/frame.png'):
+            self.write(relative_path, b'data')
+        self.write('nested/empty.jpg', b'')
+        os.symlink(os.path.join(self.root, 'other'), os.path.join(self.root, 'link_to_other'))
+
+
+    # Fichier de contenu donné sous la racine de test
+    def write(self, relative_path, data):
+        path = os.path.join(self.root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+
+    # Référence os.walk: fichiers média non vides hors sortie et espace de travail
+    def walk_media_files(self, recursive=True):
+        excluded = {self.config.output_dir, self.config.temp_dir}
+        found = set()
+        for root, dirs, files in os.walk(self.root):
+            dirs[:] = [d for d in dirs if os.path.join(root, d) not in excluded] if recursive else []
+            for name in files:
+                path = os.path.join(root, name)
+                if self.handler.detect_media_type(path) and os.path.getsize(path) > 0:
+                    found.add(path)
+        return found
+
+
+    def test_serial_and_parallel_scans_match_os_walk(self):
+        expected = self.walk_media_files()
+        self.assertEqual(len(expected), 6)
+        for workers in (1, 4):
+            with self.subTest(workers=workers):
+                media_files = list(self.handler.iter_media_files(self.root, workers=workers))
+                self.assertEqual({media_file.path for media_file in media_files}, expected)
+                self.assertEqual(len(media_files), len(expected))
+
+
+    def test_non_recursive_scan_matches_top_level(self):
+        scanned = {media_file.path for media_file in self.handler.iter_media_files(self.root, recursive=False)}
+        self.assertEqual(scanned, self.walk_media_files(recursive=False))
+
+
+    def test_output_and_temp_directories_are_skipped(self):
+        scanned = self.handler.scan_directory(self.root)
+        self.assertFalse([path for path in scanned if 'refined_media' in path or 'temp_processing' in path])
+
+
+    def test_media_types_and_sizes_come_from_the_scan(self):
+        for media_file in self.handler.iter_media_files(self.root):
+            self.assertEqual(media_file.media_type, self.handler.detect_media_type(media_file.path))
+            self.assertEqual(media_file.size, 4)
+
+
+    def test_progress_total_follows_the_scan(self):
+        engine = MediaRefinerEngine(self.config)
+        stderr = io.StringIO()
+        with redirect_stderr(stderr):
+            results = engine.process_batch((path for path in [os.path.join(self.root, 'notes.txt')] * 3), max_workers=1)
+        engine.cleanup()
+        self.assertEqual(len(results['failed']), 3)
+        self.assertIn('3/3', stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor, wait
+from main.core.scheduler import JobScheduler
+from main.utils.config import Config
+
+
+COSTS = {'a.mp4': 1.0, 'b.mp4': 5.0, 'c.mp4': 3.0, 'd.wav': 2.0, 'e.jpg': 0.5, 'f.jpg': 0.2}
+MEDIA_TYPES = {'.mp4': 'video', '.wav': 'audio', '.jpg': 'image'}
+
+
+# Type de média déduit de l'extension (sans accès disque)
+def detect_media_type(file_path):
+    return MEDIA_TYPES.get(file_path[file_path.rindex('.'):])
+
+
+#------------------------------------------------------------------#
+#                    Fixed Cost Scheduler                          #
+#------------------------------------------------------------------#
+class FixedCostScheduler(JobScheduler):
+    
+    # Coûts fixés par fichier; les vidéos reçoivent une sonde factice
+    def probe(self, file_path, media_type):
+        return COSTS[file_path], {'path': file_path} if media_type == 'video' else None
+
+
+#------------------------------------------------------------------#
+#                        Scheduler Tests                           #
+#------------------------------------------------------------------#
+class SchedulerTests(unittest.TestCase):
+    
+    # Ordonnanceur à coûts fixes alimenté par une liste de fichiers
+    def make_scheduler(self, file_paths, max_workers=1, lane_limits=None, extra_slots=None, probe_pool=None):
+        config = Config()
+        config.lane_limits = lane_limits or {}
+        scheduler = FixedCostScheduler(config, max_workers, detect_media_type, extra_slots, probe_pool)
+        for file_path in file_paths:
+            scheduler.add(file_path)
+        return scheduler
+
+
+    # Ordre de sortie en libérant chaque créneau avant le job suivant
+    def drain(self, scheduler):
+        order = []
+        job = scheduler.pop_ready()
+        while job is not None:
+            order.append(job[0])
+            scheduler.finished(job[1])
+            job = scheduler.pop_ready()
+        return order
+
+
+    def test_jobs_run_longest_first(self):
+        scheduler = self.make_scheduler(['a.mp4', 'b.mp4', 'c.mp4', 'd.wav'])
+        self.assertEqual(self.drain(scheduler), ['b.mp4', 'c.mp4', 'd.wav', 'a.mp4'])
+        self.assertEqual(scheduler.pending_count, 0)
+
+
+    def test_lane_limit_lets_other_media_types_through(self):
+        scheduler = self.make_scheduler(['a.mp4', 'b.mp4', 'c.mp4', 'd.wav'], max_workers=3, lane_limits={'video': 1})
+        self.assertEqual(scheduler.pop_ready()[0], 'b.mp4')
+        self.assertEqual(scheduler.pop_ready()[0], 'd.wav')
+        self.assertIsNone(scheduler.pop_ready())
+        
+        scheduler.finished('video')
+        self.assertEqual(scheduler.pop_ready()[0], 'c.mp4')
+        self.assertEqual(scheduler.lane_load, {'video': 1, 'audio': 1})
+
+
+    def test_extra_slots_are_reserved_for_their_media_type(self):
+        scheduler = self.make_scheduler(['b.mp4', 'c.mp4', 'e.jpg', 'f.jpg'], extra_slots={'image': 1})
+        self.assertEqual(scheduler.pop_ready()[0], 'b.mp4')
+        self.assertEqual(scheduler.pop_ready()[0], 'e.jpg')
+        self.assertIsNone(scheduler.pop_ready())
+        
+        scheduler.finished('image')
+        self.assertEqual(scheduler.pop_ready()[0], 'f.jpg')
+
+
+    def test_window_bounds_pending_jobs(self):
+        config = Config()
+        config.schedule_window = 2
+        scheduler = FixedCostScheduler(config, 1, detect_media_type)
+        scheduler.add('a.mp4')
+        self.assertFalse(scheduler.is_full())
+        scheduler.add('b.mp4')
+        self.assertTrue(scheduler.is_full())
+        scheduler.pop_ready()
+        self.assertFalse(scheduler.is_full())
+
+
+    def test_probes_run_in_the_pool_and_reach_the_job(self):
+        release = threading.Event()
+        probe = FixedCostScheduler.probe
+        
+        # Sonde de b.mp4 bloquée jusqu'à la libération
+        def slow_probe(scheduler, file_path, media_type):
+            if file_path == 'b.mp4':
+                release.wait(5)
+            return probe(scheduler, file_path, media_type)
+        
+        with ThreadPoolExecutor(2) as pool:
+            scheduler = self.make_scheduler([], max_workers=2, probe_pool=pool)
+            scheduler.probe = slow_probe.__get__(scheduler)
+            scheduler.add('a.mp4')
+            scheduler.add('b.mp4')
+            wait([f for f, (path, _) in scheduler.probing.items() if path == 'a.mp4'])
+            self.assertEqual(scheduler.pop_ready(), ('a.mp4', 'video', {'path': 'a.mp4'}))
+            self.assertIsNone(scheduler.pop_ready())
+            self.assertEqual(len(scheduler.pending_probes()), 1)
+            
+            release.set()
+            wait(scheduler.pending_probes())
+            self.assertEqual(scheduler.pop_ready(), ('b.mp4', 'video', {'path': 'b.mp4'}))
+            self.assertEqual(scheduler.pending_probes(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import sys
+import shutil
+import socket
+import tempfile
+import subprocess
+import unittest
+from unittest import mock
+from main.utils.config import Config
+from main.utils.scratch import ScratchSpace, SESSION_PREFIX, scratch_space
+
+
+#------------------------------------------------------------------#
+#                        Scratch Space Tests                       #
+#------------------------------------------------------------------#
+class ScratchSpaceTests(unittest.TestCase):
+    
+    # Racine rapide et racine de repli dans un dossier temporaire
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir, ignore_errors=True)
+        self.fast_root = os.path.join(self.work_dir, 'fast')
+        self.slow_root = os.path.join(self.work_dir, 'slow')
+        self.space = ScratchSpace(self.fast_root, budget=100, fallback_root=self.slow_root)
+        self.addCleanup(self.space.close)
+
+
+    # Dossier de session factice laissé par un processus donné
+    def make_session(self, pid):
+        path = os.path.join(self.fast_root, f"{SESSION_PREFIX}{socket.gethostname()}-{pid}-stale")
+        os.makedirs(os.path.join(path, 'job-x'))
+        with open(os.path.join(path, 'job-x', 'partial.tmp'), 'wb') as f:
+            f.write(b'partial')
+        return path
+
+
+    def test_concurrent_jobs_get_disjoint_directories(self):
+        with self.space.job() as first, self.space.job() as second:
+            self.assertNotEqual(first, second)
+            self.assertFalse(first.startswith(second + os.sep) or second.startswith(first + os.sep))
+            self.assertEqual(os.path.dirname(first), os.path.dirname(second))
+            self.assertTrue(os.path.isdir(first) and os.path.isdir(second))
+
+
+    def test_job_directory_is_removed_on_success_and_failure(self):
+        with self.space.job() as path:
+            with open(os.path.join(path, 'frame.raw'), 'wb') as f:
+                f.write(b'data')
+        self.assertFalse(os.path.exists(path))
+        
+        with self.assertRaises(RuntimeError):
+            with self.space.job(estimate=40) as path:
+                raise RuntimeError('encoder failed')
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual((self.space.reserved, self.space.active_jobs), (0, 0))
+
+
+    def test_stale_sessions_of_dead_processes_are_purged(self):
+        child = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'], capture_output=True, text=True)
+        dead = self.make_session(int(child.stdout))
+        alive = self.make_session(os.getppid())
+        with self.space.job() as path:
+            own = os.path.dirname(path)
+            self.space.purge_stale()
+            self.assertTrue(os.path.isdir(path))
+        
+        self.assertFalse(os.path.exists(dead))
+        self.assertTrue(os.path.isdir(alive))
+        self.assertTrue(os.path.isdir(own))
+
+
+    def test_jobs_over_budget_fall_back_to_the_secondary_root(self):
+        with self.space.job(estimate=60) as first:
+            self.assertTrue(first.startswith(self.fast_root + os.sep))
+            with self.space.job(estimate=60) as second:
+                self.assertTrue(second.startswith(self.slow_root + os.sep))
+            self.assertEqual(self.space.reserved, 60)
+        
+        with self.space.job(estimate=60) as third:
+            self.assertTrue(third.startswith(self.fast_root + os.sep))
+
+
+    def test_full_fast_disk_falls_back_even_within_budget(self):
+        with mock.patch('main.utils.scratch.shutil.disk_usage', return_value=mock.Mock(free=10)):
+            with self.space.job(estimate=50) as path:
+                self.assertTrue(path.startswith(self.slow_root + os.sep))
+
+
+    def test_without_fallback_root_jobs_stay_on_the_only_root(self):
+        space = ScratchSpace(self.fast_root, budget=10)
+        self.addCleanup(space.close)
+        with space.job(estimate=60) as path:
+            self.assertTrue(path.startswith(self.fast_root + os.sep))
+
+
+    def test_scratch_root_falls_back_to_the_temp_dir(self):
+        config = Config()
+        config.scratch_root = self.fast_root
+        config.temp_dir = self.slow_root
+        config.scratch_budget = 100
+        space = scratch_space(config)
+        self.assertIs(scratch_space(config), space)
+        self.assertEqual((space.root, space.fallback_root, space.budget), (self.fast_root, self.slow_root, 100))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from main.utils.config import Config
+from main.utils.speed_tiers import SPEED_TIERS, validate_tiers, resolve_stages
+
+
+#------------------------------------------------------------------#
+#                        Speed Tier Tests                          #
+#------------------------------------------------------------------#
+class SpeedTierTests(unittest.TestCase):
+    
+    # Fichier JSON de niveaux écrit dans un dossier temporaire
+    def write_tiers(self, tiers):
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir, ignore_errors=True)
+        path = os.path.join(work_dir, 'tiers.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(tiers, f)
+        return path
+
+
+    def test_builtin_tiers_are_valid(self):
+        self.assertIs(validate_tiers(SPEED_TIERS), SPEED_TIERS)
+        for media_type, tiers in SPEED_TIERS.items():
+            self.assertEqual(set(tiers), {'fast', 'balanced', 'max'})
+
+
+    def test_unknown_stage_is_rejected(self):
+        with self.assertRaisesRegex(ValueError, "Unknown image stage in tier 'x': blur"):
+            validate_tiers({'image': {'x': [{'stage': 'blur'}]}})
+        with self.assertRaisesRegex(ValueError, 'Unknown audio stage'):
+            validate_tiers({'audio': {'x': [{'stage': 'stabilize'}]}})
+
+
+    def test_unknown_media_type_and_denoise_method_are_rejected(self):
+        with self.assertRaisesRegex(ValueError, 'Unknown media type'):
+            validate_tiers({'text': {'x': []}})
+        with self.assertRaisesRegex(ValueError, 'Unknown image denoise method'):
+            validate_tiers({'image': {'x': [{'stage': 'denoise', 'method': 'temporal', 'radius': 1}]}})
+
+
+    def test_bad_parameters_are_rejected(self):
+        bilateral = {'stage': 'denoise', 'method': 'bilateral', 'diameter': 5, 'sigma_color': 40, 'sigma_space': 40}
+        nlmeans = {'stage': 'denoise', 'method': 'nlmeans', 'h': 10, 'h_color': 10, 'template': 7, 'search': 21}
+        validate_tiers({'image': {'a': [bilateral], 'b': [nlmeans]}})
+        
+        for bad in (dict(bilateral, diameter=0), dict(bilateral, sigma_color='40'), dict(nlmeans, h=True)):
+            with self.assertRaisesRegex(ValueError, 'Invalid image denoise parameter'):
+                validate_tiers({'image': {'x': [bad]}})
+        missing = dict(nlmeans)
+        del missing['search']
+        with self.assertRaisesRegex(ValueError, "parameter 'search'"):
+            validate_tiers({'image': {'x': [missing]}})
+        with self.assertRaisesRegex(ValueError, 'odd integer'):
+            validate_tiers({'image': {'x': [dict(nlmeans, template=6)]}})
+        with self.assertRaisesRegex(ValueError, 'odd integer'):
+            validate_tiers({'audio': {'x': [{'stage': 'spectral', 'click_kernel': 4}]}})
+        with self.assertRaisesRegex(ValueError, 'list of stages'):
+            validate_tiers({'image': {'x': {'stage': 'colors'}}})
+
+
+    def test_unknown_tier_fails_engine_validation(self):
+        config = Config()
+        config.speed = 'turbo'
+        with self.assertRaisesRegex(ValueError, 'Unknown speed tier: turbo'):
+            config.validate_pipelines()
+
+
+    def test_custom_tier_falls_back_to_max_for_other_media(self):
+        config = Config()
+        config.load_speed_tiers(self.write_tiers({'image': {'preview': [{'stage': 'colors'}]}}))
+        config.speed = 'preview'
+        config.validate_pipelines()
+        self.assertEqual(config.get_pipeline('image'), [{'stage': 'colors'}])
+        self.assertEqual(config.get_pipeline('audio'), resolve_stages('audio', 'max'))
+
+
+    def test_invalid_tier_file_is_rejected_on_load(self):
+        config = Config()
+        with self.assertRaises(ValueError):
+            config.load_speed_tiers(self.write_tiers({'video': {'x': [{'stage': 'denoise', 'method': 'median'}]}}))
+        self.assertEqual(config.speed_tiers, {})
+
+
+    def test_video_overrides_apply_on_top_of_the_tier(self):
+        config = Config()
+        config.speed = 'balanced'
+        config.video_denoise = 'off'
+        self.assertEqual([step['stage'] for step in config.get_pipeline('video')], ['colors', 'sharpen', 'stabilize'])
+        config.video_denoise = 'temporal'
+        config.video_stabilize = False
+        stages = config.get_pipeline('video')
+        self.assertEqual([step['stage'] for step in stages], ['denoise', 'colors', 'sharpen'])
+        self.assertEqual(stages[0]['method'], 'temporal')
+
+
+    def test_resolved_stages_are_copies(self):
+        stages = resolve_stages('image', 'max')
+        stages[0]['h'] = 99
+        self.assertEqual(resolve_stages('image', 'max')[0]['h'], 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,238 @@
+import io
+import os
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+import numpy as np
+from main.bench import make_video
+from main.core.engine import MediaRefinerEngine
+from main.processors.video_processor import VideoProcessor
+from main.utils.config import Config
+from main.utils.probe import probe_capabilities
+
+
+FRAME_COUNT = 6
+PIPELINE_FRAMES = 48
+FRAME_SHAPE = (6, 8, 3)
+
+
+#------------------------------------------------------------------#
+#                      Default Video Backend                       #
+#------------------------------------------------------------------#
+@unittest.skipUnless(probe_capabilities()['ffmpeg'] and 'libx264' in probe_capabilities()['encoders'], 'FFmpeg with libx264 not found')
+class DefaultBackendTests(unittest.TestCase):
+    
+    # Vidéo synthétique et moteur isolés dans un dossier temporaire
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir, ignore_errors=True)
+        self.video_path = make_video(os.path.join(self.work_dir, 'clip.avi'), 160, 120, FRAME_COUNT)
+
+
+    # Traitement du clip avec le backend par défaut et des réglages donnés (lot ou fichier unique)
+    def refine(self, batch=False, **settings):
+        config = Config()
+        config.output_dir = os.path.join(self.work_dir, 'refined')
+        config.temp_dir = os.path.join(self.work_dir, 'temp')
+        config.preserve_original = False
+        config.result_cache = False
+        for name, value in settings.items():
+            setattr(config, name, value)
+        
+        engine = MediaRefinerEngine(config)
+        engine.initialize()
+        try:
+            if batch:
+                result, = engine.iter_process([self.video_path], max_workers=1)
+            else:
+                result = engine.process_single_file(self.video_path)
+        finally:
+            engine.cleanup()
+        self.assertEqual(result['status'], 'success', result.get('error'))
+        return result
+
+
+    def test_auto_backend_runs_the_configured_frame_stages(self):
+        result = self.refine(speed='fast')
+        self.assertEqual(result['backend'], 'pipe')
+        self.assertEqual(result['speed'], 'fast')
+        self.assertEqual(result['stages'], ['denoise', 'colors', 'sharpen'])
+        self.assertEqual(result['timings']['video.denoise']['calls'], FRAME_COUNT)
+        self.assertEqual(result['timings']['video.sharpen']['calls'], FRAME_COUNT)
+        self.assertNotIn('video.stabilize', result['timings'])
+        self.assertNotIn('video.ffmpeg', result['timings'])
+
+
+    def test_ffmpeg_filter_backend_reports_no_speed_tier(self):
+        result = self.refine(speed='fast', video_backend='ffmpeg')
+        self.assertEqual(result['backend'], 'ffmpeg')
+        self.assertIsNone(result['speed'])
+        self.assertEqual(result['stages'], [])
+        self.assertNotIn('video.denoise', result['timings'])
+
+
+    def test_denoise_tier_runs_through_default_backend(self):
+        result = self.refine(video_denoise='fast', video_stabilize=False)
+        self.assertEqual(result['backend'], 'pipe')
+        self.assertEqual(result['stages'][0], 'denoise')
+        self.assertEqual(result['timings']['video.denoise']['calls'], FRAME_COUNT)
+        
+        result = self.refine(video_denoise='off', video_stabilize=False)
+        self.assertNotIn('denoise', result['stages'])
+        self.assertNotIn('video.denoise', result['timings'])
+
+
+    def test_colors_run_through_default_backend(self):
+        result = self.refine(speed='fast')
+        self.assertIn('colors', result['stages'])
+        self.assertEqual(result['timings']['video.colors']['calls'], FRAME_COUNT)
+        
+        result = self.refine(speed_tiers={'video': {'plain': [{'stage': 'sharpen'}]}}, speed='plain')
+        self.assertEqual(result['stages'], ['sharpen'])
+        self.assertNotIn('video.colors', result['timings'])
+
+
+    def test_stabilization_runs_through_default_backend(self):
+        result = self.refine(video_denoise='off')
+        self.assertEqual(result['backend'], 'pipe')
+        self.assertEqual(result['stages'], ['colors', 'sharpen', 'stabilize'])
+        self.assertEqual(result['timings']['video.stabilize_analysis']['calls'], 1)
+        self.assertEqual(result['timings']['video.stabilize']['calls'], FRAME_COUNT)
+        
+        result = self.refine(video_denoise='off', video_stabilize=False)
+        self.assertNotIn('stabilize', result['stages'])
+        self.assertNotIn('video.stabilize_analysis', result['timings'])
+        self.assertNotIn('video.stabilize', result['timings'])
+
+
+    def test_batch_reuses_the_scheduler_probe(self):
+        result = self.refine(batch=True, speed='fast')
+        self.assertEqual(result['media']['width'], 160)
+        self.assertNotIn('video.probe', result['timings'])
+        self.assertEqual(result['timings']['video.denoise']['calls'], FRAME_COUNT)
+
+
+
+#------------------------------------------------------------------#
+#                      Frame Pipeline Tests                        #
+#------------------------------------------------------------------#
+class FramePipelineTests(unittest.TestCase):
+    
+    # Processeur à 4 workers avec débruitage temporel (fenêtre de rayon 1); process_frame remplacé
+    def setUp(self):
+        config = Config()
+        config.video_workers = 4
+        config.video_denoise = 'temporal'
+        self.processor = VideoProcessor(config)
+        self.processor.process_frame = self.fake_process_frame
+        self.completed = []
+        self.fail_at = None
+
+
+    # Frame factice: durée décroissante d'un job à l'autre (fin dans le désordre), frame centrale rendue telle quelle
+    def fake_process_frame(self, frame, transform=None, window=None, plan=None, stages=None):
+        index = int(frame[0, 0, 0])
+        if index == self.fail_at:
+            raise RuntimeError('worker failed')
+        time.sleep(0.002 * (3 - index % 4))
+        if window:
+            self.assertEqual([int(item[0, 0, 0]) for item in window], list(range(index - len(window) // 2, index + len(window) // 2 + 1)))
+        self.completed.append(index)
+        return frame
+
+
+    # Frame de contenu connu: valeur de l'indice, ligne du bas marquée par son complément
+    def make_frame(self, index):
+        frame = np.full(FRAME_SHAPE, index, dtype=np.uint8)
+        frame[-1] = 255 - index
+        return frame
+
+
+    # Exécution du pipeline dans un thread borné dans le temps: (frames écrites, exception levée)
+    def run_pipeline(self, read_frame):
+        written = []
+        outcome = {}
+        
+        def target():
+            try:
+                outcome['count'] = self.processor.run_frame_pipeline(read_frame, lambda frame: written.append(frame.copy()))
+            except Exception as e:
+                outcome['error'] = e
+        
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        thread.join(10)
+        self.assertFalse(thread.is_alive(), 'frame pipeline did not finish')
+        return written, outcome
+
+
+    # Vérification des frames écrites: ordre d'origine et contenu intact
+    def assert_frames(self, written):
+        self.assertEqual(len(written), PIPELINE_FRAMES)
+        for index, frame in enumerate(written):
+            np.testing.assert_array_equal(frame, self.make_frame(index))
+
+
+    def test_frames_are_written_in_order_when_workers_finish_out_of_order(self):
+        frames = iter([self.make_frame(index) for index in range(PIPELINE_FRAMES)])
+        written, outcome = self.run_pipeline(lambda: next(frames, None))
+        self.assertEqual(outcome, {'count': PIPELINE_FRAMES})
+        self.assert_frames(written)
+        self.assertNotEqual(self.completed, sorted(self.completed))
+
+
+    def test_live_frames_stay_within_the_pipeline_depth(self):
+        counts = {'read': 0, 'peak': 0}
+        
+        def read_frame():
+            if counts['read'] == PIPELINE_FRAMES:
+                return None
+            counts['read'] += 1
+            return self.make_frame(counts['read'] - 1)
+        
+        written = []
+        
+        def write_frame(frame):
+            counts['peak'] = max(counts['peak'], counts['read'] - len(written))
+            time.sleep(0.003)
+            written.append(frame.copy())
+        
+        self.processor.run_frame_pipeline(read_frame, write_frame)
+        self.assert_frames(written)
+        self.assertGreater(counts['peak'], self.processor.frame_workers())
+        self.assertLessEqual(counts['peak'], self.processor.frame_pipeline_depth())
+
+
+    def test_raw_reader_buffers_are_not_reused_while_frames_are_live(self):
+        data = b''.join(self.make_frame(index).tobytes() for index in range(PIPELINE_FRAMES))
+        read_frame = self.processor.raw_frame_reader(io.BytesIO(data), FRAME_SHAPE[1], FRAME_SHAPE[0])
+        written, outcome = self.run_pipeline(read_frame)
+        self.assertEqual(outcome, {'count': PIPELINE_FRAMES})
+        self.assert_frames(written)
+
+
+    def test_worker_error_propagates(self):
+        self.fail_at = 9
+        frames = iter([self.make_frame(index) for index in range(PIPELINE_FRAMES)])
+        written, outcome = self.run_pipeline(lambda: next(frames, None))
+        self.assertEqual(str(outcome.get('error')), 'worker failed')
+        self.assertLessEqual(len(written), 9)
+
+
+    def test_decoder_error_propagates(self):
+        frames = iter([self.make_frame(index) for index in range(12)])
+        
+        def read_frame():
+            frame = next(frames, None)
+            if frame is None:
+                raise IOError('decoder failed')
+            return frame
+        
+        written, outcome = self.run_pipeline(read_frame)
+        self.assertEqual(str(outcome.get('error')), 'decoder failed')
+
+
+if __name__ == '__main__':
+    unittest.main()